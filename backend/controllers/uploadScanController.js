@@ -1,6 +1,7 @@
 const multer = require('multer');
 const path = require('path');
 const fs = require('fs');
+const http = require('http');
 
 // Configure multer storage
 const storage = multer.diskStorage({
@@ -14,11 +15,83 @@ const storage = multer.diskStorage({
 
 const upload = multer({ storage: storage }).single('file');
 
-// Stub function to decode barcode/QR code from image
+// Python decode service (python-barcode-scanner/decode_service.py).
+// DECODE_SERVICE_SOCKET takes precedence over DECODE_SERVICE_URL.
+// DECODE_SERVICE_SEND_PATH=true sends the upload's path instead of its
+// bytes when the service shares this filesystem; start the service with
+// --path-root pointing at uploads/ so it accepts them.
+const decodeServiceUrl = new URL(process.env.DECODE_SERVICE_URL || 'http://127.0.0.1:8090');
+const decodeServiceSocket = process.env.DECODE_SERVICE_SOCKET;
+const decodeSendPath = process.env.DECODE_SERVICE_SEND_PATH === 'true';
+const decodeTimeout = parseInt(process.env.DECODE_SERVICE_TIMEOUT || '10000', 10);
+
+// Reuse connections to the decode service across uploads
+const decodeAgent = new http.Agent({ keepAlive: true, maxSockets: 8 });
+
+class DecodeServiceError extends Error {
+  constructor(message, status) {
+    super(message);
+    this.status = status;
+  }
+}
+
+function postToDecodeService(body, contentType) {
+  const options = {
+    method: 'POST',
+    path: '/decode',
+    agent: decodeAgent,
+    timeout: decodeTimeout,
+    headers: {
+      'Content-Type': contentType,
+      'Content-Length': body.length
+    }
+  };
+  if (decodeServiceSocket) {
+    options.socketPath = decodeServiceSocket;
+  } else {
+    options.hostname = decodeServiceUrl.hostname;
+    options.port = decodeServiceUrl.port || 80;
+  }
+
+  return new Promise((resolve, reject) => {
+    const req = http.request(options, (res) => {
+      const chunks = [];
+      res.on('data', (chunk) => chunks.push(chunk));
+      res.on('end', () => {
+        let payload;
+        try {
+          payload = JSON.parse(Buffer.concat(chunks).toString('utf8'));
+        } catch (parseError) {
+          return reject(new DecodeServiceError('Invalid response from decode service', 502));
+        }
+        if (res.statusCode !== 200) {
+          return reject(new DecodeServiceError(payload.message || 'Decode failed', res.statusCode));
+        }
+        resolve(payload);
+      });
+    });
+    req.on('timeout', () => req.destroy(new DecodeServiceError('Decode service timed out', 504)));
+    req.on('error', (err) => {
+      reject(err instanceof DecodeServiceError ? err :
+        new DecodeServiceError(`Decode service unavailable: ${err.message}`, 503));
+    });
+    req.end(body);
+  });
+}
+
+// Decode the first barcode/QR code in an uploaded image
 async function decodeScanCode(filePath) {
-  // TODO: Implement actual decoding logic using a library like 'jsqr' or 'qrcode-reader'
-  // For now, return a dummy scan code
-  return 'dummy-scan-code';
+  let result;
+  if (decodeSendPath) {
+    const body = Buffer.from(JSON.stringify({ path: path.resolve(filePath) }));
+    result = await postToDecodeService(body, 'application/json');
+  } else {
+    const body = await fs.promises.readFile(filePath);
+    result = await postToDecodeService(body, 'application/octet-stream');
+  }
+
+  console.log(`Decoded ${filePath} in ${result.decode_ms} ms: ${result.barcodes.length} barcode(s)`);
+  return result.barcodes.length > 0 ? result.barcodes[0].data : null;
 }
 
 exports.uploadScan = (req, res) => {
@@ -33,17 +106,21 @@ exports.uploadScan = (req, res) => {
     try {
       const scanCode = await decodeScanCode(req.file.path);
 
+      if (!scanCode) {
+        return res.status(422).json({ message: 'No barcode found in image' });
+      }
+
+      // Respond with the decoded scan code
+      res.json({ message: 'Scan code decoded successfully', scanCode });
+    } catch (error) {
+      res.status(error.status || 500).json({ message: 'Error decoding scan code', error: error.message });
+    } finally {
       // Delete the uploaded file after processing
       fs.unlink(req.file.path, (unlinkErr) => {
         if (unlinkErr) {
           console.error('Error deleting uploaded file:', unlinkErr);
         }
       });
-
-      // Respond with the decoded scan code
-      res.json({ message: 'Scan code decoded successfully', scanCode });
-    } catch (error) {
-      res.status(500).json({ message: 'Error decoding scan code', error: error.message });
     }
   });
 };
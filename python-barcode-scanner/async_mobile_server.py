@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Async Mobile Barcode Scanner Server
+Single event loop server for large numbers of phone connections
+
+Implements the same routes as mobile_server.py (/, /status, /barcode,
+/api/stats, /api/detections) on asyncio. Idle keep-alive connections only
+cost a coroutine, and detection processing and disk writes run on a small
+thread pool so they never block the loop.
+
+Usage:
+    python async_mobile_server.py [--port 8000] [--host 0.0.0.0]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http import HTTPStatus
+
+# Add utils to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.detector import BarcodeDetector, DECODE_PROFILES
+from utils.vendor import load_vendor_assets, vendor_fallback_url
+from utils.decode_pool import MAX_DECODE_BYTES, DecodeQueueFull, create_decode_pool
+from utils.http_server import MAX_JSON_BODY_BYTES
+from mobile_server import (get_local_ip, load_mobile_scanner, parse_barcode_batch,
+                           record_mobile_barcode, record_mobile_barcodes, render_status_page)
+
+
+class RequestError(Exception):
+    """Malformed or unacceptable request, answered with an error status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class AsyncMobileBarcodeServer:
+    def __init__(self, host='0.0.0.0', port=8000, profile='all', history_size=1000,
+                 idle_timeout=75, max_body=MAX_DECODE_BYTES, workers=4, decode_workers=2,
+                 cache_path=None, cache_size=64):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.max_body = max_body
+        self.detector = BarcodeDetector(profile=profile, history_size=history_size)
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix='ingest')
+        self.decode_pool = create_decode_pool(self.detector, decode_workers,
+                                              cache_path=cache_path, cache_size=cache_size)
+        self.page = load_mobile_scanner()
+        self.vendor_assets = load_vendor_assets()
+        self.open_connections = 0
+
+    async def serve(self):
+        """Run the server until cancelled"""
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port,
+                                            backlog=1024)
+        async with server:
+            await server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one connection until it closes or goes idle"""
+        self.open_connections += 1
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except RequestError as e:
+                    body = json.dumps({'status': 'error', 'message': str(e)}).encode('utf-8')
+                    writer.write(self.build_response(e.status, 'application/json', body,
+                                                     keep_alive=False))
+                    await writer.drain()
+                    break
+
+                if request is None:
+                    break
+
+                method, path, version, headers, body = request
+                status, content_type, payload, extra_headers = await self.dispatch(
+                    method, path, headers, body)
+
+                keep_alive = self.should_keep_alive(version, headers)
+                writer.write(self.build_response(status, content_type, payload,
+                                                 keep_alive, extra_headers))
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            pass
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+    async def read_request(self, reader):
+        """
+        Read one HTTP request
+
+        Args:
+            reader: asyncio.StreamReader for the connection
+
+        Returns:
+            tuple: (method, path, version, headers, body), or None if the
+                connection closed or stayed idle for idle_timeout seconds
+        """
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+        except asyncio.TimeoutError:
+            return None
+        except ValueError:
+            raise RequestError(414, "Request line too long")
+
+        if not request_line.strip():
+            return None
+
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3:
+            raise RequestError(400, "Bad request line")
+        method, path, version = parts
+
+        headers = {}
+        while True:
+            try:
+                line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+            except ValueError:
+                raise RequestError(431, "Header line too long")
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+            if len(headers) > 100:
+                raise RequestError(431, "Too many headers")
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            raise RequestError(411, "Chunked request bodies are not supported")
+
+        try:
+            content_length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise RequestError(400, "Invalid Content-Length")
+        if content_length < 0:
+            raise RequestError(400, "Invalid Content-Length")
+        if content_length > self.body_limit(path):
+            raise RequestError(413, "Request body too large")
+
+        body = b''
+        if content_length:
+            body = await asyncio.wait_for(reader.readexactly(content_length),
+                                          self.idle_timeout)
+
+        return method, path, version, headers, body
+
+    def body_limit(self, path):
+        """Largest request body accepted for a route: images for /decode, JSON otherwise"""
+        if path.split('?', 1)[0] == '/decode':
+            return self.max_body
+        return MAX_JSON_BODY_BYTES
+
+    def should_keep_alive(self, version, headers):
+        """Apply the HTTP/1.0 and HTTP/1.1 persistent connection rules"""
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.1':
+            return connection != 'close'
+        return connection == 'keep-alive'
+
+    async def dispatch(self, method, path, headers, body):
+        """
+        Route a request
+
+        Args:
+            method: Request method
+            path: Request target
+            headers: Dict of lower-cased request header names to values
+            body: Request body bytes
+
+        Returns:
+            tuple: (status, content_type, body_bytes, extra_headers)
+        """
+        path = path.split('?', 1)[0]
+        loop = asyncio.get_running_loop()
+
+        if method == 'OPTIONS':
+            return 200, None, b'', {
+                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type'
+            }
+
+        if method == 'GET':
+            if path == '/':
+                if self.page is None:
+                    return self.json_error(404, "Mobile scanner HTML not found")
+                return self.serve_asset(self.page, headers)
+            elif path.startswith('/vendor/'):
+                if path in self.vendor_assets:
+                    return self.serve_asset(self.vendor_assets[path], headers)
+                if vendor_fallback_url(path):
+                    return 302, None, b'', {'Location': vendor_fallback_url(path)}
+                return self.json_error(404, "Not Found")
+            elif path == '/status':
+                html = await loop.run_in_executor(self.executor, render_status_page,
+                                                  self.detector)
+                return 200, 'text/html', html.encode('utf-8'), None
+            elif path == '/api/stats':
+                stats = await loop.run_in_executor(self.executor,
+                                                   self.detector.get_detection_stats)
+                return 200, 'application/json', self.encode_json(stats), None
+            elif path == '/api/decode' and self.decode_pool is not None:
+                return 200, 'application/json', self.encode_json(self.decode_pool.get_stats()), None
+            elif path == '/api/detections':
+                detections = await loop.run_in_executor(self.executor,
+                                                        self.detector.get_detections)
+                return 200, 'application/json', self.encode_json(detections), None
+            return self.json_error(404, "Not Found")
+
+        if method == 'POST':
+            if path == '/barcodes':
+                return await self.handle_batch(body)
+            if path == '/decode':
+                return await self.handle_decode(body)
+            if path != '/barcode':
+                return self.json_error(404, "Not Found")
+            try:
+                data = json.loads(body.decode('utf-8'))
+                barcode_info = await loop.run_in_executor(
+                    self.executor, record_mobile_barcode, self.detector, data)
+            except Exception as e:
+                print(f"Error handling barcode POST: {e}")
+                return self.json_error(500, str(e))
+
+            response = {
+                'status': 'success',
+                'message': 'Barcode received successfully',
+                'barcode': barcode_info
+            }
+            return 200, 'application/json', self.encode_json(response), None
+
+        return self.json_error(405, "Method Not Allowed")
+
+    async def handle_batch(self, body):
+        """Record a batch of buffered scans with a single log write"""
+        try:
+            scans = parse_barcode_batch(json.loads(body.decode('utf-8')))
+        except ValueError as e:
+            return self.json_error(400, str(e))
+
+        loop = asyncio.get_running_loop()
+        try:
+            response = await loop.run_in_executor(
+                self.executor, record_mobile_barcodes, self.detector, scans)
+        except Exception as e:
+            print(f"Error handling barcode batch POST: {e}")
+            return self.json_error(500, str(e))
+
+        return 200, 'application/json', self.encode_json(response), None
+
+    async def handle_decode(self, body):
+        """Decode an uploaded frame on the decode pool"""
+        if self.decode_pool is None:
+            return self.json_error(404, "Server-side decoding is disabled")
+
+        try:
+            future = self.decode_pool.submit(body, source='mobile_decode')
+        except DecodeQueueFull as e:
+            status, content_type, payload, _ = self.json_error(503, "Decoder busy")
+            return status, content_type, payload, {'Retry-After': str(e.retry_after)}
+
+        try:
+            result = await asyncio.wrap_future(future)
+        except ValueError as e:
+            return self.json_error(400, str(e))
+        except Exception as e:
+            print(f"Error decoding uploaded frame: {e}")
+            return self.json_error(500, str(e))
+
+        result['status'] = 'success'
+        return 200, 'application/json', self.encode_json(result), None
+
+    def serve_asset(self, asset, headers):
+        """Build a route result for a StaticAsset, honouring conditional requests"""
+        if asset.matches(headers.get('if-none-match')):
+            return 304, None, b'', asset.headers()
+        encoding, body = asset.select(headers.get('accept-encoding'))
+        return 200, asset.content_type, body, asset.headers(encoding)
+
+    def json_error(self, status, message):
+        """Build a JSON error route result"""
+        body = self.encode_json({'status': 'error', 'message': message})
+        return status, 'application/json', body, None
+
+    def encode_json(self, value):
+        """Serialise a response body"""
+        return json.dumps(value, default=str).encode('utf-8')
+
+    def build_response(self, status, content_type, body, keep_alive, extra_headers=None):
+        """
+        Serialise a complete HTTP/1.1 response
+
+        Returns:
+            bytes: Status line, headers and body
+        """
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ''
+
+        headers = [
+            f"HTTP/1.1 {status} {reason}",
+            f"Date: {formatdate(usegmt=True)}",
+            "Access-Control-Allow-Origin: *",
+        ]
+        if status not in (204, 304):
+            headers.append(f"Content-Length: {len(body)}")
+        if content_type:
+            headers.append(f"Content-Type: {content_type}")
+        if keep_alive:
+            headers.append("Connection: keep-alive")
+            headers.append(f"Keep-Alive: timeout={int(self.idle_timeout)}")
+        else:
+            headers.append("Connection: close")
+        for name, value in (extra_headers or {}).items():
+            headers.append(f"{name}: {value}")
+
+        return ('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body
+
+    def close(self):
+        """Flush detection logs and stop the worker threads"""
+        self.executor.shutdown(wait=True)
+        if self.decode_pool:
+            self.decode_pool.close()
+        self.detector.close()
+
+
+def main():
+    """Main function with argument parsing"""
+    parser = argparse.ArgumentParser(description='Async Mobile Barcode Scanner Server')
+    parser.add_argument('--host', '-H', type=str, default='0.0.0.0',
+                       help='Host address (default: 0.0.0.0)')
+    parser.add_argument('--port', '-p', type=int, default=8000,
+                       help='Port number (default: 8000)')
+    parser.add_argument('--profile', choices=sorted(DECODE_PROFILES), default='all',
+                       help='Symbologies to decode (default: all)')
+    parser.add_argument('--history', type=int, default=1000,
+                       help='Number of recent detections kept in memory (default: 1000)')
+    parser.add_argument('--idle-timeout', type=float, default=75,
+                       help='Seconds an idle keep-alive connection stays open (default: 75)')
+    parser.add_argument('--workers', '-w', type=int, default=4,
+                       help='Threads for detection processing and disk writes (default: 4)')
+    parser.add_argument('--decode-workers', type=int, default=2,
+                       help='Threads for server-side /decode frame decoding (default: 2, 0 disables)')
+    parser.add_argument('--cache', type=str, nargs='?', const='decode_cache.sqlite', metavar='PATH',
+                       help='Cache /decode results by image content (default PATH: decode_cache.sqlite)')
+    parser.add_argument('--cache-size', type=int, default=64, metavar='MB',
+                       help='Decode cache size limit in MB (default: 64)')
+
+    args = parser.parse_args()
+    if args.history < 1:
+        parser.error("--history must be at least 1")
+
+    server = AsyncMobileBarcodeServer(
+        host=args.host,
+        port=args.port,
+        profile=args.profile,
+        history_size=args.history,
+        idle_timeout=args.idle_timeout,
+        workers=args.workers,
+        decode_workers=args.decode_workers,
+        cache_path=args.cache,
+        cache_size=args.cache_size
+    )
+
+    local_ip = get_local_ip()
+
+    print(f"\n⚡ Async Mobile Barcode Scanner Server")
+    print("=" * 50)
+    print(f"📡 Server running on http://{args.host}:{args.port}")
+    print(f"📱 Mobile scanner: http://{local_ip}:{args.port}/")
+    print(f"📊 Status page: http://{local_ip}:{args.port}/status")
+    print("\nPress Ctrl+C to stop server")
+    print("=" * 50)
+
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Server stopped by user")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
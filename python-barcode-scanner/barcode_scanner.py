@@ -8,36 +8,61 @@ QR Code, DataMatrix, PDF417, Aztec, Codabar, ITF, Code 93, and more!
 
 Usage:
     python barcode_scanner.py [--camera 0] [--save] [--output filename]
+    python barcode_scanner.py --cascade [--passes original,equalized,blur] [--adaptive]
+    python barcode_scanner.py --parallel
+    python barcode_scanner.py --profile attendance
+    python barcode_scanner.py --no-track --no-motion-gate
+    python barcode_scanner.py --threaded
 """
 
 import cv2
 import argparse
 import sys
 import os
+import threading
 from datetime import datetime
 
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.detector import BarcodeDetector
+from utils.detection_log import detection_log_path
+from utils.detector import BarcodeDetector, DECODE_PROFILES, PREPROCESSING_METHODS
 from utils.display import DisplayManager
+from utils.history import DetectionHistory
+from utils.motion import MotionGate
+from utils.pipeline import FramePipeline
+from utils.tracker import ROITracker
 
 
 class BarcodeScanner:
-    def __init__(self, camera_index=0, save_detections=False, output_file=None):
+    def __init__(self, camera_index=0, save_detections=False, output_file=None,
+                 detection_mode='exhaustive', pass_order=None, adaptive=False,
+                 profile='all', track_roi=True, motion_gate=True, threaded=False,
+                 history_size=1000):
         self.camera_index = camera_index
         self.save_detections = save_detections
         self.output_file = output_file or f"detections_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
         # Initialize components
-        self.detector = BarcodeDetector()
+        self.detector = BarcodeDetector(mode=detection_mode, pass_order=pass_order,
+                                        adaptive=adaptive, profile=profile,
+                                        history_size=history_size)
+        self.source = f"camera{camera_index}"
+        self.tracker = ROITracker() if track_roi else None
+        self.motion_gate = MotionGate() if motion_gate else None
+        self.threaded = threaded
+        self.pipeline = None
         self.display = DisplayManager()
         self.cap = None
         
-        # Detection tracking
-        self.detected_barcodes = []
+        # Detection tracking. With --threaded, process_frame runs on the
+        # decode thread while keyboard commands run on the render thread, so
+        # state_lock guards these fields
+        self.state_lock = threading.Lock()
+        self.detected_barcodes = DetectionHistory(history_size)
         self.last_detected_data = None
         self.detection_cooldown = 0
+        self.last_overlays = []
         
     def initialize_camera(self):
         """Initialize camera capture"""
@@ -54,6 +79,9 @@ class BarcodeScanner:
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
         self.cap.set(cv2.CAP_PROP_FPS, 30)
         
+        # Keep the driver from queueing stale frames
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
         print("Camera initialized successfully!")
         return True
     
@@ -67,45 +95,59 @@ class BarcodeScanner:
         Returns:
             tuple: (processed_frame, detected_barcodes_info)
         """
-        # Detect barcodes in frame
-        barcodes = self.detector.detect_barcodes(frame)
+        # Skip decoding when the scene has not changed, keeping the last overlays
+        if self.motion_gate and not self.motion_gate.should_process(frame):
+            with self.state_lock:
+                overlays = list(self.last_overlays)
+            for barcode_info in overlays:
+                frame = self.display.draw_detection_overlay(frame, barcode_info)
+            return frame, []
+        
+        # Detect barcodes in frame, searching around the last detection first
+        if self.tracker:
+            barcodes = self.tracker.detect(self.detector, frame, source=self.source)
+        else:
+            barcodes = self.detector.detect_barcodes(frame, source=self.source)
         detected_info = []
+        with self.state_lock:
+            self.last_overlays = []
         
-        # Process each detected barcode
-        for barcode in barcodes:
-            barcode_info = self.detector.process_barcode(barcode)
-
-            # Process all supported barcode types
-            if self.detector.is_supported_barcode(barcode_info):
-                # Validate barcode data
-                if self.detector.validate_barcode_data(barcode_info):
-                    # Avoid duplicate detections
-                    if (self.last_detected_data != barcode_info['data'] or
-                        self.detection_cooldown <= 0):
-
-                        detected_info.append(barcode_info)
-                        self.detected_barcodes.append(barcode_info)
-                        self.last_detected_data = barcode_info['data']
-                        self.detection_cooldown = 30  # 30 frames cooldown
-
-                        # Print detection to console
-                        print(f"\n🔍 BARCODE DETECTED!")
-                        print(f"   Type: {barcode_info['type']}")
-                        print(f"   Data: {barcode_info['data']}")
-                        print(f"   Confidence: {barcode_info['confidence']:.1f}%")
-                        print(f"   Time: {barcode_info['timestamp']}")
-
-                        # Save if enabled
-                        if self.save_detections:
-                            self.detector.save_detection(barcode_info, self.output_file)
-                            print(f"   Saved to: {self.output_file}")
-
-                    # Draw overlay for all detected barcodes
-                    frame = self.display.draw_detection_overlay(frame, barcode_info)
-        
-        # Decrease cooldown
-        if self.detection_cooldown > 0:
-            self.detection_cooldown -= 1
+            # Process each detected barcode
+            for barcode in barcodes:
+                barcode_info = self.detector.process_barcode(barcode)
+
+                # Process all supported barcode types
+                if self.detector.is_supported_barcode(barcode_info):
+                    # Validate barcode data
+                    if self.detector.validate_barcode_data(barcode_info):
+                        # Avoid duplicate detections
+                        if (self.last_detected_data != barcode_info['data'] or
+                            self.detection_cooldown <= 0):
+
+                            detected_info.append(barcode_info)
+                            self.detected_barcodes.append(barcode_info)
+                            self.last_detected_data = barcode_info['data']
+                            self.detection_cooldown = 30  # 30 frames cooldown
+
+                            # Print detection to console
+                            print(f"\n🔍 BARCODE DETECTED!")
+                            print(f"   Type: {barcode_info['type']}")
+                            print(f"   Data: {barcode_info['data']}")
+                            print(f"   Confidence: {barcode_info['confidence']:.1f}%")
+                            print(f"   Time: {barcode_info['timestamp']}")
+
+                            # Save if enabled
+                            if self.save_detections:
+                                self.detector.save_detection(barcode_info, self.output_file)
+                                print(f"   Saved to: {detection_log_path(self.output_file)}")
+
+                        # Draw overlay for all detected barcodes
+                        frame = self.display.draw_detection_overlay(frame, barcode_info)
+                        self.last_overlays.append(barcode_info)
+        
+            # Decrease cooldown
+            if self.detection_cooldown > 0:
+                self.detection_cooldown -= 1
         
         return frame, detected_info
     
@@ -129,43 +171,22 @@ class BarcodeScanner:
         print("="*60)
         
         try:
-            while True:
-                # Read frame from camera
-                ret, frame = self.cap.read()
-                
-                if not ret:
-                    print("Error: Could not read frame from camera")
-                    break
-                
-                # Process frame for barcode detection
-                processed_frame, detected_info = self.process_frame(frame)
-                
-                # Get detection statistics
-                stats = self.detector.get_detection_stats()
-                
-                # Add status overlay
-                processed_frame = self.display.create_status_display(processed_frame, stats)
-                
-                # Create info panel
-                info_panel = self.display.create_info_panel(
-                    processed_frame.shape[1], self.detected_barcodes
-                )
-                
-                # Display frame
-                self.display.show_frame(processed_frame, info_panel)
-                
-                # Handle keyboard input
-                key = cv2.waitKey(1) & 0xFF
-                
-                if key == ord('q'):
-                    print("\n👋 Quitting scanner...")
-                    break
-                elif key == ord('s'):
-                    self.save_detections_manual()
-                elif key == ord('c'):
-                    self.clear_detections()
-                elif key == ord('r'):
-                    self.reset_camera()
+            if self.threaded:
+                self.run_pipeline()
+            else:
+                while True:
+                    # Read frame from camera
+                    ret, frame = self.cap.read()
+                    
+                    if not ret:
+                        print("Error: Could not read frame from camera")
+                        break
+                    
+                    # Process frame for barcode detection
+                    processed_frame, detected_info = self.process_frame(frame)
+                    
+                    if not self.render_frame(processed_frame):
+                        break
                 
         except KeyboardInterrupt:
             print("\n\n⚠️  Scanner interrupted by user")
@@ -175,40 +196,161 @@ class BarcodeScanner:
         
         return True
     
+    def run_pipeline(self):
+        """
+        Threaded scanner loop
+
+        Capture and decode run on their own threads; this thread renders
+        the newest decoded frame, so scan latency is bounded by one decode
+        instead of the camera backlog.
+        """
+        self.start_pipeline()
+        
+        while True:
+            result = self.pipeline.get_result(timeout=0.5)
+            
+            if result is None:
+                if not self.pipeline.running:
+                    print(f"Error: {self.pipeline.error or 'Pipeline stopped'}")
+                    break
+                # Keep the window responsive while waiting for a decode
+                if not self.handle_key(cv2.waitKey(1) & 0xFF):
+                    break
+                continue
+            
+            processed_frame, detected_info = result
+            if not self.render_frame(processed_frame):
+                break
+    
+    def start_pipeline(self):
+        """Start the capture/decode threads on the current camera"""
+        self.pipeline = FramePipeline(self.cap, self.process_frame)
+        self.pipeline.start()
+    
+    def stop_pipeline(self):
+        """Stop the capture/decode threads"""
+        if self.pipeline:
+            self.pipeline.stop()
+    
+    def render_frame(self, processed_frame):
+        """
+        Draw the status overlays, show the frame and handle keyboard input
+        
+        Args:
+            processed_frame: Frame returned by process_frame
+            
+        Returns:
+            bool: False if the scanner should quit
+        """
+        # Get detection statistics
+        stats = self.detector.get_detection_stats()
+        
+        # Add status overlay
+        processed_frame = self.display.create_status_display(processed_frame, stats)
+        
+        # Create info panel
+        with self.state_lock:
+            info_panel = self.display.create_info_panel(
+                processed_frame.shape[1], self.detected_barcodes
+            )
+        
+        # Display frame
+        self.display.show_frame(processed_frame, info_panel)
+        
+        # Handle keyboard input
+        return self.handle_key(cv2.waitKey(1) & 0xFF)
+    
+    def handle_key(self, key):
+        """
+        Handle a keyboard command
+        
+        Args:
+            key: Key code from cv2.waitKey
+            
+        Returns:
+            bool: False if the scanner should quit
+        """
+        if key == ord('q'):
+            print("\n👋 Quitting scanner...")
+            return False
+        elif key == ord('s'):
+            self.save_detections_manual()
+        elif key == ord('c'):
+            self.clear_detections()
+        elif key == ord('r'):
+            self.reset_camera()
+        return True
+    
     def save_detections_manual(self):
         """Manually save detections"""
-        if self.detected_barcodes:
+        # Snapshot under the lock; the decode thread may be appending
+        with self.state_lock:
+            detections = list(self.detected_barcodes)
+        if detections:
             filename = f"manual_save_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            self.detector.save_detection(self.detected_barcodes[-1], filename)
+            self.detector.export_detections(detections, filename)
             print(f"\n💾 Detections saved to: {filename}")
         else:
             print("\n⚠️  No detections to save")
     
     def clear_detections(self):
         """Clear detection history"""
-        self.detected_barcodes.clear()
-        self.detector.detected_barcodes.clear()
-        self.last_detected_data = None
+        with self.state_lock:
+            self.detected_barcodes.clear()
+            self.detector.clear_detections()
+            self.last_detected_data = None
         print("\n🗑️  Detection history cleared")
     
     def reset_camera(self):
         """Reset camera connection"""
         print("\n🔄 Resetting camera...")
+        self.stop_pipeline()
         if self.cap:
             self.cap.release()
-        self.initialize_camera()
+        if self.tracker:
+            self.tracker.reset()
+        if self.motion_gate:
+            self.motion_gate.reset()
+        if self.initialize_camera() and self.threaded:
+            self.start_pipeline()
     
     def cleanup(self):
         """Clean up resources"""
+        self.stop_pipeline()
         if self.cap:
             self.cap.release()
         self.display.cleanup()
+        self.detector.close()
         
         # Print final summary
         self.display.print_detection_summary(self.detected_barcodes)
         
         if self.save_detections and self.detected_barcodes:
-            print(f"\n💾 All detections saved to: {self.output_file}")
+            print(f"\n💾 All detections saved to: {detection_log_path(self.output_file)}")
+        
+        if self.pipeline:
+            pipeline_stats = self.pipeline.get_stats()
+            print(f"\n🧵 Pipeline: {pipeline_stats['frames_captured']} captured, "
+                  f"{pipeline_stats['frames_decoded']} decoded, "
+                  f"{pipeline_stats['capture_drops']} stale frames dropped, "
+                  f"{pipeline_stats['render_drops']} results dropped")
+        
+        if self.motion_gate:
+            gate_stats = self.motion_gate.get_stats()
+            print(f"\n💤 Motion gate: skipped {gate_stats['frames_skipped']}/{gate_stats['frames_seen']} "
+                  f"unchanged frames ({gate_stats['skip_rate']:.0%})")
+        
+        if self.tracker:
+            tracker_stats = self.tracker.get_stats()
+            print(f"\n🎯 ROI tracking: {tracker_stats['roi_hits']}/{tracker_stats['roi_searches']} "
+                  f"ROI hits, {tracker_stats['full_searches']} full-frame searches")
+        
+        if self.detector.adaptive:
+            for source, stats in self.detector.get_pass_statistics().items():
+                print(f"\n📈 Pass statistics for {source}:")
+                print(f"   Frames: {stats['frames']}")
+                print(f"   Mean decodes/frame: {stats['mean_decode_calls']:.2f}")
+                print(f"   Pass order: {', '.join(stats['pass_order'])}")
 
 
 def main():
@@ -220,14 +362,57 @@ def main():
                        help='Save detections to file')
     parser.add_argument('--output', '-o', type=str, 
                        help='Output filename for detections')
+    mode_group = parser.add_mutually_exclusive_group()
+    mode_group.add_argument('--cascade', action='store_true',
+                       help='Stop at the first preprocessing pass that finds a valid barcode')
+    mode_group.add_argument('--parallel', action='store_true',
+                       help='Run all preprocessing passes concurrently on a thread pool')
+    parser.add_argument('--passes', type=str,
+                       help='Comma-separated preprocessing pass order '
+                            f"(default: {','.join(PREPROCESSING_METHODS)})")
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Reorder preprocessing passes by their recent hit rate')
+    parser.add_argument('--profile', choices=sorted(DECODE_PROFILES), default='all',
+                       help='Symbologies to decode (default: all)')
+    parser.add_argument('--no-track', action='store_true',
+                       help='Disable ROI tracking and search every full frame')
+    parser.add_argument('--no-motion-gate', action='store_true',
+                       help='Decode every frame, even when the scene is unchanged')
+    parser.add_argument('--threaded', action='store_true',
+                       help='Run capture, decode and display on separate threads')
+    parser.add_argument('--history', type=int, default=1000,
+                       help='Number of recent detections kept in memory (default: 1000)')
     
     args = parser.parse_args()
+    if args.history < 1:
+        parser.error("--history must be at least 1")
+    
+    detection_mode = 'exhaustive'
+    if args.cascade:
+        detection_mode = 'cascade'
+    elif args.parallel:
+        detection_mode = 'parallel'
+    
+    pass_order = None
+    if args.passes:
+        pass_order = [p.strip() for p in args.passes.split(',') if p.strip()]
+        unknown = [p for p in pass_order if p not in PREPROCESSING_METHODS]
+        if unknown:
+            parser.error(f"unknown pass(es): {', '.join(unknown)}")
     
     # Create and run scanner
     scanner = BarcodeScanner(
         camera_index=args.camera,
         save_detections=args.save,
-        output_file=args.output
+        output_file=args.output,
+        detection_mode=detection_mode,
+        pass_order=pass_order,
+        adaptive=args.adaptive,
+        profile=args.profile,
+        track_roi=not args.no_track,
+        motion_gate=not args.no_motion_gate,
+        threaded=args.threaded,
+        history_size=args.history
     )
     
     success = scanner.run()
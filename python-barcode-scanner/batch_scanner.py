@@ -6,44 +6,121 @@ Process multiple images for barcode detection
 Usage:
     python batch_scanner.py --input images/ --output results.txt
     python batch_scanner.py --file image.png
+    python batch_scanner.py --input images/ --profile attendance
+    python batch_scanner.py --input photos/ --multiscale 1280
+    python batch_scanner.py --input uploads/ --workers 8
+    python batch_scanner.py --input archive/ --output results.jsonl --resume
+    python batch_scanner.py --input uploads/ --cache decode_cache.sqlite
+    python batch_scanner.py --input photos/ --reduce 4
+    python batch_scanner.py --input uploads_export.zip
+    python batch_scanner.py --input lecture.mp4 --frame-stride 15
 """
 
 import argparse
 import os
 import sys
-import json
-import csv
+import multiprocessing
+import signal
+import time
+from collections import deque
 from datetime import datetime
 import cv2
+import numpy as np
 
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.detector import BarcodeDetector
+from utils.checkpoint import ScanCheckpoint
+from utils.decode_cache import DecodeCache, detector_version
+from utils.detector import BarcodeDetector, DECODE_PROFILES, transform_barcode
 from utils.display import DisplayManager
+from utils.media import (ARCHIVE_READ_ERRORS, is_archive, is_image_name, is_video,
+                         iter_archive_images, iter_video_frames)
+from utils.result_writers import RESULT_FORMATS, ScanSummary, open_result_writer
+
+
+# JPEG/PNG decoders can produce these downscaled grayscale images directly
+REDUCED_LOAD_FLAGS = {
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# Reduced images smaller than this are reloaded at full resolution
+# instead, as their bars are likely too thin to decode
+REDUCED_MIN_DIM = 640
+
+# Scanner owned by each worker process in --workers mode
+_worker_scanner = None
+
+
+def _init_worker(options):
+    """Create the worker process's scanner once, so its detector stays warm"""
+    global _worker_scanner
+    # Ctrl+C is handled by the main process, which stops the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # One OpenCV thread per process; the pool already uses every core
+    cv2.setNumThreads(1)
+    _worker_scanner = BatchBarcodeScanner(**options)
+
+
+def _scan_in_worker(image_path, data=None):
+    """Scan one image with the worker process's scanner"""
+    return _worker_scanner.scan_image(image_path, data)
 
 
 class BatchBarcodeScanner:
-    def __init__(self, output_format='json'):
-        self.detector = BarcodeDetector()
+    def __init__(self, output_format='json', profile='all', max_dim=None, workers=1,
+                 cache_path=None, cache_size=64, reduce=1, frame_stride=10):
+        if reduce != 1 and reduce not in REDUCED_LOAD_FLAGS:
+            raise ValueError(f"Unsupported reduction factor: {reduce}")
+        
+        self.detector = BarcodeDetector(profile=profile)
         self.display = DisplayManager()
         self.output_format = output_format
+        self.profile = profile
+        self.max_dim = max_dim
+        self.workers = workers
+        self.frame_stride = frame_stride
         self.results = []
         
-    def scan_image(self, image_path):
+        # Reduced-resolution loading, with a full-resolution retry
+        self.reduce = reduce
+        self.reduced_hits = 0
+        self.full_res_retries = 0
+        
+        # Persistent decode cache; every worker process opens its own connection
+        self.cache_path = cache_path
+        self.cache_size = cache_size
+        self.cache = None
+        if cache_path:
+            version = detector_version(self.detector, pipeline='batch', max_dim=max_dim,
+                                       reduce=reduce)
+            self.cache = DecodeCache(cache_path, version, max_bytes=cache_size * 1024 * 1024)
+        
+    def scan_image(self, image_path, data=None):
         """
         Scan a single image for barcodes
         
         Args:
-            image_path: Path to image file
+            image_path: Path to image file, or its name inside an archive
+            data: Encoded image bytes, if not read from image_path, or the
+                ArchiveMemberError raised reading them
             
         Returns:
             dict: Scan results
         """
+        if isinstance(data, Exception):
+            return {
+                'file': image_path,
+                'status': 'error',
+                'error': str(data),
+                'barcodes': []
+            }
+        
         try:
-            # Load image
-            image = cv2.imread(image_path)
-            if image is None:
+            barcodes = self.detect_file(image_path, data)
+            if barcodes is None:
                 return {
                     'file': image_path,
                     'status': 'error',
@@ -51,9 +128,6 @@ class BatchBarcodeScanner:
                     'barcodes': []
                 }
             
-            # Detect barcodes
-            barcodes = self.detector.detect_barcodes(image)
-            
             # Process detected barcodes
             detected_barcodes = []
             for barcode in barcodes:
@@ -82,154 +156,453 @@ class BatchBarcodeScanner:
                 'barcodes': []
             }
     
-    def scan_directory(self, directory_path):
+    def detect_file(self, image_path, data=None):
+        """
+        Load an image file and detect its barcodes, using the decode cache
+        
+        With a cache the file is read once as bytes and hashed; a hit skips
+        both image decoding and barcode detection.
+        
+        Args:
+            image_path: Path to image file
+            data: Encoded image bytes, if not read from image_path
+            
+        Returns:
+            list: pyzbar barcode objects, or None if the image could not be loaded
+        """
+        if self.cache is None:
+            return self.load_and_detect(image_path, data)
+        
+        if data is None:
+            with open(image_path, 'rb') as f:
+                data = f.read()
+        cached = self.cache.get(data)
+        if cached is not None:
+            return cached[0]
+        
+        barcodes = self.load_and_detect(image_path, data)
+        if barcodes is not None:
+            self.cache.put(data, barcodes)
+        return barcodes
+    
+    def load_and_detect(self, image_path, data=None):
+        """
+        Load an image as grayscale and detect its barcodes
+        
+        Detection converts to grayscale anyway, so colour is never decoded.
+        With reduce > 1 the image is first decoded at 1/reduce size, which
+        cuts JPEG decode time and memory; if nothing is found there, or the
+        reduced image is too small to trust, it is retried at full size.
+        
+        Args:
+            image_path: Path to image file
+            data: Encoded file contents if already read, else None
+            
+        Returns:
+            list: pyzbar barcode objects in full-resolution coordinates, or
+                None if the image could not be loaded
+        """
+        if self.reduce > 1:
+            small = self._load(image_path, data, REDUCED_LOAD_FLAGS[self.reduce])
+            if small is None:
+                return None
+            if max(small.shape[:2]) >= REDUCED_MIN_DIM:
+                barcodes = self.detect_image(small)
+                if barcodes:
+                    self.reduced_hits += 1
+                    return [transform_barcode(b, scale=self.reduce) for b in barcodes]
+            self.full_res_retries += 1
+        
+        image = self._load(image_path, data, cv2.IMREAD_GRAYSCALE)
+        return None if image is None else self.detect_image(image)
+    
+    def _load(self, image_path, data, flags):
+        """Decode an image from its bytes if given, else from disk"""
+        if data is None:
+            return cv2.imread(image_path, flags)
+        buffer = np.frombuffer(data, dtype=np.uint8)
+        return cv2.imdecode(buffer, flags) if buffer.size else None
+    
+    def detect_image(self, image):
+        """
+        Detect barcodes in a loaded image
+        
+        Args:
+            image: OpenCV image
+            
+        Returns:
+            list: pyzbar barcode objects
+        """
+        # Coarse-to-fine for large photos if enabled
+        if self.max_dim:
+            return self.detector.detect_barcodes_multiscale(image, max_dim=self.max_dim)
+        return self.detector.detect_barcodes(image)
+    
+    def find_image_files(self, directory_path):
+        """
+        Walk a directory for image files
+        
+        Args:
+            directory_path: Path to directory containing images
+            
+        Yields:
+            str: Path of each image file, in walk order
+        """
+        for root, dirs, files in os.walk(directory_path):
+            dirs.sort()
+            for file in sorted(files):
+                if is_image_name(file):
+                    yield os.path.join(root, file)
+    
+    def scan_directory(self, directory_path, writer=None, checkpoint=None):
         """
-        Scan all images in a directory
+        Scan all images in a directory, streaming each result to writer
+        
+        Results are not kept in memory; the summary comes from running
+        totals, so memory use does not grow with the size of the directory.
         
         Args:
             directory_path: Path to directory containing images
+            writer: Optional ResultWriter that receives every result
+            checkpoint: Optional ScanCheckpoint; files it already holds are
+                skipped, and each file is recorded once its result is written
             
         Returns:
-            list: List of scan results
+            dict: Summary statistics, or None if there was nothing to scan
         """
         if not os.path.exists(directory_path):
             print(f"❌ Directory not found: {directory_path}")
-            return []
+            return None
         
-        # Supported image extensions
-        image_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif'}
+        # Count first so progress can show a total without holding the list
+        total = sum(1 for _ in self.find_image_files(directory_path))
+        if not total:
+            print(f"⚠️  No image files found in: {directory_path}")
+            return None
         
-        # Find all image files
-        image_files = []
-        for root, dirs, files in os.walk(directory_path):
-            for file in files:
-                if any(file.lower().endswith(ext) for ext in image_extensions):
-                    image_files.append(os.path.join(root, file))
+        print(f"🔍 Found {total} image files")
         
-        if not image_files:
-            print(f"⚠️  No image files found in: {directory_path}")
-            return []
+        summary = ScanSummary()
+        image_files = self.find_image_files(directory_path)
+        # Keys are taken before each scan, so a file edited mid-scan is redone
+        file_keys = {}
+        pending = total
+        if checkpoint:
+            checkpoint.add_to_summary(summary)
+            if writer:
+                checkpoint.add_to_summary(writer.summary)
+            pending = sum(1 for _ in checkpoint.filter_pending(
+                self.find_image_files(directory_path)))
+            if pending < total:
+                print(f"⏭️  Skipping {total - pending} images completed in an earlier run")
+            if not pending:
+                print("✅ Nothing left to scan")
+                return summary.as_dict()
+            image_files = checkpoint.filter_pending(image_files, file_keys)
         
-        print(f"🔍 Found {len(image_files)} image files")
-        print("📊 Processing images...")
+        tasks = ((image_file, None) for image_file in image_files)
+        self._scan_tasks(tasks, summary, writer, checkpoint, file_keys, total=pending)
+        return summary.as_dict()
+    
+    def scan_archive(self, archive_path, writer=None, checkpoint=None):
+        """
+        Scan the images inside a zip or tar archive, streaming each result
+        
+        Members are read one at a time straight from the archive, without
+        extracting anything to disk. Each result's file is reported as
+        "archive_path!member_name".
         
-        results = []
-        for i, image_file in enumerate(image_files, 1):
-            print(f"   [{i:3d}/{len(image_files)}] {os.path.basename(image_file)}", end=" ... ")
+        Args:
+            archive_path: Path to a zip or tar archive
+            writer: Optional ResultWriter that receives every result
+            checkpoint: Optional ScanCheckpoint; members it already holds
+                are skipped, keyed by archive path, member name, size and mtime
             
-            result = self.scan_image(image_file)
-            results.append(result)
+        Returns:
+            dict: Summary statistics, or None if there was nothing to scan
+        """
+        summary = ScanSummary()
+        if checkpoint:
+            checkpoint.add_to_summary(summary)
+            if writer:
+                checkpoint.add_to_summary(writer.summary)
+        
+        archive_key = os.path.abspath(archive_path)
+        file_keys = {}
+        skipped = 0
+        
+        def tasks():
+            nonlocal skipped
+            for name, data, mtime_ns in iter_archive_images(archive_path):
+                image_file = f"{archive_path}!{name}"
+                # Unreadable members are reported, not checkpointed, so
+                # --resume tries them again
+                if checkpoint and not isinstance(data, Exception):
+                    key = (f"{archive_key}!{name}", len(data), mtime_ns)
+                    if checkpoint.is_done(key):
+                        skipped += 1
+                        continue
+                    file_keys[image_file] = key
+                yield image_file, data
+        
+        try:
+            scanned = self._scan_tasks(tasks(), summary, writer, checkpoint, file_keys)
+        except ARCHIVE_READ_ERRORS as e:
+            print(f"❌ Error reading archive {archive_path}: {e}")
+            return summary.as_dict() if summary.total_files else None
+        
+        if skipped:
+            print(f"⏭️  Skipped {skipped} images completed in an earlier run")
+        if not scanned and not skipped:
+            print(f"⚠️  No image files found in: {archive_path}")
+            return None
+        return summary.as_dict()
+    
+    def scan_video(self, video_path, writer=None, checkpoint=None):
+        """
+        Scan a video file for barcodes, as a single result
+        
+        Args:
+            video_path: Path to a video file
+            writer: Optional ResultWriter that receives the result
+            checkpoint: Optional ScanCheckpoint; a video it already holds
+                is not scanned again
             
-            if result['status'] == 'success':
-                barcode_count = result['total_barcodes']
-                code39_count = result['code39_barcodes']
-                print(f"✅ {barcode_count} barcodes ({code39_count} Code 39)")
-            else:
-                print(f"❌ {result.get('error', 'Unknown error')}")
+        Returns:
+            dict: Summary statistics
+        """
+        summary = ScanSummary()
+        key = None
+        if checkpoint:
+            checkpoint.add_to_summary(summary)
+            if writer:
+                checkpoint.add_to_summary(writer.summary)
+            key = checkpoint.file_key(video_path)
+            if checkpoint.is_done(key):
+                print("⏭️  Video already scanned in an earlier run")
+                return summary.as_dict()
+        
+        if self.workers > 1:
+            print("ℹ️  Video frames are decoded in order on a single process")
+        print(f"📊 Processing 1 of every {self.frame_stride} frames...")
         
-        return results
+        start_time = time.time()
+        result = self.scan_video_frames(video_path)
+        elapsed = time.time() - start_time
+        
+        summary.add(result)
+        if writer:
+            writer.write(result)
+        if key:
+            self._mark_done(checkpoint, key, result, summary, writer)
+        
+        if result['status'] == 'success':
+            frames = result['frames_scanned']
+            print(f"✅ {result['total_barcodes']} unique barcodes "
+                  f"({result['code39_barcodes']} Code 39) in {frames} frames")
+            if elapsed > 0:
+                print(f"⏱️  {frames} frames in {elapsed:.1f}s ({frames / elapsed:.1f} frames/sec)")
+        else:
+            print(f"❌ {result.get('error', 'Unknown error')}")
+        return summary.as_dict()
     
-    def save_results(self, results, output_file):
+    def scan_video_frames(self, video_path):
         """
-        Save scan results to file
+        Decode every frame_stride-th frame of a video
+        
+        A barcode held up to the camera shows in many consecutive frames,
+        so codes are deduplicated by type and data: each is reported once,
+        with the frame and time it was first seen and the number of scanned
+        frames it appeared in. Only supported, valid barcodes are kept, as
+        motion blur produces more misreads than still photos.
         
         Args:
-            results: List of scan results
-            output_file: Output file path
+            video_path: Path to a video file
+            
+        Returns:
+            dict: Scan result in the same shape as scan_image
         """
+        seen = {}
+        frames = 0
         try:
-            if self.output_format.lower() == 'json':
-                self.save_json_results(results, output_file)
-            elif self.output_format.lower() == 'csv':
-                self.save_csv_results(results, output_file)
-            elif self.output_format.lower() == 'txt':
-                self.save_text_results(results, output_file)
-            else:
-                print(f"❌ Unsupported output format: {self.output_format}")
-                
+            for index, time_s, frame in iter_video_frames(video_path, self.frame_stride):
+                frames += 1
+                for barcode in self.detect_image(frame):
+                    try:
+                        barcode_info = self.detector.process_barcode(barcode)
+                    except UnicodeDecodeError:
+                        continue
+                    if not (self.detector.is_supported_barcode(barcode_info) and
+                            self.detector.validate_barcode_data(barcode_info)):
+                        continue
+                    
+                    identifier = (barcode_info['type'], barcode_info['data'])
+                    if identifier in seen:
+                        seen[identifier]['sightings'] += 1
+                        continue
+                    
+                    barcode_info.update(frame=index, time_s=round(time_s, 2), sightings=1)
+                    seen[identifier] = barcode_info
+                    print(f"   [{time_s:8.1f}s] frame {index}: "
+                          f"{barcode_info['type']} {barcode_info['data']}")
         except Exception as e:
-            print(f"❌ Error saving results: {e}")
-    
-    def save_json_results(self, results, output_file):
-        """Save results as JSON"""
-        with open(output_file, 'w') as f:
-            json.dump({
-                'scan_summary': self.get_summary(results),
-                'results': results
-            }, f, indent=2)
-        print(f"💾 Results saved to JSON: {output_file}")
+            return {
+                'file': video_path,
+                'status': 'error',
+                'error': str(e),
+                'frames_scanned': frames,
+                'barcodes': []
+            }
+        
+        detected_barcodes = list(seen.values())
+        code39_barcodes = [b for b in detected_barcodes if b['type'] == 'CODE39']
+        return {
+            'file': video_path,
+            'status': 'success',
+            'timestamp': datetime.now().isoformat(),
+            'frames_scanned': frames,
+            'frame_stride': self.frame_stride,
+            'total_barcodes': len(detected_barcodes),
+            'code39_barcodes': len(code39_barcodes),
+            'barcodes': detected_barcodes
+        }
     
-    def save_csv_results(self, results, output_file):
-        """Save results as CSV"""
-        with open(output_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            
-            # Header
-            writer.writerow(['File', 'Status', 'Total Barcodes', 'Code 39 Barcodes', 
-                           'Barcode Data', 'Barcode Type', 'Confidence'])
+    def _scan_tasks(self, tasks, summary, writer, checkpoint, file_keys, total=None):
+        """
+        Scan (image_path, data) tasks, streaming results and checkpointing
+        
+        Args:
+            tasks: Iterable of (image_path, data) pairs for iter_scan
+            summary: ScanSummary updated with every result
+            writer: Optional ResultWriter that receives every result
+            checkpoint: Optional ScanCheckpoint
+            file_keys: Result file -> checkpoint key, for results to record
+            total: Number of tasks for progress output, if known
             
-            # Data
-            for result in results:
-                if result['barcodes']:
-                    for barcode in result['barcodes']:
-                        writer.writerow([
-                            result['file'],
-                            result['status'],
-                            result['total_barcodes'],
-                            result['code39_barcodes'],
-                            barcode['data'],
-                            barcode['type'],
-                            barcode['confidence']
-                        ])
+        Returns:
+            int: Number of images scanned
+        """
+        if self.workers > 1:
+            print(f"📊 Processing images on {self.workers} worker processes...")
+        else:
+            print("📊 Processing images...")
+        
+        scanned = 0
+        start_time = time.time()
+        results = self.iter_scan(tasks)
+        try:
+            for i, result in enumerate(results, 1):
+                progress = f"{i:3d}/{total}" if total else f"{i:3d}"
+                print(f"   [{progress}] {os.path.basename(result['file'])}", end=" ... ")
+                summary.add(result)
+                if writer:
+                    writer.write(result)
+                if result['file'] in file_keys:
+                    self._mark_done(checkpoint, file_keys.pop(result['file']), result,
+                                    summary, writer)
+                scanned += 1
+                
+                if result['status'] == 'success':
+                    barcode_count = result['total_barcodes']
+                    code39_count = result['code39_barcodes']
+                    print(f"✅ {barcode_count} barcodes ({code39_count} Code 39)")
                 else:
-                    writer.writerow([
-                        result['file'],
-                        result['status'],
-                        result.get('total_barcodes', 0),
-                        result.get('code39_barcodes', 0),
-                        '',
-                        '',
-                        ''
-                    ])
-        
-        print(f"💾 Results saved to CSV: {output_file}")
+                    print(f"❌ {result.get('error', 'Unknown error')}")
+        finally:
+            # Shut the worker pool down now, even if interrupted mid-scan
+            results.close()
+        
+        elapsed = time.time() - start_time
+        if scanned and elapsed > 0:
+            print(f"⏱️  {scanned} images in {elapsed:.1f}s "
+                  f"({scanned / elapsed:.1f} images/sec)")
+        # Worker processes keep their own counters
+        if self.reduce > 1 and self.workers <= 1:
+            print(f"📉 Reduced loading: {self.reduced_hits} images decoded at "
+                  f"1/{self.reduce} size, {self.full_res_retries} retried at full size")
+        if self.cache is not None and self.workers <= 1:
+            stats = self.cache.get_stats()
+            print(f"🗃️  Decode cache: {stats['cache_hits']} hits, "
+                  f"{stats['cache_misses']} misses")
+        
+        return scanned
     
-    def save_text_results(self, results, output_file):
-        """Save results as text"""
-        with open(output_file, 'w') as f:
-            f.write("BATCH BARCODE SCAN RESULTS\n")
-            f.write("=" * 50 + "\n\n")
-            
-            # Summary
-            summary = self.get_summary(results)
-            f.write("SUMMARY:\n")
-            f.write(f"  Total files processed: {summary['total_files']}\n")
-            f.write(f"  Successful scans: {summary['successful_scans']}\n")
-            f.write(f"  Failed scans: {summary['failed_scans']}\n")
-            f.write(f"  Total barcodes found: {summary['total_barcodes']}\n")
-            f.write(f"  Code 39 barcodes: {summary['code39_barcodes']}\n\n")
+    def _mark_done(self, checkpoint, key, result, summary, writer):
+        """Checkpoint a result, uncounting the entry of a changed file's old version"""
+        stale = checkpoint.stale_result(key)
+        if stale:
+            summary.remove(stale)
+            if writer:
+                writer.summary.remove(stale)
+        checkpoint.mark_done(key, result)
+    
+    def iter_scan(self, tasks):
+        """
+        Scan images, yielding results in the same order as tasks
+        
+        With workers > 1 the images are spread over a process pool, each
+        process keeping its own detector. Only a bounded window of images
+        is in flight at a time, so memory does not grow with the number
+        of files.
+        
+        Args:
+            tasks: Iterable of (image_path, data) pairs, where data is the
+                encoded image, None to read image_path from disk, or an
+                ArchiveMemberError to report
             
-            # Detailed results
-            f.write("DETAILED RESULTS:\n")
-            f.write("-" * 50 + "\n")
+        Yields:
+            dict: Scan result for each image
+        """
+        if self.workers <= 1:
+            for image_file, data in tasks:
+                yield self.scan_image(image_file, data)
+            return
+        
+        options = {
+            'output_format': self.output_format,
+            'profile': self.profile,
+            'max_dim': self.max_dim,
+            'cache_path': self.cache_path,
+            'cache_size': self.cache_size,
+            'reduce': self.reduce,
+            'frame_stride': self.frame_stride
+        }
+        window = self.workers * 4
+        
+        pool = multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                    initargs=(options,))
+        pending = deque()
+        try:
+            for image_file, data in tasks:
+                pending.append(pool.apply_async(_scan_in_worker, (image_file, data)))
+                if len(pending) >= window:
+                    yield pending.popleft().get()
             
-            for result in results:
-                f.write(f"\nFile: {result['file']}\n")
-                f.write(f"Status: {result['status']}\n")
-                
-                if result['status'] == 'success':
-                    f.write(f"Barcodes found: {result['total_barcodes']}\n")
-                    
-                    for i, barcode in enumerate(result['barcodes'], 1):
-                        f.write(f"  {i}. Type: {barcode['type']}\n")
-                        f.write(f"     Data: {barcode['data']}\n")
-                        f.write(f"     Confidence: {barcode['confidence']:.1f}%\n")
-                else:
-                    f.write(f"Error: {result.get('error', 'Unknown error')}\n")
-                
-                f.write("-" * 30 + "\n")
+            while pending:
+                yield pending.popleft().get()
+            pool.close()
+        except BaseException:
+            # Interrupted (or the consumer stopped early): drop the images in
+            # flight rather than waiting for them; --resume rescans them
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    
+    def save_results(self, results, output_file):
+        """
+        Save a list of scan results to file
         
-        print(f"💾 Results saved to text: {output_file}")
+        Args:
+            results: List of scan results
+            output_file: Output file path
+        """
+        try:
+            with open_result_writer(self.output_format, output_file) as writer:
+                for result in results:
+                    writer.write(result)
+        except Exception as e:
+            print(f"❌ Error saving results: {e}")
     
     def get_summary(self, results):
         """
@@ -241,25 +614,23 @@ class BatchBarcodeScanner:
         Returns:
             dict: Summary statistics
         """
-        total_files = len(results)
-        successful_scans = sum(1 for r in results if r['status'] == 'success')
-        failed_scans = total_files - successful_scans
-        total_barcodes = sum(r.get('total_barcodes', 0) for r in results)
-        code39_barcodes = sum(r.get('code39_barcodes', 0) for r in results)
-        
-        return {
-            'total_files': total_files,
-            'successful_scans': successful_scans,
-            'failed_scans': failed_scans,
-            'total_barcodes': total_barcodes,
-            'code39_barcodes': code39_barcodes,
-            'other_barcodes': total_barcodes - code39_barcodes
-        }
+        summary = ScanSummary()
+        for result in results:
+            summary.add(result)
+        return summary.as_dict()
     
-    def print_summary(self, results):
-        """Print summary to console"""
-        summary = self.get_summary(results)
+    def close(self):
+        """Close the decode cache"""
+        if self.cache is not None:
+            self.cache.close()
+    
+    def print_summary(self, summary):
+        """
+        Print summary to console
         
+        Args:
+            summary: Summary statistics from scan_directory or get_summary
+        """
         print("\n" + "=" * 50)
         print("BATCH SCAN SUMMARY")
         print("=" * 50)
@@ -271,51 +642,109 @@ class BatchBarcodeScanner:
         print(f"📊 Other formats: {summary['other_barcodes']}")
         print("=" * 50)
 
-
 def main():
     """Main function with argument parsing"""
     parser = argparse.ArgumentParser(description='Batch Barcode Scanner - Code 39 Detector')
     parser.add_argument('--input', '-i', type=str, 
-                       help='Input directory containing images')
+                       help='Input directory of images, zip/tar archive of images, or video file')
     parser.add_argument('--file', '-f', type=str, 
                        help='Single image file to process')
     parser.add_argument('--output', '-o', type=str, 
                        help='Output file for results')
-    parser.add_argument('--format', choices=['json', 'csv', 'txt'], default='json',
+    parser.add_argument('--format', choices=RESULT_FORMATS, default='json',
                        help='Output format (default: json)')
+    parser.add_argument('--profile', choices=sorted(DECODE_PROFILES), default='all',
+                       help='Symbologies to decode (default: all)')
+    parser.add_argument('--multiscale', type=int, nargs='?', const=1280, metavar='MAX_DIM',
+                       help='Locate barcodes on a downscaled copy and decode only those '
+                            'regions at full resolution (default MAX_DIM: 1280)')
+    parser.add_argument('--workers', '-w', type=int, nargs='?', const=os.cpu_count(), default=1,
+                       help='Scan images on N worker processes (default without N: one per CPU)')
+    parser.add_argument('--reduce', type=int, choices=sorted(REDUCED_LOAD_FLAGS), default=1,
+                       help='Decode images at 1/N size first, retrying at full size '
+                            'when nothing is found')
+    parser.add_argument('--frame-stride', type=int, default=10, metavar='N',
+                       help='Decode every Nth frame of a video input (default: 10)')
+    parser.add_argument('--cache', type=str, nargs='?', const='decode_cache.sqlite', metavar='PATH',
+                       help='Cache decode results by image content (default PATH: decode_cache.sqlite)')
+    parser.add_argument('--cache-size', type=int, default=64, metavar='MB',
+                       help='Decode cache size limit in MB (default: 64)')
+    parser.add_argument('--resume', action='store_true',
+                       help='Skip images completed by an earlier run and append to --output')
+    parser.add_argument('--checkpoint', type=str, metavar='PATH',
+                       help='Checkpoint file for --input scans (default: OUTPUT.checkpoint)')
     
     args = parser.parse_args()
     
     if not args.input and not args.file:
-        print("❌ Please specify either --input directory or --file")
+        print("❌ Please specify either --input (directory, archive or video) or --file")
+        sys.exit(1)
+    
+    if args.resume and not (args.input and args.output):
+        print("❌ --resume needs --input and the --output file of the earlier run")
         sys.exit(1)
     
     # Create scanner
-    scanner = BatchBarcodeScanner(output_format=args.format)
+    scanner = BatchBarcodeScanner(output_format=args.format, profile=args.profile,
+                                  max_dim=args.multiscale, workers=args.workers,
+                                  cache_path=args.cache, cache_size=args.cache_size,
+                                  reduce=args.reduce, frame_stride=args.frame_stride)
+    
+    # Results are written as they complete, so choose the file up front
+    output_file = args.output
+    if not output_file:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_file = f"batch_scan_results_{timestamp}.{args.format}"
+    
+    checkpoint = None
+    if args.input:
+        checkpoint_file = args.checkpoint or f"{output_file}.checkpoint"
+        if args.resume:
+            if os.path.exists(checkpoint_file):
+                print(f"🔁 Resuming from checkpoint: {checkpoint_file}")
+            else:
+                print(f"⚠️  No checkpoint at {checkpoint_file}, starting from scratch")
+        checkpoint = ScanCheckpoint(checkpoint_file, resume=args.resume)
+    
+    try:
+        writer = open_result_writer(args.format, output_file, append=args.resume)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
     
     # Process input
-    if args.file:
-        print(f"🔍 Processing single file: {args.file}")
-        results = [scanner.scan_image(args.file)]
-    else:
-        print(f"🔍 Processing directory: {args.input}")
-        results = scanner.scan_directory(args.input)
+    try:
+        with writer:
+            if args.file:
+                print(f"🔍 Processing single file: {args.file}")
+                result = scanner.scan_image(args.file)
+                writer.write(result)
+                summary = writer.summary.as_dict()
+            elif is_video(args.input):
+                print(f"🔍 Processing video: {args.input}")
+                summary = scanner.scan_video(args.input, writer, checkpoint)
+            elif is_archive(args.input):
+                print(f"🔍 Processing archive: {args.input}")
+                summary = scanner.scan_archive(args.input, writer, checkpoint)
+            else:
+                print(f"🔍 Processing directory: {args.input}")
+                summary = scanner.scan_directory(args.input, writer, checkpoint)
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Scan interrupted by user")
+        if checkpoint:
+            print("   Run again with --resume to continue where it stopped")
+        sys.exit(130)
+    finally:
+        if checkpoint:
+            checkpoint.close()
+        scanner.close()
     
-    if not results:
+    if not summary:
         print("❌ No results to process")
         sys.exit(1)
     
     # Print summary
-    scanner.print_summary(results)
-    
-    # Save results if output specified
-    if args.output:
-        scanner.save_results(results, args.output)
-    else:
-        # Default output filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        default_output = f"batch_scan_results_{timestamp}.{args.format}"
-        scanner.save_results(results, default_output)
+    scanner.print_summary(summary)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Detection Log Compactor
+Convert append-only detection logs (JSON Lines) to the JSON list layout
+
+Usage:
+    python compact_detections.py mobile_detections.jsonl
+    python compact_detections.py mobile_detections.jsonl --output mobile_detections.json
+    python compact_detections.py mobile_detections.jsonl --compact
+"""
+
+import argparse
+import os
+import sys
+
+# Add utils to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.detection_log import compact_log, convert_log_to_json
+
+
+def main():
+    """Main function with argument parsing"""
+    parser = argparse.ArgumentParser(description='Convert or compact detection logs')
+    parser.add_argument('log', type=str,
+                       help='JSON Lines detection log (*.jsonl)')
+    parser.add_argument('--output', '-o', type=str,
+                       help='JSON output file (default: log name with .json)')
+    parser.add_argument('--compact', action='store_true',
+                       help='Rewrite the log in place, dropping unreadable lines')
+    
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.log):
+        print(f"❌ Log not found: {args.log}")
+        sys.exit(1)
+    
+    if args.compact:
+        count = compact_log(args.log)
+        print(f"🗜️  Compacted {args.log}: {count} detections")
+        return
+    
+    output = args.output
+    if not output:
+        base, ext = os.path.splitext(args.log)
+        output = base + '.json'
+    
+    if os.path.abspath(output) == os.path.abspath(args.log):
+        print("❌ Output would overwrite the log, use --output")
+        sys.exit(1)
+    
+    count = convert_log_to_json(args.log, output)
+    print(f"💾 Converted {count} detections to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Barcode Decode Service
+Long-running decode server for the attendance backend's image uploads
+
+Keeps a warm BarcodeDetector and a bounded decode pool in one process, so
+the Node backend can decode uploads over HTTP or a Unix socket without
+spawning Python per request.
+
+Endpoints:
+    POST /decode   Image bytes, or JSON {"path": "/abs/path/to/image"}
+    GET  /stats    Decode counters and latency
+    GET  /health   Liveness check
+
+Usage:
+    python decode_service.py [--port 8090] [--host 127.0.0.1]
+    python decode_service.py --socket /tmp/attendo-decode.sock
+    python decode_service.py --cache decode_cache.sqlite
+    python decode_service.py --benchmark test_images/
+"""
+
+import argparse
+import http.server
+import json
+import os
+import stat
+import sys
+import time
+
+# Add utils to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.detector import BarcodeDetector, DECODE_PROFILES, DETECTION_MODES
+from utils.decode_cache import DecodeCache, detector_version
+from utils.decode_pool import (DecodeHandlerMixin, DecodePool, DecodeQueueFull,
+                               load_frame, percentile)
+from utils.http_server import (KeepAliveHandlerMixin, ThreadingUnixHTTPServer,
+                               create_http_server)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.tif')
+
+# Uploads are full phone photos rather than scanner frames; a 12 MP JPEG is
+# typically 3-8 MB and a PNG can be several times that
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Largest JSON {"path": ...} request body
+MAX_PATH_REQUEST_BYTES = 64 * 1024
+
+
+class DecodeServiceHandler(KeepAliveHandlerMixin, DecodeHandlerMixin,
+                           http.server.BaseHTTPRequestHandler):
+    decode_source = 'upload'
+
+    def __init__(self, *args, service=None, **kwargs):
+        self.service = service
+        self.decode_pool = service.decode_pool
+        self.max_decode_bytes = service.max_bytes
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        """Handle GET requests"""
+        if self.path == '/health':
+            self.send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self.send_json(200, self.service.get_stats())
+        else:
+            self.send_json(404, {'status': 'error', 'message': 'Not Found'})
+
+    def do_POST(self):
+        """Handle POST requests"""
+        if self.path != '/decode':
+            self.send_json(404, {'status': 'error', 'message': 'Not Found'})
+        elif self.headers.get('Content-Type', '').startswith('application/json'):
+            self.handle_path_decode()
+        else:
+            self.handle_decode_post()
+
+    def handle_path_decode(self):
+        """Decode an image the caller left on the shared filesystem"""
+        body = self.read_body(MAX_PATH_REQUEST_BYTES)
+        if body is None:
+            return
+
+        if self.service.path_root is None:
+            self.send_json(403, {
+                'status': 'error',
+                'message': 'Path requests are disabled; start the service with --path-root'
+            })
+            return
+
+        try:
+            request = json.loads(body.decode('utf-8'))
+            path = self.service.resolve_path(request['path'])
+        except (TypeError, KeyError, ValueError) as e:
+            self.send_json(400, {'status': 'error', 'message': f'Bad request: {e}'})
+            return
+
+        max_bytes = self.service.max_bytes
+        try:
+            with open(path, 'rb') as f:
+                data = f.read(max_bytes + 1)
+        except OSError as e:
+            self.send_json(404, {'status': 'error', 'message': str(e)})
+            return
+        if len(data) > max_bytes:
+            self.send_json(413, {
+                'status': 'error',
+                'message': f'Image larger than {max_bytes // 1024} KB'
+            })
+            return
+
+        self.send_decode_result(data, path)
+
+    def address_string(self):
+        """Unix socket peers have no address"""
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return 'unix'
+
+    def log_message(self, format, *args):
+        """Only log when verbose"""
+        if self.service.verbose:
+            super().log_message(format, *args)
+
+
+class DecodeService:
+    def __init__(self, profile='all', mode='cascade', workers=2, max_pending=16,
+                 max_dim=1280, path_root=None, verbose=False, cache_path=None,
+                 cache_size=64, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            profile: Decode profile (symbologies to decode)
+            mode: Detection mode for BarcodeDetector
+            workers: Decode threads
+            max_pending: Frames allowed in the pool before answering 503
+            max_dim: Longest side images are downscaled to
+            path_root: Directory JSON path requests must stay inside, or
+                None to refuse path requests
+            verbose: Log every request
+            cache_path: Decode cache database, so re-submitted images are
+                answered without decoding, or None to disable
+            cache_size: Decode cache size limit in MB
+            max_bytes: Largest image accepted, uploaded or by path
+        """
+        self.detector = BarcodeDetector(mode=mode, profile=profile)
+        cache = None
+        if cache_path:
+            version = detector_version(self.detector, pipeline='decode_pool', max_dim=max_dim)
+            cache = DecodeCache(cache_path, version, max_bytes=cache_size * 1024 * 1024)
+        self.decode_pool = DecodePool(self.detector, workers=workers,
+                                      max_pending=max_pending, max_dim=max_dim,
+                                      cache=cache)
+        self.path_root = os.path.realpath(path_root) if path_root else None
+        self.max_bytes = max_bytes
+        self.verbose = verbose
+        self.started = time.time()
+        self.server = None
+
+    def resolve_path(self, path):
+        """
+        Check a requested image path against path_root
+
+        Raises:
+            ValueError: If path requests are disabled or the path is
+                outside path_root
+        """
+        if self.path_root is None:
+            raise ValueError("Path requests are disabled")
+        real_path = os.path.realpath(path)
+        if os.path.commonpath([real_path, self.path_root]) != self.path_root:
+            raise ValueError(f"{path} is outside {self.path_root}")
+        return real_path
+
+    def warm_up(self):
+        """Run one decode so OpenCV and zbar are loaded before the first request"""
+        import cv2
+        import numpy as np
+
+        ok, blank = cv2.imencode('.png', np.full((64, 64), 255, dtype=np.uint8))
+        if ok:
+            # Straight to the detector, so the decode cache cannot skip it
+            gray, _, _ = load_frame(blank.tobytes())
+            self.detector.detect_barcodes(gray, source='warmup')
+
+    def create_handler(self):
+        """Create handler with service instance"""
+        def handler(*args, **kwargs):
+            return DecodeServiceHandler(*args, service=self, **kwargs)
+        return handler
+
+    def serve_tcp(self, host, port):
+        """Serve HTTP on a TCP port until interrupted"""
+        self.server = create_http_server((host, port), self.create_handler())
+        print(f"🔍 Decode service listening on http://{host}:{port}")
+        self._serve()
+
+    def serve_unix(self, socket_path):
+        """Serve HTTP on a Unix domain socket until interrupted"""
+        if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            os.unlink(socket_path)
+        self.server = ThreadingUnixHTTPServer(socket_path, self.create_handler())
+        print(f"🔍 Decode service listening on unix:{socket_path}")
+        try:
+            self._serve()
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    def _serve(self):
+        """Run the server loop and report statistics on shutdown"""
+        print("Press Ctrl+C to stop")
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n\n⚠️  Decode service stopped by user")
+        finally:
+            self.server.server_close()
+            self.close()
+            self.print_stats()
+
+    def get_stats(self):
+        """
+        Get service statistics
+
+        Returns:
+            dict: Uptime and decode pool statistics
+        """
+        stats = self.decode_pool.get_stats()
+        stats['uptime_s'] = round(time.time() - self.started, 1)
+        return stats
+
+    def print_stats(self):
+        """Print decode statistics"""
+        stats = self.get_stats()
+        print(f"📊 Decoded {stats['completed']} images "
+              f"(avg {stats['avg_decode_ms']} ms, p95 {stats['p95_decode_ms']} ms), "
+              f"{stats['rejected']} rejected, {stats['failed']} failed")
+        if 'cache_hits' in stats:
+            print(f"🗃️  Decode cache: {stats['cache_hits']} hits, "
+                  f"{stats['cache_misses']} misses")
+
+    def benchmark(self, directory, rounds=3):
+        """
+        Decode every image in a directory and report latency
+
+        Images are read into memory first so only decoding is timed.
+
+        Args:
+            directory: Directory of test images
+            rounds: Times each image is decoded
+
+        Returns:
+            dict: Benchmark summary
+        """
+        images = []
+        for filename in sorted(os.listdir(directory)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                with open(os.path.join(directory, filename), 'rb') as f:
+                    images.append((filename, f.read()))
+
+        if not images:
+            print(f"❌ No images found in {directory}")
+            return None
+
+        print(f"⏱️  Benchmarking {len(images)} images x {rounds} rounds "
+              f"on {self.decode_pool.workers} workers")
+        self.warm_up()
+
+        latencies = []
+        start = time.perf_counter()
+        for _ in range(rounds):
+            futures = []
+            for filename, data in images:
+                # Wait for a free slot rather than counting rejections
+                while True:
+                    try:
+                        futures.append((filename, self.decode_pool.submit(data, 'benchmark')))
+                        break
+                    except DecodeQueueFull:
+                        time.sleep(0.001)
+
+            for filename, future in futures:
+                try:
+                    result = future.result()
+                except ValueError as e:
+                    print(f"   ❌ {filename}: {e}")
+                    continue
+                latencies.append(result['decode_ms'])
+                if len(latencies) <= len(images):
+                    found = ', '.join(b['data'] for b in result['barcodes']) or 'none'
+                    print(f"   {filename}: {result['decode_ms']:.1f} ms -> {found}")
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        summary = {
+            'images': len(latencies),
+            'seconds': round(elapsed, 2),
+            'images_per_second': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            'avg_ms': round(sum(latencies) / len(latencies), 1) if latencies else 0.0,
+            'p50_ms': round(percentile(latencies, 50), 1),
+            'p95_ms': round(percentile(latencies, 95), 1),
+            'max_ms': round(latencies[-1], 1) if latencies else 0.0
+        }
+
+        print(f"\n📊 {summary['images']} decodes in {summary['seconds']} s "
+              f"({summary['images_per_second']} images/sec)")
+        print(f"   avg {summary['avg_ms']} ms, p50 {summary['p50_ms']} ms, "
+              f"p95 {summary['p95_ms']} ms, max {summary['max_ms']} ms")
+        if self.decode_pool.cache is not None:
+            stats = self.decode_pool.cache.get_stats()
+            print(f"🗃️  Decode cache: {stats['cache_hits']} hits, "
+                  f"{stats['cache_misses']} misses")
+        return summary
+
+    def close(self):
+        """Stop the decode pool and flush detector state"""
+        self.decode_pool.close()
+        self.detector.close()
+
+
+def main():
+    """Main function with argument parsing"""
+    parser = argparse.ArgumentParser(description='Barcode Decode Service')
+    parser.add_argument('--host', '-H', type=str, default='127.0.0.1',
+                       help='Host address (default: 127.0.0.1)')
+    parser.add_argument('--port', '-p', type=int, default=8090,
+                       help='Port number (default: 8090)')
+    parser.add_argument('--socket', type=str,
+                       help='Serve on this Unix domain socket instead of TCP')
+    parser.add_argument('--profile', choices=sorted(DECODE_PROFILES), default='all',
+                       help='Symbologies to decode (default: all)')
+    parser.add_argument('--mode', choices=DETECTION_MODES, default='cascade',
+                       help='Detection mode (default: cascade)')
+    parser.add_argument('--workers', '-w', type=int, default=2,
+                       help='Decode threads (default: 2)')
+    parser.add_argument('--queue', type=int, default=16,
+                       help='Images queued before answering 503 (default: 16)')
+    parser.add_argument('--max-dim', type=int, default=1280,
+                       help='Longest side images are downscaled to (default: 1280)')
+    parser.add_argument('--path-root', type=str,
+                       help='Accept JSON path requests for images inside this directory '
+                            '(default: path requests are refused)')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                       help=f'Largest image accepted, in bytes (default: {DEFAULT_MAX_BYTES}, '
+                            f'{DEFAULT_MAX_BYTES // (1024 * 1024)} MB)')
+    parser.add_argument('--cache', type=str, nargs='?', const='decode_cache.sqlite', metavar='PATH',
+                       help='Cache decode results by image content (default PATH: decode_cache.sqlite)')
+    parser.add_argument('--cache-size', type=int, default=64, metavar='MB',
+                       help='Decode cache size limit in MB (default: 64)')
+    parser.add_argument('--benchmark', type=str, nargs='?', const='test_images', metavar='DIR',
+                       help='Benchmark decoding the images in DIR (default: test_images) and exit')
+    parser.add_argument('--rounds', type=int, default=3,
+                       help='Benchmark rounds (default: 3)')
+    parser.add_argument('--verbose', '-v', action='store_true',
+                       help='Log every request')
+
+    args = parser.parse_args()
+
+    service = DecodeService(
+        profile=args.profile,
+        mode=args.mode,
+        workers=args.workers,
+        max_pending=args.queue,
+        max_dim=args.max_dim,
+        path_root=args.path_root,
+        verbose=args.verbose,
+        cache_path=args.cache,
+        cache_size=args.cache_size,
+        max_bytes=args.max_bytes
+    )
+
+    if args.benchmark:
+        try:
+            if service.benchmark(args.benchmark, rounds=args.rounds) is None:
+                sys.exit(1)
+        finally:
+            service.close()
+        return
+
+    service.warm_up()
+    if args.socket:
+        service.serve_unix(args.socket)
+    else:
+        service.serve_tcp(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Fetch Vendored Libraries
+Downloads the pinned ZXing decoder bundle the mobile scanner pages use, so
+the mobile servers can serve it on networks without internet access
+
+Usage:
+    python fetch_vendor.py [--force]
+"""
+
+import argparse
+import os
+import sys
+
+# Add utils to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils.vendor import VENDOR_DIR, fetch_vendor_assets
+
+
+def main():
+    """Main function with argument parsing"""
+    parser = argparse.ArgumentParser(description='Download vendored browser libraries')
+    parser.add_argument('--force', action='store_true',
+                       help='Download again even if already present')
+    parser.add_argument('--dir', type=str, default=VENDOR_DIR,
+                       help=f'Vendor directory (default: {VENDOR_DIR})')
+
+    args = parser.parse_args()
+
+    if not fetch_vendor_assets(args.dir, force=args.force):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
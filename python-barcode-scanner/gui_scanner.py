@@ -21,6 +21,8 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from utils.detector import BarcodeDetector
 from utils.display import DisplayManager
+from utils.history import DetectionHistory
+from utils.tracker import ROITracker
 
 
 class BarcodeScannerGUI:
@@ -32,6 +34,7 @@ class BarcodeScannerGUI:
         # Initialize components
         self.detector = BarcodeDetector()
         self.display = DisplayManager()
+        self.tracker = ROITracker()
         
         # Camera and scanning state
         self.cap = None
@@ -39,7 +42,7 @@ class BarcodeScannerGUI:
         self.camera_index = 0
         
         # Detection tracking
-        self.detected_barcodes = []
+        self.detected_barcodes = DetectionHistory()
         self.last_detected_data = None
         
         # Create GUI
@@ -178,6 +181,7 @@ class BarcodeScannerGUI:
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
             
+            self.tracker.reset()
             self.scanning = True
             self.start_button.config(state="disabled")
             self.stop_button.config(state="normal")
@@ -211,8 +215,9 @@ class BarcodeScannerGUI:
                 if not ret:
                     break
                 
-                # Detect barcodes
-                barcodes = self.detector.detect_barcodes(frame)
+                # Detect barcodes, searching around the last detection first
+                barcodes = self.tracker.detect(self.detector, frame,
+                                               source=f"camera{self.camera_index}")
                 
                 for barcode in barcodes:
                     barcode_info = self.detector.process_barcode(barcode)
@@ -301,7 +306,7 @@ class BarcodeScannerGUI:
         
         if filename:
             try:
-                self.detector.save_detection(self.detected_barcodes[-1], filename)
+                self.detector.export_detections(self.detected_barcodes, filename)
                 messagebox.showinfo("Success", f"Detections saved to {filename}")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save: {str(e)}")
@@ -309,7 +314,7 @@ class BarcodeScannerGUI:
     def clear_detections(self):
         """Clear detection history"""
         self.detected_barcodes.clear()
-        self.detector.detected_barcodes.clear()
+        self.detector.clear_detections()
         self.last_detected_data = None
         
         self.current_data.config(text="None")
@@ -322,6 +327,7 @@ class BarcodeScannerGUI:
         """Handle window closing"""
         if self.scanning:
             self.stop_scanning()
+        self.detector.close()
         self.root.destroy()
 
 
@@ -4,11 +4,10 @@ HTTPS Mobile Barcode Scanner Server
 Secure server with SSL for mobile camera access
 
 Usage:
-    python https_mobile_server.py [--port 8443] [--host 0.0.0.0]
+    python https_mobile_server.py [--port 8443] [--host 0.0.0.0] [--profile attendance]
 """
 
 import http.server
-import socketserver
 import ssl
 import json
 import os
@@ -23,7 +22,12 @@ from datetime import datetime
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.detector import BarcodeDetector
+from utils.detector import BarcodeDetector, DECODE_PROFILES
+from utils.http_server import (KeepAliveHandlerMixin, ScannerHandlerMixin, StaticAsset,
+                               create_http_server)
+from utils.vendor import load_vendor_assets, render_scanner_page
+from utils.decode_pool import DecodeHandlerMixin, create_decode_pool
+from mobile_server import parse_barcode_batch, record_mobile_barcodes
 
 
 def create_self_signed_cert():
@@ -128,30 +132,7 @@ def create_python_cert():
         return None, None
 
 
-class HTTPSMobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, detector=None, **kwargs):
-        self.detector = detector or BarcodeDetector()
-        super().__init__(*args, **kwargs)
-    
-    def do_GET(self):
-        """Handle GET requests"""
-        if self.path == '/':
-            self.serve_mobile_scanner()
-        elif self.path == '/status':
-            self.serve_status_page()
-        else:
-            super().do_GET()
-    
-    def do_POST(self):
-        """Handle POST requests"""
-        if self.path == '/barcode':
-            self.handle_barcode_post()
-        else:
-            self.send_error(404, "Not Found")
-    
-    def serve_mobile_scanner(self):
-        """Serve the mobile scanner HTML page with HTTPS support"""
-        html_content = """
+MOBILE_SCANNER_HTML = """\
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -300,8 +281,15 @@ class HTTPSMobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
         </div>
     </div>
 
-    <script src="https://unpkg.com/@zxing/library@latest/umd/index.min.js"></script>
+    <script src="{{ZXING_PATH}}"></script>
+    <script>
+        {{SERVER_DECODER_JS}}
+    </script>
     <script>
+        // Scans not yet accepted by the server survive reloads in localStorage
+        const SCAN_QUEUE_KEY = 'pendingScans';
+        const MAX_BATCH_SIZE = 100;
+        
         class HTTPSMobileBarcodeScanner {
             constructor() {
                 this.video = document.getElementById('video');
@@ -315,19 +303,54 @@ class HTTPSMobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
                 this.stream = null;
                 this.codeReader = null;
                 this.scanning = false;
+                this.serverDecoding = false;
+                this.serverDecoder = new ServerFrameDecoder(
+                    this.video,
+                    (result) => this.handleBarcodeDetected(result),
+                    (message, type) => this.updateStatus(message, type)
+                );
+                
+                this.queue = this.loadQueue();
+                this.sending = false;
+                this.retryDelay = 1000;
+                this.retryTimer = null;
                 
                 this.initializeScanner();
                 this.setupEventListeners();
+                
+                // Send anything left over from an earlier session
+                this.flushQueue();
             }
             
             initializeScanner() {
+                if (typeof ZXing === 'undefined') {
+                    // Offline and not vendored: decode on the server instead
+                    console.log('ZXing not available, decoding on the server');
+                    this.serverDecoding = true;
+                    return;
+                }
+                
                 this.codeReader = new ZXing.BrowserMultiFormatReader();
                 console.log('HTTPS ZXing code reader initialized');
+                watchZXingSpeed(this.codeReader, (ms) => {
+                    console.log(`ZXing takes ${Math.round(ms)} ms per frame, decoding on the server`);
+                    this.useServerDecoding();
+                });
+            }
+            
+            useServerDecoding() {
+                this.serverDecoding = true;
+                if (this.codeReader) {
+                    // Ends the ZXing decode loop but keeps the camera running
+                    this.codeReader.stopAsyncDecode();
+                }
+                if (this.scanning) this.serverDecoder.start();
             }
             
             setupEventListeners() {
                 this.startBtn.addEventListener('click', () => this.startScanning());
                 this.stopBtn.addEventListener('click', () => this.stopScanning());
+                window.addEventListener('online', () => this.flushQueue());
             }
             
             async startScanning() {
@@ -364,6 +387,10 @@ class HTTPSMobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
             
             async scanContinuously() {
                 if (!this.scanning) return;
+                if (this.serverDecoding) {
+                    this.serverDecoder.start();
+                    return;
+                }
                 
                 try {
                     const result = await this.codeReader.decodeOnceFromVideoDevice(undefined, this.video);
@@ -402,28 +429,72 @@ class HTTPSMobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
             }
             
             async sendToBackend(data, format) {
+                // Queue the scan; queued scans go out in batches, so a phone
+                // that was offline or on a slow link catches up in a few requests
+                this.queue.push({
+                    data: data,
+                    format: format,
+                    timestamp: new Date().toISOString(),
+                    source: 'https_mobile'
+                });
+                this.saveQueue();
+                this.flushQueue();
+            }
+            
+            loadQueue() {
+                try {
+                    return JSON.parse(localStorage.getItem(SCAN_QUEUE_KEY)) || [];
+                } catch (error) {
+                    return [];
+                }
+            }
+            
+            saveQueue() {
                 try {
-                    const response = await fetch('/barcode', {
+                    localStorage.setItem(SCAN_QUEUE_KEY, JSON.stringify(this.queue));
+                } catch (error) {
+                    // Storage full or disabled; the queue still lives in memory
+                }
+            }
+            
+            async flushQueue() {
+                if (this.sending || this.queue.length === 0 || !navigator.onLine) return;
+                this.sending = true;
+                
+                const batch = this.queue.slice(0, MAX_BATCH_SIZE);
+                try {
+                    const response = await fetch('/barcodes', {
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({
-                            data: data,
-                            format: format,
-                            timestamp: new Date().toISOString(),
-                            source: 'https_mobile'
-                        })
+                        body: JSON.stringify({ scans: batch })
                     });
                     
-                    if (response.ok) {
-                        console.log('Secure barcode sent successfully');
+                    // 400 means the batch itself is malformed; retrying won't help
+                    if (!response.ok && response.status !== 400) {
+                        throw new Error(`HTTP ${response.status}`);
                     }
+                    
+                    this.queue.splice(0, batch.length);
+                    this.saveQueue();
+                    this.retryDelay = 1000;
+                    console.log(`Sent ${batch.length} barcode(s) to backend`);
                 } catch (error) {
-                    console.log('Backend not available:', error.message);
+                    console.log('Backend not available, keeping scans queued:', error.message);
+                    this.sending = false;
+                    clearTimeout(this.retryTimer);
+                    this.retryTimer = setTimeout(() => this.flushQueue(), this.retryDelay);
+                    this.retryDelay = Math.min(this.retryDelay * 2, 30000);
+                    return;
                 }
+                
+                this.sending = false;
+                // Scans made while this batch was in flight go out together next
+                this.flushQueue();
             }
             
             stopScanning() {
                 this.scanning = false;
+                this.serverDecoder.stop();
                 
                 if (this.codeReader) this.codeReader.reset();
                 if (this.stream) {
@@ -451,13 +522,46 @@ class HTTPSMobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
     </script>
 </body>
 </html>
-        """
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(html_content.encode('utf-8'))
+"""
+
+# Rendered and compressed once at startup
+MOBILE_SCANNER_PAGE = StaticAsset(render_scanner_page(MOBILE_SCANNER_HTML),
+                                  'text/html; charset=utf-8')
+
+
+class HTTPSMobileBarcodeHandler(KeepAliveHandlerMixin, ScannerHandlerMixin,
+                                DecodeHandlerMixin, http.server.SimpleHTTPRequestHandler):
+    def __init__(self, *args, detector=None, vendor_assets=None, decode_pool=None, **kwargs):
+        self.detector = detector or BarcodeDetector()
+        self.vendor_assets = vendor_assets or {}
+        self.decode_pool = decode_pool
+        super().__init__(*args, **kwargs)
+    
+    def do_GET(self):
+        """Handle GET requests"""
+        if self.path == '/':
+            self.serve_mobile_scanner()
+        elif self.path == '/status':
+            self.serve_status_page()
+        elif self.path.startswith('/vendor/'):
+            self.serve_vendor_asset()
+        else:
+            super().do_GET()
+    
+    def do_POST(self):
+        """Handle POST requests"""
+        if self.path == '/barcode':
+            self.handle_barcode_post()
+        elif self.path == '/barcodes':
+            self.handle_barcodes_post()
+        elif self.path == '/decode':
+            self.handle_decode_post()
+        else:
+            self.send_error(404, "Not Found")
+    
+    def serve_mobile_scanner(self):
+        """Serve the mobile scanner HTML page with HTTPS support"""
+        self.send_asset(MOBILE_SCANNER_PAGE)
     
     def serve_status_page(self):
         """Serve status page"""
@@ -497,7 +601,7 @@ class HTTPSMobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
                 <h3>🔍 Recent Secure Detections</h3>
         """
         
-        recent_detections = self.detector.detected_barcodes[-10:]
+        recent_detections = self.detector.get_recent_detections(10)
         if recent_detections:
             for barcode in reversed(recent_detections):
                 html += f"""
@@ -521,17 +625,14 @@ class HTTPSMobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
         </html>
         """
         
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        self.send_html(200, html)
     
     def handle_barcode_post(self):
         """Handle barcode data from mobile device"""
         try:
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
+            post_data = self.read_body()
+            if post_data is None:
+                return
             data = json.loads(post_data.decode('utf-8'))
             
             barcode_info = {
@@ -542,8 +643,6 @@ class HTTPSMobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
                 'source': data.get('source', 'https_mobile')
             }
             
-            self.detector.detected_barcodes.append(barcode_info)
-            
             print(f"\n📱 🔒 HTTPS MOBILE BARCODE DETECTED!")
             print(f"   Type: {barcode_info['type']}")
             print(f"   Data: {barcode_info['data']}")
@@ -558,29 +657,27 @@ class HTTPSMobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
                 'barcode': barcode_info
             }
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
+            self.send_json(200, response)
             
         except Exception as e:
             print(f"Error handling HTTPS barcode POST: {e}")
+            # The body may be partly unread, so don't reuse this connection
+            self.close_connection = True
             
             error_response = {'status': 'error', 'message': str(e)}
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(error_response).encode('utf-8'))
+            self.send_json(500, error_response)
+    
+    def record_barcode_batch(self, payload):
+        """Record a batch of scans buffered on a mobile device"""
+        return record_mobile_barcodes(self.detector, parse_barcode_batch(payload),
+                                      'https_mobile_detections.json', 'https_mobile')
     
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        self.send_body(200, None, b'', {
+            'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+            'Access-Control-Allow-Headers': 'Content-Type'
+        })
 
 
 def get_local_ip():
@@ -626,8 +723,22 @@ def main():
                        help='Host address (default: 0.0.0.0)')
     parser.add_argument('--port', '-p', type=int, default=8443,
                        help='Port number (default: 8443)')
+    parser.add_argument('--profile', choices=sorted(DECODE_PROFILES), default='all',
+                       help='Symbologies to decode (default: all)')
+    parser.add_argument('--history', type=int, default=1000,
+                       help='Number of recent detections kept in memory (default: 1000)')
+    parser.add_argument('--workers', '-w', type=int, default=0,
+                       help='Worker threads for handling requests (default: 0 = one thread per connection)')
+    parser.add_argument('--decode-workers', type=int, default=2,
+                       help='Threads for server-side /decode frame decoding (default: 2, 0 disables)')
+    parser.add_argument('--cache', type=str, nargs='?', const='decode_cache.sqlite', metavar='PATH',
+                       help='Cache /decode results by image content (default PATH: decode_cache.sqlite)')
+    parser.add_argument('--cache-size', type=int, default=64, metavar='MB',
+                       help='Decode cache size limit in MB (default: 64)')
     
     args = parser.parse_args()
+    if args.history < 1:
+        parser.error("--history must be at least 1")
     
     print("🔒 HTTPS Mobile Barcode Scanner Server")
     print("=" * 50)
@@ -645,17 +756,24 @@ def main():
     
     try:
         # Create HTTPS server
-        detector = BarcodeDetector()
+        detector = BarcodeDetector(profile=args.profile, history_size=args.history)
         
+        vendor_assets = load_vendor_assets()
+        decode_pool = create_decode_pool(detector, args.decode_workers,
+                                         cache_path=args.cache, cache_size=args.cache_size)
+
         def handler(*args, **kwargs):
-            return HTTPSMobileBarcodeHandler(*args, detector=detector, **kwargs)
+            return HTTPSMobileBarcodeHandler(*args, detector=detector, vendor_assets=vendor_assets,
+                                             decode_pool=decode_pool, **kwargs)
         
-        httpd = socketserver.TCPServer((args.host, args.port), handler)
+        httpd = create_http_server((args.host, args.port), handler, workers=args.workers)
         
-        # Wrap with SSL
+        # Wrap with SSL. The handshake is deferred to the first read on the
+        # handler thread, so a slow phone cannot stall accept() for everyone.
         context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
         context.load_cert_chain(cert_file, key_file)
-        httpd.socket = context.wrap_socket(httpd.socket, server_side=True)
+        httpd.socket = context.wrap_socket(httpd.socket, server_side=True,
+                                           do_handshake_on_connect=False)
         
         local_ip = get_local_ip()
         
@@ -682,6 +800,9 @@ def main():
         
     except KeyboardInterrupt:
         print("\n👋 HTTPS server stopped")
+        if decode_pool:
+            decode_pool.close()
+        detector.close()
     except Exception as e:
         print(f"\n❌ HTTPS server error: {e}")
 
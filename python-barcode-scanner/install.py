@@ -9,6 +9,8 @@ import sys
 import os
 import importlib
 
+from utils.vendor import fetch_vendor_assets
+
 
 class BarcodeScannerInstaller:
     def __init__(self):
@@ -161,6 +163,14 @@ class BarcodeScannerInstaller:
             else:
                 print(f"✅ Exists: {directory}/")
     
+    def fetch_vendor_libraries(self):
+        """Download the pinned decoder library served to mobile phones"""
+        print("\n📱 Fetching mobile scanner libraries...")
+        
+        if not fetch_vendor_assets():
+            print("⚠️  Mobile pages will load the decoder from the CDN instead")
+            print("💡 Retry later with: python fetch_vendor.py")
+    
     def run_installation(self):
         """Run complete installation process"""
         print("🔧 Python Barcode Scanner Installation")
@@ -186,6 +196,9 @@ class BarcodeScannerInstaller:
         # Create directories
         self.create_test_directories()
         
+        # Vendor the mobile scanner decoder library
+        self.fetch_vendor_libraries()
+        
         print("\n" + "=" * 50)
         print("🎉 Installation completed successfully!")
         print("\n📚 Usage:")
@@ -4,11 +4,10 @@ Mobile Barcode Scanner Server
 Web server to receive barcode data from mobile devices
 
 Usage:
-    python mobile_server.py [--port 8000] [--host 0.0.0.0]
+    python mobile_server.py [--port 8000] [--host 0.0.0.0] [--profile attendance]
 """
 
 import http.server
-import socketserver
 import json
 import os
 import sys
@@ -21,12 +20,224 @@ from datetime import datetime
 # Add utils to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from utils.detector import BarcodeDetector
+from utils.detector import BarcodeDetector, DECODE_PROFILES
+from utils.http_server import (KeepAliveHandlerMixin, ScannerHandlerMixin, StaticAsset,
+                               create_http_server)
+from utils.vendor import load_vendor_assets, render_scanner_page
+from utils.decode_pool import DecodeHandlerMixin, create_decode_pool
 
+# Most scans accepted in one /barcodes request
+MAX_BATCH_SIZE = 500
 
-class MobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, detector=None, **kwargs):
+
+def render_status_page(detector):
+    """
+    Render the status page showing detected barcodes
+    
+    Args:
+        detector: BarcodeDetector holding the detections
+        
+    Returns:
+        str: Status page HTML
+    """
+    stats = detector.get_detection_stats()
+    
+    html = f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Barcode Scanner Status</title>
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <style>
+            body {{ font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }}
+            .container {{ max-width: 800px; margin: 0 auto; background: white; padding: 20px; border-radius: 10px; }}
+            .stats {{ background: #e7f3ff; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
+            .barcode {{ background: #f8f9fa; padding: 10px; margin: 10px 0; border-radius: 5px; border-left: 4px solid #007bff; }}
+            .type {{ font-weight: bold; color: #007bff; }}
+            .data {{ font-family: monospace; background: white; padding: 5px; border-radius: 3px; margin: 5px 0; }}
+            .meta {{ font-size: 0.9em; color: #666; }}
+            .refresh {{ background: #007bff; color: white; padding: 10px 20px; border: none; border-radius: 5px; cursor: pointer; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <h1>📱 Mobile Barcode Scanner Status</h1>
+            
+            <div class="stats">
+                <h3>📊 Statistics</h3>
+                <p><strong>Total Detections:</strong> {stats['total_detections']}</p>
+                <p><strong>Linear Barcodes:</strong> {stats['linear_barcodes']}</p>
+                <p><strong>2D Barcodes:</strong> {stats['matrix_barcodes']}</p>
+            </div>
+            
+            <h3>🔍 Recent Detections</h3>
+    """
+    
+    # Add recent detections
+    recent_detections = detector.get_recent_detections(10)
+    if recent_detections:
+        for barcode in reversed(recent_detections):
+            html += f"""
+            <div class="barcode">
+                <div class="type">{barcode['type']}</div>
+                <div class="data">{barcode['data']}</div>
+                <div class="meta">
+                    Confidence: {barcode['confidence']:.1f}% | 
+                    Time: {barcode['timestamp']}
+                </div>
+            </div>
+            """
+    else:
+        html += "<p>No barcodes detected yet.</p>"
+    
+    html += """
+            <button class="refresh" onclick="location.reload()">🔄 Refresh</button>
+            <p><a href="/">← Back to Scanner</a></p>
+        </div>
+    </body>
+    </html>
+    """
+    
+    return html
+
+
+def load_mobile_scanner(path='mobile_scanner.html'):
+    """
+    Read and compress the mobile scanner page once at startup
+
+    Returns:
+        StaticAsset: The page, or None if the file does not exist
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+    except FileNotFoundError:
+        print(f"⚠️  {path} not found, '/' will return 404")
+        return None
+    return StaticAsset(render_scanner_page(html), 'text/html; charset=utf-8')
+
+
+def build_mobile_barcode(data, source='mobile'):
+    """
+    Build barcode information from a phone's scan payload
+    
+    Args:
+        data: Parsed JSON object for one scan
+        source: Source recorded when the phone does not send one
+        
+    Returns:
+        dict: Barcode information
+    """
+    barcode_info = {
+        'data': data.get('data', ''),
+        'type': data.get('format', 'UNKNOWN'),
+        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'confidence': 95.0,  # Mobile detection is usually reliable
+        'source': data.get('source', source)
+    }
+    
+    # Scans buffered while offline arrive late; keep the phone's scan time
+    if data.get('timestamp'):
+        barcode_info['scanned_at'] = data['timestamp']
+    
+    return barcode_info
+
+
+def record_mobile_barcode(detector, data):
+    """
+    Record a barcode scanned on a mobile device
+    
+    Args:
+        detector: BarcodeDetector holding the detections
+        data: Parsed JSON payload from the phone
+        
+    Returns:
+        dict: Recorded barcode information
+    """
+    barcode_info = build_mobile_barcode(data)
+    
+    # Print to console
+    print(f"\n📱 MOBILE BARCODE DETECTED!")
+    print(f"   Type: {barcode_info['type']}")
+    print(f"   Data: {barcode_info['data']}")
+    print(f"   Time: {barcode_info['timestamp']}")
+    
+    detector.save_detection(barcode_info, 'mobile_detections.json')
+    return barcode_info
+
+
+def parse_barcode_batch(payload):
+    """
+    Extract the list of scans from a /barcodes request body
+    
+    Accepts either a JSON array of scans or an object with a "scans" array.
+    
+    Args:
+        payload: Parsed JSON request body
+        
+    Returns:
+        list: Scan objects
+        
+    Raises:
+        ValueError: If the body is not a batch or holds too many scans
+    """
+    scans = payload.get('scans') if isinstance(payload, dict) else payload
+    if not isinstance(scans, list):
+        raise ValueError("Expected a JSON array of scans")
+    if len(scans) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch holds {len(scans)} scans, the limit is {MAX_BATCH_SIZE}")
+    return scans
+
+
+def record_mobile_barcodes(detector, scans, filename='mobile_detections.json',
+                           source='mobile'):
+    """
+    Record a batch of scans buffered on a mobile device with a single write
+    
+    Args:
+        detector: BarcodeDetector holding the detections
+        scans: List of scan objects from parse_barcode_batch
+        filename: Detection log to append to
+        source: Source recorded when a scan does not name one
+        
+    Returns:
+        dict: Batch response with a result for every scan, in order
+    """
+    results = []
+    accepted = []
+    
+    for index, scan in enumerate(scans):
+        if not isinstance(scan, dict) or not scan.get('data'):
+            results.append({'index': index, 'status': 'error',
+                            'message': 'Scan has no barcode data'})
+            continue
+        
+        barcode_info = build_mobile_barcode(scan, source)
+        accepted.append(barcode_info)
+        results.append({'index': index, 'status': 'success', 'barcode': barcode_info})
+    
+    detector.save_detections(accepted, filename)
+    
+    print(f"\n📱 MOBILE BATCH: {len(accepted)}/{len(scans)} barcodes recorded")
+    for barcode_info in accepted:
+        print(f"   {barcode_info['type']}: {barcode_info['data']}")
+    
+    return {
+        'status': 'success' if len(accepted) == len(scans) else 'partial',
+        'received': len(scans),
+        'accepted': len(accepted),
+        'results': results
+    }
+
+
+class MobileBarcodeHandler(KeepAliveHandlerMixin, ScannerHandlerMixin,
+                           DecodeHandlerMixin, http.server.SimpleHTTPRequestHandler):
+    def __init__(self, *args, detector=None, page=None, vendor_assets=None, decode_pool=None,
+                 **kwargs):
         self.detector = detector or BarcodeDetector()
+        self.page = page
+        self.vendor_assets = vendor_assets or {}
+        self.decode_pool = decode_pool
         super().__init__(*args, **kwargs)
     
     def do_GET(self):
@@ -40,6 +251,9 @@ class MobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
         elif self.path.startswith('/api/'):
             # Handle API requests
             self.handle_api_get()
+        elif self.path.startswith('/vendor/'):
+            # Serve the pinned decoder library
+            self.serve_vendor_asset()
         else:
             # Serve static files
             super().do_GET()
@@ -48,120 +262,40 @@ class MobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
         """Handle POST requests"""
         if self.path == '/barcode':
             self.handle_barcode_post()
+        elif self.path == '/barcodes':
+            self.handle_barcodes_post()
+        elif self.path == '/decode':
+            self.handle_decode_post()
         else:
             self.send_error(404, "Not Found")
     
     def serve_mobile_scanner(self):
         """Serve the mobile scanner HTML page"""
-        try:
-            with open('mobile_scanner.html', 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(content.encode('utf-8'))
-            
-        except FileNotFoundError:
+        if self.page is None:
             self.send_error(404, "Mobile scanner HTML not found")
+            return
+        
+        self.send_asset(self.page)
     
     def serve_status_page(self):
         """Serve a status page showing detected barcodes"""
-        stats = self.detector.get_detection_stats()
-        
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Barcode Scanner Status</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; background: #f5f5f5; }}
-                .container {{ max-width: 800px; margin: 0 auto; background: white; padding: 20px; border-radius: 10px; }}
-                .stats {{ background: #e7f3ff; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-                .barcode {{ background: #f8f9fa; padding: 10px; margin: 10px 0; border-radius: 5px; border-left: 4px solid #007bff; }}
-                .type {{ font-weight: bold; color: #007bff; }}
-                .data {{ font-family: monospace; background: white; padding: 5px; border-radius: 3px; margin: 5px 0; }}
-                .meta {{ font-size: 0.9em; color: #666; }}
-                .refresh {{ background: #007bff; color: white; padding: 10px 20px; border: none; border-radius: 5px; cursor: pointer; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>📱 Mobile Barcode Scanner Status</h1>
-                
-                <div class="stats">
-                    <h3>📊 Statistics</h3>
-                    <p><strong>Total Detections:</strong> {stats['total_detections']}</p>
-                    <p><strong>Linear Barcodes:</strong> {stats['linear_barcodes']}</p>
-                    <p><strong>2D Barcodes:</strong> {stats['matrix_barcodes']}</p>
-                </div>
-                
-                <h3>🔍 Recent Detections</h3>
-        """
+        html = render_status_page(self.detector)
         
-        # Add recent detections
-        recent_detections = self.detector.detected_barcodes[-10:]  # Last 10
-        if recent_detections:
-            for barcode in reversed(recent_detections):
-                html += f"""
-                <div class="barcode">
-                    <div class="type">{barcode['type']}</div>
-                    <div class="data">{barcode['data']}</div>
-                    <div class="meta">
-                        Confidence: {barcode['confidence']:.1f}% | 
-                        Time: {barcode['timestamp']}
-                    </div>
-                </div>
-                """
-        else:
-            html += "<p>No barcodes detected yet.</p>"
-        
-        html += """
-                <button class="refresh" onclick="location.reload()">🔄 Refresh</button>
-                <p><a href="/">← Back to Scanner</a></p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        self.send_html(200, html)
     
     def handle_barcode_post(self):
         """Handle barcode data from mobile device"""
         try:
             # Read POST data
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
+            post_data = self.read_body()
+            if post_data is None:
+                return
             
             # Parse JSON data
             data = json.loads(post_data.decode('utf-8'))
             
-            # Create barcode info object
-            barcode_info = {
-                'data': data.get('data', ''),
-                'type': data.get('format', 'UNKNOWN'),
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'confidence': 95.0,  # Mobile detection is usually reliable
-                'source': 'mobile'
-            }
-            
-            # Add to detector
-            self.detector.detected_barcodes.append(barcode_info)
-            
-            # Print to console
-            print(f"\n📱 MOBILE BARCODE DETECTED!")
-            print(f"   Type: {barcode_info['type']}")
-            print(f"   Data: {barcode_info['data']}")
-            print(f"   Time: {barcode_info['timestamp']}")
-            
-            # Save to file
-            self.detector.save_detection(barcode_info, 'mobile_detections.json')
+            # Record in detector history and save to file
+            barcode_info = record_mobile_barcode(self.detector, data)
             
             # Send success response
             response = {
@@ -170,69 +304,69 @@ class MobileBarcodeHandler(http.server.SimpleHTTPRequestHandler):
                 'barcode': barcode_info
             }
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(response).encode('utf-8'))
+            self.send_json(200, response)
             
         except Exception as e:
             print(f"Error handling barcode POST: {e}")
+            # The body may be partly unread, so don't reuse this connection
+            self.close_connection = True
             
             error_response = {
                 'status': 'error',
                 'message': str(e)
             }
             
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(error_response).encode('utf-8'))
+            self.send_json(500, error_response)
+    
+    def record_barcode_batch(self, payload):
+        """Record a batch of scans buffered on a mobile device"""
+        return record_mobile_barcodes(self.detector, parse_barcode_batch(payload))
     
     def handle_api_get(self):
         """Handle API GET requests"""
         if self.path == '/api/stats':
             stats = self.detector.get_detection_stats()
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(stats).encode('utf-8'))
+            self.send_json(200, stats)
             
         elif self.path == '/api/detections':
-            detections = self.detector.detected_barcodes
+            detections = self.detector.get_detections()
+            
+            self.send_json(200, detections)
             
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(json.dumps(detections).encode('utf-8'))
+        elif self.path == '/api/decode' and self.decode_pool is not None:
+            self.send_json(200, self.decode_pool.get_stats())
             
         else:
             self.send_error(404, "API endpoint not found")
     
     def do_OPTIONS(self):
         """Handle CORS preflight requests"""
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        self.send_body(200, None, b'', {
+            'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+            'Access-Control-Allow-Headers': 'Content-Type'
+        })
 
 
 class MobileBarcodeServer:
-    def __init__(self, host='0.0.0.0', port=8000):
+    def __init__(self, host='0.0.0.0', port=8000, profile='all', history_size=1000,
+                 workers=0, decode_workers=2, cache_path=None, cache_size=64):
         self.host = host
         self.port = port
-        self.detector = BarcodeDetector()
+        self.workers = workers
+        self.detector = BarcodeDetector(profile=profile, history_size=history_size)
+        self.decode_pool = create_decode_pool(self.detector, decode_workers,
+                                              cache_path=cache_path, cache_size=cache_size)
+        self.page = load_mobile_scanner()
+        self.vendor_assets = load_vendor_assets()
         self.server = None
         
     def create_handler(self):
         """Create handler with detector instance"""
         def handler(*args, **kwargs):
-            return MobileBarcodeHandler(*args, detector=self.detector, **kwargs)
+            return MobileBarcodeHandler(*args, detector=self.detector, page=self.page,
+                                        vendor_assets=self.vendor_assets,
+                                        decode_pool=self.decode_pool, **kwargs)
         return handler
 
     def generate_qr_code(self):
@@ -270,7 +404,8 @@ class MobileBarcodeServer:
             self.generate_qr_code()
 
             handler = self.create_handler()
-            self.server = socketserver.TCPServer((self.host, self.port), handler)
+            self.server = create_http_server((self.host, self.port), handler,
+                                             workers=self.workers)
 
             local_ip = get_local_ip()
 
@@ -307,6 +442,9 @@ class MobileBarcodeServer:
             self.server.shutdown()
             self.server.server_close()
             print("👋 Server stopped")
+        if self.decode_pool:
+            self.decode_pool.close()
+        self.detector.close()
 
 
 def get_local_ip():
@@ -332,8 +470,22 @@ def main():
                        help='Port number (default: 8000)')
     parser.add_argument('--open', '-o', action='store_true',
                        help='Open browser automatically')
+    parser.add_argument('--profile', choices=sorted(DECODE_PROFILES), default='all',
+                       help='Symbologies to decode (default: all)')
+    parser.add_argument('--history', type=int, default=1000,
+                       help='Number of recent detections kept in memory (default: 1000)')
+    parser.add_argument('--workers', '-w', type=int, default=0,
+                       help='Worker threads for handling requests (default: 0 = one thread per connection)')
+    parser.add_argument('--decode-workers', type=int, default=2,
+                       help='Threads for server-side /decode frame decoding (default: 2, 0 disables)')
+    parser.add_argument('--cache', type=str, nargs='?', const='decode_cache.sqlite', metavar='PATH',
+                       help='Cache /decode results by image content (default PATH: decode_cache.sqlite)')
+    parser.add_argument('--cache-size', type=int, default=64, metavar='MB',
+                       help='Decode cache size limit in MB (default: 64)')
     
     args = parser.parse_args()
+    if args.history < 1:
+        parser.error("--history must be at least 1")
     
     # Get local IP for mobile access
     local_ip = get_local_ip()
@@ -344,7 +496,10 @@ def main():
     print(f"   Use the network URL on your mobile device")
     
     # Create and start server
-    server = MobileBarcodeServer(host=args.host, port=args.port)
+    server = MobileBarcodeServer(host=args.host, port=args.port, profile=args.profile,
+                                 history_size=args.history, workers=args.workers,
+                                 decode_workers=args.decode_workers, cache_path=args.cache,
+                                 cache_size=args.cache_size)
     server.start_server()
 
 
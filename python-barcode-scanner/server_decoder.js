@@ -0,0 +1,116 @@
+        // Server-side decoding for phones where ZXing failed to load or is too
+        // slow: downscaled JPEG frames are uploaded to POST /decode instead.
+        // Inlined into the scanner pages by utils.vendor.render_scanner_page.
+        const SERVER_DECODE_MAX_DIM = 960;
+        const SERVER_DECODE_QUALITY = 0.7;
+        const SERVER_DECODE_INTERVAL = 500;
+        // ZXing averaging more than this per frame counts as too slow
+        const ZXING_SLOW_MS = 250;
+        const ZXING_SLOW_SAMPLES = 10;
+
+        class ServerFrameDecoder {
+            constructor(video, onResult, onStatus) {
+                this.video = video;
+                this.onResult = onResult;
+                this.onStatus = onStatus;
+                this.canvas = document.createElement('canvas');
+                this.running = false;
+                this.disabled = false;
+                this.timer = null;
+            }
+
+            start() {
+                if (this.running || this.disabled) return;
+                this.running = true;
+                this.schedule(0);
+            }
+
+            stop() {
+                this.running = false;
+                clearTimeout(this.timer);
+            }
+
+            schedule(delay) {
+                clearTimeout(this.timer);
+                this.timer = setTimeout(() => this.decodeFrame(), delay);
+            }
+
+            captureFrame() {
+                const width = this.video.videoWidth;
+                const height = this.video.videoHeight;
+                if (!width || !height) return Promise.resolve(null);
+
+                const scale = Math.min(1, SERVER_DECODE_MAX_DIM / Math.max(width, height));
+                this.canvas.width = Math.round(width * scale);
+                this.canvas.height = Math.round(height * scale);
+                this.canvas.getContext('2d').drawImage(this.video, 0, 0,
+                                                       this.canvas.width, this.canvas.height);
+                return new Promise((resolve) => {
+                    this.canvas.toBlob(resolve, 'image/jpeg', SERVER_DECODE_QUALITY);
+                });
+            }
+
+            async decodeFrame() {
+                if (!this.running) return;
+                let delay = SERVER_DECODE_INTERVAL;
+
+                try {
+                    const frame = await this.captureFrame();
+                    if (frame) {
+                        const response = await fetch('/decode', {
+                            method: 'POST',
+                            headers: { 'Content-Type': 'image/jpeg' },
+                            body: frame
+                        });
+
+                        if (response.status === 404) {
+                            this.disabled = true;
+                            this.stop();
+                            this.onStatus('❌ Decoder unavailable on this phone and server', 'error');
+                            return;
+                        }
+
+                        if (response.status === 503) {
+                            // Server busy; wait as long as it asks
+                            delay = 1000 * (parseInt(response.headers.get('Retry-After'), 10) || 1);
+                        } else if (response.ok) {
+                            const result = await response.json();
+                            if (this.running && result.barcodes.length > 0) {
+                                const barcode = result.barcodes[0];
+                                this.onResult({ text: barcode.data, format: barcode.type });
+                                delay = 1000;
+                            }
+                        }
+                    }
+                } catch (error) {
+                    console.log('Server decode failed:', error.message);
+                    delay = 2000;
+                }
+
+                if (this.running) this.schedule(delay);
+            }
+        }
+
+        // Time ZXing's per-frame decodes and call onSlow once if they average
+        // more than ZXING_SLOW_MS
+        function watchZXingSpeed(codeReader, onSlow) {
+            const method = typeof codeReader.decode === 'function' ? 'decode' : 'decodeBitmap';
+            const decode = codeReader[method].bind(codeReader);
+            const times = [];
+            let reported = false;
+
+            codeReader[method] = (...args) => {
+                const start = performance.now();
+                try {
+                    return decode(...args);
+                } finally {
+                    times.push(performance.now() - start);
+                    if (times.length > ZXING_SLOW_SAMPLES) times.shift();
+                    const average = times.reduce((sum, time) => sum + time, 0) / times.length;
+                    if (!reported && times.length === ZXING_SLOW_SAMPLES && average > ZXING_SLOW_MS) {
+                        reported = true;
+                        onSlow(average);
+                    }
+                }
+            };
+        }
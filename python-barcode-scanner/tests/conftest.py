@@ -0,0 +1,53 @@
+"""
+Test configuration
+Make the scanner modules importable the same way the scripts import them
+"""
+
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_server import ThreadingHTTPServer
+
+
+@pytest.fixture
+def start_server():
+    """Start HTTP servers on free local ports, shutting them down afterwards"""
+    servers = []
+
+    def start(handler_class, server_class=ThreadingHTTPServer, **kwargs):
+        server = server_class(('127.0.0.1', 0), handler_class, **kwargs)
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+        servers.append(server)
+        return server.server_address
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def raw_post(address, path, headers=b'', body=b''):
+    """
+    Send a raw POST request, bypassing client-side header checks
+
+    Returns:
+        int: Response status code
+    """
+    request = (b'POST ' + path.encode() + b' HTTP/1.1\r\nHost: test\r\n' +
+               headers + b'\r\n' + body)
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(request)
+        response = sock.makefile('rb').readline()
+    return int(response.split()[1])
+
+
+@pytest.fixture
+def post():
+    """The raw_post helper"""
+    return raw_post
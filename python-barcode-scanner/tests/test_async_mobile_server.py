@@ -0,0 +1,62 @@
+"""
+Tests for the asyncio server's request parsing
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip('pyzbar.pyzbar', exc_type=ImportError)
+
+from async_mobile_server import AsyncMobileBarcodeServer, RequestError
+from utils.http_server import MAX_JSON_BODY_BYTES
+
+
+@pytest.fixture
+def server():
+    server = AsyncMobileBarcodeServer(decode_workers=0, max_body=8 * MAX_JSON_BODY_BYTES)
+    yield server
+    server.close()
+
+
+def read_request(server, data):
+    """Parse raw request bytes with AsyncMobileBarcodeServer.read_request"""
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await server.read_request(reader)
+    return asyncio.run(read())
+
+
+def request_status(server, data):
+    with pytest.raises(RequestError) as error:
+        read_request(server, data)
+    return error.value.status
+
+
+def test_read_request(server):
+    method, path, version, headers, body = read_request(
+        server, b'POST /barcodes HTTP/1.1\r\nContent-Length: 2\r\n\r\n[]')
+    assert (method, path, version, body) == ('POST', '/barcodes', 'HTTP/1.1', b'[]')
+    assert headers['content-length'] == '2'
+
+
+def test_negative_content_length(server):
+    assert request_status(server, b'POST /barcodes HTTP/1.1\r\nContent-Length: -1\r\n\r\n') == 400
+    assert request_status(server, b'POST /decode HTTP/1.1\r\nContent-Length: -5\r\n\r\n') == 400
+
+
+def test_json_routes_use_json_limit(server):
+    length = b'Content-Length: %d\r\n\r\n' % (MAX_JSON_BODY_BYTES + 1)
+    assert request_status(server, b'POST /barcodes HTTP/1.1\r\n' + length) == 413
+    assert request_status(server, b'POST /barcode HTTP/1.1\r\n' + length) == 413
+
+
+def test_decode_uses_max_body(server):
+    body = b'x' * (MAX_JSON_BODY_BYTES + 1)
+    request = b'POST /decode HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % len(body) + body
+    assert read_request(server, request)[4] == body
+
+    length = b'Content-Length: %d\r\n\r\n' % (server.max_body + 1)
+    assert request_status(server, b'POST /decode HTTP/1.1\r\n' + length) == 413
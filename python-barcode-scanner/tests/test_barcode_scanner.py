@@ -0,0 +1,82 @@
+"""
+Tests for the CLI scanner's frame processing and keyboard commands
+"""
+
+import itertools
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip('pyzbar.pyzbar', exc_type=ImportError)
+
+from barcode_scanner import BarcodeScanner
+
+
+@pytest.fixture
+def scanner(monkeypatch, tmp_path):
+    """Scanner whose detector reports a new barcode on every frame"""
+    monkeypatch.chdir(tmp_path)
+    scanner = BarcodeScanner(motion_gate=False, track_roi=False, history_size=1000)
+    counter = itertools.count()
+
+    monkeypatch.setattr(scanner.detector, 'detect_barcodes',
+                        lambda frame, source='default': [next(counter)])
+    monkeypatch.setattr(scanner.detector, 'process_barcode', lambda n: {
+        'data': f'STU{n:05d}', 'type': 'CODE39', 'rect': (0, 0, 10, 10),
+        'confidence': 90.0, 'timestamp': '2024-03-01 09:15:00'
+    })
+    monkeypatch.setattr(scanner.detector, 'is_supported_barcode', lambda info: True)
+    monkeypatch.setattr(scanner.detector, 'validate_barcode_data', lambda info: True)
+    monkeypatch.setattr(scanner.display, 'draw_detection_overlay', lambda frame, info: frame)
+    monkeypatch.setattr('builtins.print', lambda *args, **kwargs: None)
+    yield scanner
+    scanner.detector.close()
+
+
+def test_process_frame_records_detections(scanner):
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    _, detected = scanner.process_frame(frame)
+    scanner.process_frame(frame)
+
+    assert [info['data'] for info in detected] == ['STU00000']
+    assert [record.data for record in scanner.detected_barcodes] == ['STU00000', 'STU00001']
+    assert len(scanner.last_overlays) == 1
+
+
+def test_commands_while_decoding(scanner, monkeypatch):
+    """Save and clear run on the render thread while frames are decoded"""
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    for _ in range(20):
+        scanner.process_frame(frame)
+
+    def slow_export(detections, filename):
+        # Iterate slowly so the decode thread appends part way through
+        for _ in detections:
+            time.sleep(0.001)
+
+    monkeypatch.setattr(scanner.detector, 'export_detections', slow_export)
+    stop = threading.Event()
+    errors = []
+
+    def decode_loop():
+        try:
+            while not stop.is_set():
+                scanner.process_frame(frame)
+                time.sleep(0.001)
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=decode_loop)
+    thread.start()
+    try:
+        for _ in range(5):
+            scanner.save_detections_manual()
+            scanner.clear_detections()
+            time.sleep(0.02)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert errors == []
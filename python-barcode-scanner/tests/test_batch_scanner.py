@@ -0,0 +1,168 @@
+"""
+Tests for batch scanning of directories and archives
+"""
+
+import zipfile
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip('pyzbar.pyzbar', exc_type=ImportError)
+
+from batch_scanner import BatchBarcodeScanner
+from test_media import corrupt_zip
+from utils.checkpoint import ScanCheckpoint
+from utils.result_writers import ScanSummary
+
+
+def png_bytes():
+    return cv2.imencode('.png', np.full((40, 60), 255, dtype=np.uint8))[1].tobytes()
+
+
+@pytest.fixture
+def quiet(monkeypatch):
+    monkeypatch.setattr('builtins.print', lambda *args, **kwargs: None)
+
+
+class ListWriter:
+    """Collects results like a ResultWriter"""
+
+    def __init__(self):
+        self.results = []
+        self.summary = ScanSummary()
+
+    def write(self, result):
+        self.results.append(result)
+        self.summary.add(result)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_archive_with_corrupt_member(tmp_path, quiet, workers):
+    path = tmp_path / 'images.zip'
+    corrupt_zip(path)
+    with zipfile.ZipFile(path, 'a') as archive:
+        archive.writestr('scan.png', png_bytes())
+
+    scanner = BatchBarcodeScanner(workers=workers)
+    writer = ListWriter()
+    summary = scanner.scan_archive(str(path), writer=writer)
+    scanner.close()
+
+    assert [r['file'] for r in writer.results] == [f'{path}!bad.png', f'{path}!good.png',
+                                                   f'{path}!scan.png']
+    assert writer.results[0]['status'] == 'error'
+    assert 'Could not read archive member' in writer.results[0]['error']
+    assert writer.results[2]['status'] == 'success'
+    assert summary['total_files'] == 3
+    assert summary['successful_scans'] == 1
+
+
+def make_images(directory, count):
+    directory.mkdir(exist_ok=True)
+    for i in range(count):
+        (directory / f'scan_{i:02d}.png').write_bytes(png_bytes())
+    return sorted(str(path) for path in directory.iterdir())
+
+
+def test_parallel_scan_keeps_order(tmp_path, quiet):
+    images = make_images(tmp_path / 'images', 10)
+    (tmp_path / 'images' / 'scan_05.png').write_bytes(b'not an image')
+
+    writers = {}
+    for workers in (1, 2):
+        scanner = BatchBarcodeScanner(workers=workers)
+        writers[workers] = ListWriter()
+        summary = scanner.scan_directory(str(tmp_path / 'images'), writer=writers[workers])
+        scanner.close()
+        assert (summary['total_files'], summary['failed_scans']) == (10, 1)
+
+    assert [r['file'] for r in writers[2].results] == images
+    assert ([r['status'] for r in writers[2].results] ==
+            [r['status'] for r in writers[1].results])
+    assert writers[2].results[5]['status'] == 'error'
+
+
+def test_parallel_scan_window_is_bounded(tmp_path):
+    consumed = 0
+
+    def tasks():
+        nonlocal consumed
+        for i in range(50):
+            consumed += 1
+            yield f'scan_{i}.png', png_bytes()
+
+    scanner = BatchBarcodeScanner(workers=2)
+    results = scanner.iter_scan(tasks())
+    assert next(results)['file'] == 'scan_0.png'
+    assert consumed == 2 * 4
+
+    # Stopping early terminates the pool instead of scanning the rest
+    results.close()
+    assert consumed == 2 * 4
+    scanner.close()
+
+
+def scan_with_checkpoint(scan, path, checkpoint_path, resume):
+    """Run scan(path, writer, checkpoint), returning the summary and writer"""
+    scanner = BatchBarcodeScanner()
+    checkpoint = ScanCheckpoint(str(checkpoint_path), resume=resume)
+    writer = ListWriter()
+    try:
+        summary = scan(scanner, str(path), writer=writer, checkpoint=checkpoint)
+    finally:
+        checkpoint.close()
+        scanner.close()
+    return summary, writer
+
+
+def test_directory_resume(tmp_path, quiet):
+    images = make_images(tmp_path / 'images', 3)
+    checkpoint_path = tmp_path / 'scan.checkpoint'
+    scan = BatchBarcodeScanner.scan_directory
+
+    _, writer = scan_with_checkpoint(scan, tmp_path / 'images', checkpoint_path, False)
+    assert len(writer.results) == 3
+
+    # A new file and an edited one are scanned; the rest are skipped
+    new_image = tmp_path / 'images' / 'scan_03.png'
+    new_image.write_bytes(png_bytes())
+    with open(images[0], 'ab') as f:
+        f.write(b'\0')
+    summary, writer = scan_with_checkpoint(scan, tmp_path / 'images', checkpoint_path, True)
+
+    assert [r['file'] for r in writer.results] == [images[0], str(new_image)]
+    assert summary['total_files'] == 4
+    assert writer.summary.total_files == 4
+
+    summary, writer = scan_with_checkpoint(scan, tmp_path / 'images', checkpoint_path, True)
+    assert writer.results == []
+    assert summary['total_files'] == 4
+
+
+def test_directory_without_resume_rescans(tmp_path, quiet):
+    make_images(tmp_path / 'images', 2)
+    checkpoint_path = tmp_path / 'scan.checkpoint'
+    scan = BatchBarcodeScanner.scan_directory
+
+    scan_with_checkpoint(scan, tmp_path / 'images', checkpoint_path, False)
+    summary, writer = scan_with_checkpoint(scan, tmp_path / 'images', checkpoint_path, False)
+
+    assert len(writer.results) == 2
+    assert summary['total_files'] == 2
+
+
+def test_archive_resume(tmp_path, quiet):
+    path = tmp_path / 'images.zip'
+    corrupt_zip(path)
+    checkpoint_path = tmp_path / 'scan.checkpoint'
+    scan = BatchBarcodeScanner.scan_archive
+
+    scan_with_checkpoint(scan, path, checkpoint_path, False)
+    with zipfile.ZipFile(path, 'a') as archive:
+        archive.writestr('scan.png', png_bytes())
+    summary, writer = scan_with_checkpoint(scan, path, checkpoint_path, True)
+
+    # The unreadable member is tried again, good.png is skipped
+    assert [r['file'] for r in writer.results] == [f'{path}!bad.png', f'{path}!scan.png']
+    assert summary['total_files'] == 3
@@ -0,0 +1,116 @@
+"""
+Tests for resumable batch scan checkpoints
+"""
+
+import os
+
+from utils.checkpoint import ScanCheckpoint
+from utils.result_writers import ScanSummary
+
+
+def make_images(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f'image_{i}.png'
+        path.write_bytes(b'x' * (i + 1))
+        paths.append(str(path))
+    return paths
+
+
+def result(status='success', barcodes=1):
+    return {'status': status, 'total_barcodes': barcodes, 'code39_barcodes': barcodes}
+
+
+def test_file_key(tmp_path):
+    path = make_images(tmp_path, 1)[0]
+    key = ScanCheckpoint.file_key(path)
+    assert key == (os.path.abspath(path), 1, os.stat(path).st_mtime_ns)
+
+
+def test_filter_pending_skips_done_files(tmp_path):
+    images = make_images(tmp_path, 3)
+    checkpoint = ScanCheckpoint(str(tmp_path / 'scan.checkpoint'))
+    checkpoint.mark_done(checkpoint.file_key(images[0]), result())
+
+    keys = {}
+    assert list(checkpoint.filter_pending(images, keys)) == images[1:]
+    assert set(keys) == set(images[1:])
+    assert keys[images[1]] == checkpoint.file_key(images[1])
+    checkpoint.close()
+
+
+def test_filter_pending_passes_missing_files(tmp_path):
+    checkpoint = ScanCheckpoint(str(tmp_path / 'scan.checkpoint'))
+    missing = str(tmp_path / 'missing.png')
+    assert list(checkpoint.filter_pending([missing])) == [missing]
+    checkpoint.close()
+
+
+def test_resume_keeps_entries(tmp_path):
+    images = make_images(tmp_path, 2)
+    path = str(tmp_path / 'scan.checkpoint')
+    checkpoint = ScanCheckpoint(path)
+    checkpoint.mark_done(checkpoint.file_key(images[0]), result())
+    checkpoint.close()
+
+    resumed = ScanCheckpoint(path, resume=True)
+    assert list(resumed.filter_pending(images)) == images[1:]
+    resumed.close()
+
+    restarted = ScanCheckpoint(path)
+    assert list(restarted.filter_pending(images)) == images
+    restarted.close()
+
+
+def test_changed_file_is_rescanned(tmp_path):
+    image = make_images(tmp_path, 1)[0]
+    checkpoint = ScanCheckpoint(str(tmp_path / 'scan.checkpoint'))
+    checkpoint.mark_done(checkpoint.file_key(image), result())
+
+    stat = os.stat(image)
+    os.utime(image, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert list(checkpoint.filter_pending([image])) == [image]
+    checkpoint.close()
+
+
+def test_stale_result(tmp_path):
+    image = make_images(tmp_path, 1)[0]
+    checkpoint = ScanCheckpoint(str(tmp_path / 'scan.checkpoint'))
+    key = checkpoint.file_key(image)
+    checkpoint.mark_done(key, result(barcodes=2))
+    assert checkpoint.stale_result(key) is None
+
+    with open(image, 'ab') as f:
+        f.write(b'x')
+    assert checkpoint.stale_result(checkpoint.file_key(image)) == result(barcodes=2)
+    checkpoint.close()
+
+
+def test_add_to_summary(tmp_path):
+    images = make_images(tmp_path, 3)
+    checkpoint = ScanCheckpoint(str(tmp_path / 'scan.checkpoint'))
+    checkpoint.mark_done(checkpoint.file_key(images[0]), result(barcodes=2))
+    checkpoint.mark_done(checkpoint.file_key(images[1]), result(barcodes=0))
+    checkpoint.mark_done(checkpoint.file_key(images[2]), {'status': 'error'})
+
+    summary = ScanSummary()
+    summary.add({'status': 'success', 'total_barcodes': 1, 'code39_barcodes': 0})
+    checkpoint.add_to_summary(summary)
+    checkpoint.close()
+
+    assert summary.as_dict() == {
+        'total_files': 4,
+        'successful_scans': 3,
+        'failed_scans': 1,
+        'total_barcodes': 3,
+        'code39_barcodes': 2,
+        'other_barcodes': 1
+    }
+
+
+def test_add_to_summary_empty(tmp_path):
+    checkpoint = ScanCheckpoint(str(tmp_path / 'scan.checkpoint'))
+    summary = ScanSummary()
+    checkpoint.add_to_summary(summary)
+    checkpoint.close()
+    assert summary.total_files == 0
@@ -0,0 +1,147 @@
+"""
+Tests for the content-hash decode cache
+"""
+
+from collections import namedtuple
+from types import SimpleNamespace
+
+import pytest
+
+from utils import decode_cache
+from utils.decode_cache import EVICT_INTERVAL, DecodeCache, detector_version
+
+# Same fields as pyzbar's result type, which needs the zbar library
+Decoded = namedtuple('Decoded', 'data type rect polygon quality orientation')
+Rect = namedtuple('Rect', 'left top width height')
+Point = namedtuple('Point', 'x y')
+
+
+def make_barcode(data=b'STU001'):
+    rect = Rect(10, 20, 100, 30)
+    polygon = [Point(10, 20), Point(110, 20), Point(110, 50), Point(10, 50)]
+    return Decoded(data=data, type='CODE39', rect=rect, polygon=polygon,
+                   quality=1, orientation='UP')
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Advance the cache's clock by one second per call, so LRU order is exact"""
+    now = [1000.0]
+
+    def tick():
+        now[0] += 1
+        return now[0]
+
+    monkeypatch.setattr(decode_cache, 'time', SimpleNamespace(time=tick))
+
+
+def open_cache(tmp_path, version='v1', **limits):
+    return DecodeCache(str(tmp_path / 'cache.sqlite'), version, **limits)
+
+
+def cached_images(cache):
+    return cache.conn.execute('SELECT COUNT(*) FROM decodes').fetchone()[0]
+
+
+def test_round_trip(tmp_path):
+    cache = open_cache(tmp_path)
+    barcode = make_barcode()
+    cache.put(b'image-1', [barcode], {'width': 640, 'height': 480})
+
+    barcodes, info = cache.get(b'image-1')
+    assert barcodes == [barcode]
+    assert info == {'width': 640, 'height': 480}
+    cache.close()
+
+
+def test_hit_and_miss_counters(tmp_path):
+    cache = open_cache(tmp_path)
+    assert cache.get(b'image-1') is None
+    cache.put(b'image-1', [])
+    assert cache.get(b'image-1') == ([], {})
+    assert cache.get(b'image-1') == ([], {})
+
+    assert cache.get_stats() == {
+        'cache_hits': 2,
+        'cache_misses': 1,
+        'cache_hit_rate': 0.667
+    }
+    cache.close()
+
+
+def test_empty_stats(tmp_path):
+    cache = open_cache(tmp_path)
+    assert cache.get_stats()['cache_hit_rate'] == 0.0
+    cache.close()
+
+
+def test_version_invalidation(tmp_path):
+    cache = open_cache(tmp_path, version='v1')
+    cache.put(b'image-1', [make_barcode()])
+    cache.close()
+
+    other = open_cache(tmp_path, version='v2')
+    assert other.get(b'image-1') is None
+    other.close()
+
+    cache = open_cache(tmp_path, version='v1')
+    assert cache.get(b'image-1') is not None
+    cache.close()
+
+
+def test_detector_version():
+    detector = SimpleNamespace(mode='cascade', profile='all', pass_order=('original', 'blur'),
+                               adaptive=True, prune_below=0.05)
+    version = detector_version(detector, max_dim=1280)
+
+    assert version == detector_version(detector, max_dim=1280)
+    assert version != detector_version(detector, max_dim=640)
+    detector.profile = 'attendance'
+    assert version != detector_version(detector, max_dim=1280)
+
+
+def test_evicts_least_recently_used_by_count(tmp_path, clock):
+    cache = open_cache(tmp_path, max_entries=3)
+    for name in (b'a', b'b', b'c'):
+        cache.put(name, [])
+    # Using 'a' makes 'b' the least recently used
+    assert cache.get(b'a') is not None
+    cache.put(b'd', [])
+    cache._evict()
+
+    assert cached_images(cache) == 3
+    assert cache.get(b'b') is None
+    for name in (b'a', b'c', b'd'):
+        assert cache.get(name) is not None
+    cache.close()
+
+
+def test_evicts_least_recently_used_by_bytes(tmp_path, clock):
+    cache = open_cache(tmp_path)
+    cache.put(b'a', [make_barcode()])
+    entry_size = cache.conn.execute('SELECT size FROM decodes').fetchone()[0]
+    cache.max_bytes = 2 * entry_size
+
+    cache.put(b'b', [make_barcode()])
+    assert cache.get(b'a') is not None
+    cache.put(b'c', [make_barcode()])
+    cache._evict()
+
+    assert cached_images(cache) == 2
+    assert cache.get(b'b') is None
+    assert cache.get(b'a') is not None
+    assert cache.get(b'c') is not None
+    cache.close()
+
+
+def test_evicts_every_interval(tmp_path, clock):
+    cache = open_cache(tmp_path, max_entries=10)
+    for i in range(EVICT_INTERVAL - 1):
+        cache.put(b'image-%d' % i, [])
+    assert cached_images(cache) == EVICT_INTERVAL - 1
+
+    cache.put(b'last', [])
+    assert cached_images(cache) == 10
+    assert cache.get(b'last') is not None
+    assert cache.get(b'image-0') is None
+    cache.close()
@@ -0,0 +1,196 @@
+"""
+Tests for server-side frame decoding
+"""
+
+import http.server
+import threading
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip('pyzbar.pyzbar', exc_type=ImportError)
+
+from pyzbar.locations import Point, Rect
+from pyzbar.pyzbar import Decoded
+
+from utils.decode_pool import (MAX_DECODE_BYTES, DecodeHandlerMixin, DecodePool,
+                               DecodeQueueFull, create_decode_pool, percentile)
+from utils.detector import BarcodeDetector
+from utils.http_server import KeepAliveHandlerMixin
+
+
+class StubPool:
+    """Stands in for DecodePool in handler tests"""
+    busy = False
+
+    def decode(self, data, source='decode'):
+        if self.busy:
+            raise DecodeQueueFull(retry_after=3)
+        if not data.startswith(b'\xff\xd8'):
+            raise ValueError("Could not decode image")
+        return {'barcodes': [], 'size': len(data)}
+
+
+class DecodeHandler(KeepAliveHandlerMixin, DecodeHandlerMixin,
+                    http.server.BaseHTTPRequestHandler):
+    decode_pool = StubPool()
+
+    def do_POST(self):
+        self.handle_decode_post()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def decode_server(start_server):
+    DecodeHandler.decode_pool = StubPool()
+    return start_server(DecodeHandler)
+
+
+def jpeg_headers(body):
+    return b'Content-Type: image/jpeg\r\nContent-Length: %d\r\n' % len(body)
+
+
+def test_decode_post(decode_server, post):
+    body = b'\xff\xd8' + b'\0' * 100
+    assert post(decode_server, '/decode', jpeg_headers(body), body) == 200
+
+
+def test_decode_post_bad_image(decode_server, post):
+    assert post(decode_server, '/decode', jpeg_headers(b'text'), b'text') == 400
+
+
+def test_decode_post_busy(decode_server, post):
+    DecodeHandler.decode_pool.busy = True
+    body = b'\xff\xd8'
+    assert post(decode_server, '/decode', jpeg_headers(body), body) == 503
+
+
+def test_decode_post_disabled(decode_server, post):
+    DecodeHandler.decode_pool = None
+    assert post(decode_server, '/decode', jpeg_headers(b''), b'') == 404
+
+
+def test_decode_post_body_limits(decode_server, post):
+    assert post(decode_server, '/decode', b'') == 411
+    assert post(decode_server, '/decode', b'Content-Length: -1\r\n', b'\xff\xd8' * 1000) == 400
+    assert post(decode_server, '/decode',
+                b'Content-Length: %d\r\n' % (MAX_DECODE_BYTES + 1)) == 413
+
+
+def png_bytes():
+    return cv2.imencode('.png', np.full((40, 60), 255, dtype=np.uint8))[1].tobytes()
+
+
+def test_create_decode_pool_disabled():
+    assert create_decode_pool(BarcodeDetector(), 0) is None
+
+
+def test_create_decode_pool_with_cache(tmp_path):
+    detector = BarcodeDetector()
+    pool = create_decode_pool(detector, 1, cache_path=str(tmp_path / 'cache.sqlite'))
+    try:
+        first = pool.decode(png_bytes())
+        second = pool.decode(png_bytes())
+        assert (first['cached'], second['cached']) == (False, True)
+        assert pool.get_stats()['cache_hits'] == 1
+    finally:
+        pool.close()
+
+
+class StubDetector(BarcodeDetector):
+    """BarcodeDetector whose zbar pass returns canned barcodes"""
+
+    def __init__(self, barcodes=()):
+        super().__init__()
+        self.barcodes = list(barcodes)
+        self.shapes = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def detect_barcodes(self, frame, source='default'):
+        self.shapes.append(frame.shape)
+        self.release.wait(5)
+        return list(self.barcodes)
+
+
+def make_barcode(data=b'STU001', rect=(100, 50, 200, 40)):
+    left, top, width, height = rect
+    return Decoded(data, 'CODE39', Rect(*rect),
+                   [Point(left, top), Point(left + width, top + height)], 1, 'UP')
+
+
+@pytest.fixture
+def pools():
+    """Create decode pools, closing them afterwards"""
+    created = []
+
+    def create(detector, **kwargs):
+        pool = DecodePool(detector, **kwargs)
+        created.append((pool, detector))
+        return pool
+
+    yield create
+    for pool, detector in created:
+        detector.release.set()
+        pool.close()
+
+
+def test_pool_maps_downscaled_rects(pools):
+    detector = StubDetector([make_barcode(), make_barcode(b'\xff\xfe')])
+    pool = pools(detector, workers=1, max_dim=1280)
+    image = cv2.imencode('.png', np.full((1920, 2560), 255, dtype=np.uint8))[1].tobytes()
+
+    result = pool.decode(image)
+
+    assert detector.shapes == [(960, 1280)]
+    assert (result['width'], result['height'], result['scale']) == (2560, 1920, 2.0)
+    assert [b['data'] for b in result['barcodes']] == ['STU001']
+    assert result['barcodes'][0]['rect'] == (200, 100, 400, 80)
+    assert result['cached'] is False
+    assert result['decode_ms'] >= 0
+
+
+def test_pool_rejects_unreadable_image(pools):
+    pool = pools(StubDetector(), workers=1)
+    with pytest.raises(ValueError):
+        pool.decode(b'not an image')
+    assert pool.get_stats()['failed'] == 1
+
+
+def test_pool_queue_full(pools):
+    detector = StubDetector()
+    detector.release.clear()
+    pool = pools(detector, workers=1, max_pending=2)
+
+    futures = [pool.submit(png_bytes()) for _ in range(2)]
+    with pytest.raises(DecodeQueueFull) as error:
+        pool.submit(png_bytes())
+    assert error.value.retry_after >= 1
+
+    detector.release.set()
+    assert all(future.result(timeout=5)['barcodes'] == [] for future in futures)
+    pool.decode(png_bytes())
+
+    stats = pool.get_stats()
+    assert (stats['submitted'], stats['completed'], stats['rejected']) == (3, 3, 1)
+    assert stats['p50_decode_ms'] <= stats['p95_decode_ms'] <= stats['max_decode_ms']
+
+
+def test_retry_after_follows_decode_time(pools):
+    pool = pools(StubDetector(), workers=2, max_pending=8)
+    assert pool.retry_after() == 2
+
+    pool.completed, pool.total_time = 4, 2.0
+    assert pool.retry_after() == 2
+    pool.completed, pool.total_time = 1, 3.0
+    assert pool.retry_after() == 12
+
+
+def test_percentile():
+    assert percentile([], 50) == 0.0
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 95) == 4
+    assert percentile([5], 1) == 5
@@ -0,0 +1,82 @@
+"""
+Tests for the decode service's path requests and limits
+"""
+
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip('pyzbar.pyzbar', exc_type=ImportError)
+
+from decode_service import MAX_PATH_REQUEST_BYTES, DecodeService
+
+
+@pytest.fixture
+def make_service(start_server):
+    """Start a decode service, returning (service, address)"""
+    services = []
+
+    def make(**kwargs):
+        service = DecodeService(workers=1, **kwargs)
+        services.append(service)
+        return service, start_server(service.create_handler())
+
+    yield make
+    for service in services:
+        service.close()
+
+
+def post_path(post, address, path):
+    body = json.dumps({'path': str(path)}).encode()
+    headers = b'Content-Type: application/json\r\nContent-Length: %d\r\n' % len(body)
+    return post(address, '/decode', headers, body)
+
+
+def test_path_requests_need_a_root(make_service, post, tmp_path):
+    _, address = make_service()
+    assert post_path(post, address, tmp_path / 'scan.png') == 403
+
+
+def test_path_outside_root(make_service, post, tmp_path):
+    (tmp_path / 'uploads').mkdir()
+    _, address = make_service(path_root=str(tmp_path / 'uploads'))
+    assert post_path(post, address, tmp_path / 'secret.png') == 400
+
+
+def test_path_missing_file(make_service, post, tmp_path):
+    _, address = make_service(path_root=str(tmp_path))
+    assert post_path(post, address, tmp_path / 'missing.png') == 404
+
+
+def test_path_decode(make_service, post, tmp_path):
+    cv2.imwrite(str(tmp_path / 'scan.png'), np.full((40, 60), 255, dtype=np.uint8))
+    _, address = make_service(path_root=str(tmp_path))
+    assert post_path(post, address, tmp_path / 'scan.png') == 200
+
+
+def test_path_unreadable_image(make_service, post, tmp_path):
+    (tmp_path / 'scan.png').write_bytes(b'not an image')
+    _, address = make_service(path_root=str(tmp_path))
+    assert post_path(post, address, tmp_path / 'scan.png') == 400
+
+
+def test_path_image_too_large(make_service, post, tmp_path):
+    (tmp_path / 'scan.png').write_bytes(b'x' * 2048)
+    _, address = make_service(path_root=str(tmp_path), max_bytes=1024)
+    assert post_path(post, address, tmp_path / 'scan.png') == 413
+
+
+def test_path_request_body_limits(make_service, post, tmp_path):
+    _, address = make_service(path_root=str(tmp_path))
+    json_type = b'Content-Type: application/json\r\n'
+    assert post(address, '/decode', json_type) == 411
+    assert post(address, '/decode', json_type + b'Content-Length: -1\r\n', b'{}' * 1000) == 400
+    assert post(address, '/decode', json_type +
+                b'Content-Length: %d\r\n' % (MAX_PATH_REQUEST_BYTES + 1)) == 413
+
+
+def test_upload_limit(make_service, post):
+    _, address = make_service(max_bytes=1024)
+    assert post(address, '/decode', b'Content-Length: 2048\r\n') == 413
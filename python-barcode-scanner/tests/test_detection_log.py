@@ -0,0 +1,98 @@
+"""
+Tests for the append-only detection logs
+"""
+
+import json
+import time
+
+import pytest
+
+from utils.detection_log import (DetectionLog, compact_log, convert_log_to_json,
+                                 detection_log_path, read_detection_log)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_detection_log_path():
+    assert detection_log_path('mobile_detections.json') == 'mobile_detections.jsonl'
+    assert detection_log_path('detections.jsonl') == 'detections.jsonl'
+
+
+def test_close_writes_buffered_records(tmp_path):
+    path = str(tmp_path / 'detections.jsonl')
+    log = DetectionLog(path, flush_every=100, flush_interval=60)
+    log.write({'data': 'STU001'})
+    log.write_many([{'data': 'STU002'}, {'data': 'STU003'}])
+    log.close()
+
+    assert [r['data'] for r in read_detection_log(path)] == ['STU001', 'STU002', 'STU003']
+
+
+def test_flusher_writes_full_buffer(tmp_path):
+    path = tmp_path / 'detections.jsonl'
+    log = DetectionLog(str(path), flush_every=2, flush_interval=60)
+    try:
+        log.write_many([{'data': 'STU001'}, {'data': 'STU002'}])
+        assert wait_for(lambda: path.exists() and path.read_text().count('\n') == 2)
+    finally:
+        log.close()
+
+
+def test_flusher_writes_after_interval(tmp_path):
+    path = tmp_path / 'detections.jsonl'
+    log = DetectionLog(str(path), flush_every=100, flush_interval=0.05)
+    try:
+        log.write({'data': 'STU001'})
+        assert wait_for(lambda: path.exists() and path.read_text().count('\n') == 1)
+    finally:
+        log.close()
+
+
+def test_write_after_close(tmp_path):
+    log = DetectionLog(str(tmp_path / 'detections.jsonl'))
+    log.close()
+    log.close()
+    with pytest.raises(ValueError):
+        log.write({'data': 'STU001'})
+
+
+def test_read_skips_truncated_line(tmp_path):
+    path = tmp_path / 'detections.jsonl'
+    path.write_text('{"data": "STU001"}\n\n{"data": "STU002"}\n{"data": "ST')
+
+    assert [r['data'] for r in read_detection_log(str(path))] == ['STU001', 'STU002']
+
+
+def test_convert_log_to_json(tmp_path):
+    records = [{'data': 'STU001', 'rect': [1, 2, 3, 4]}, {'data': 'STU002'}]
+    log_path = tmp_path / 'detections.jsonl'
+    log_path.write_text(''.join(json.dumps(r) + '\n' for r in records))
+    output_path = tmp_path / 'detections.json'
+
+    assert convert_log_to_json(str(log_path), str(output_path)) == 2
+    assert output_path.read_text() == json.dumps(records, indent=2)
+
+
+def test_convert_empty_log(tmp_path):
+    log_path = tmp_path / 'detections.jsonl'
+    log_path.write_text('')
+    output_path = tmp_path / 'detections.json'
+
+    assert convert_log_to_json(str(log_path), str(output_path)) == 0
+    assert json.loads(output_path.read_text()) == []
+
+
+def test_compact_log(tmp_path):
+    path = tmp_path / 'detections.jsonl'
+    path.write_text('{"data": "STU001"}\nnot json\n{"data": "STU002"}\n{"da')
+
+    assert compact_log(str(path)) == 2
+    assert path.read_text() == '{"data": "STU001"}\n{"data": "STU002"}\n'
+    assert not (tmp_path / 'detections.jsonl.tmp').exists()
@@ -0,0 +1,305 @@
+"""
+Tests for BarcodeDetector's preprocessing passes
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip('pyzbar.pyzbar', exc_type=ImportError)
+
+from pyzbar.locations import Point, Rect
+from pyzbar.pyzbar import Decoded, ZBarSymbol
+
+from utils import detector as detector_module
+from utils.detector import (DECODE_PROFILES, PREPROCESSING_METHODS, BarcodeDetector,
+                            resolve_decode_profile)
+
+
+def make_barcode(data=b'STU001', type='CODE39', rect=(10, 20, 100, 30)):
+    """Build a pyzbar result with a rectangular polygon"""
+    left, top, width, height = rect
+    polygon = [Point(left, top), Point(left + width, top),
+               Point(left + width, top + height), Point(left, top + height)]
+    return Decoded(data, type, Rect(*rect), polygon, 1, 'UP')
+
+
+class FakeZbar:
+    """Stands in for pyzbar.decode, answering per pass or through answer(image)"""
+
+    def __init__(self):
+        self.answer = None
+        self.results = {}
+        self.calls = []
+        self.threads = set()
+        self.symbols = []
+
+    def decode(self, image, symbols=None):
+        self.calls.append(image)
+        self.symbols.append(symbols)
+        self.threads.add(threading.current_thread().name)
+        if self.answer is not None:
+            return self.answer(image)
+        return list(self.results.get(image, []))
+
+
+@pytest.fixture
+def images_zbar(monkeypatch):
+    """Replace pyzbar.decode, keeping the real preprocessing"""
+    fake = FakeZbar()
+    fake.answer = lambda image: []
+    monkeypatch.setattr(detector_module.pyzbar, 'decode', fake.decode)
+    return fake
+
+
+@pytest.fixture
+def zbar(images_zbar, monkeypatch):
+    """Replace pyzbar.decode, passing each pass's method name as the image"""
+    monkeypatch.setattr(BarcodeDetector, '_preprocess', lambda self, gray, method: method)
+    images_zbar.answer = None
+    return images_zbar
+
+
+@pytest.fixture
+def frame():
+    return np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+def test_cascade_stops_at_first_valid_pass(zbar, frame):
+    zbar.results['blur'] = [make_barcode()]
+    zbar.results['equalized'] = [make_barcode(b'OTHER')]
+
+    barcodes = BarcodeDetector(mode='cascade').detect_barcodes(frame)
+
+    assert [b.data for b in barcodes] == [b'STU001']
+    assert zbar.calls == ['original', 'blur']
+
+
+def test_cascade_skips_invalid_results(zbar, frame):
+    zbar.results['original'] = [make_barcode(b'\xff\xfe')]
+    zbar.results['blur'] = [make_barcode(b'VALID')]
+
+    barcodes = BarcodeDetector(mode='cascade').detect_barcodes(frame)
+
+    assert [b.data for b in barcodes] == [b'VALID']
+    assert zbar.calls == ['original', 'blur']
+
+
+def test_cascade_follows_pass_order(zbar, frame):
+    zbar.results['equalized'] = [make_barcode()]
+    zbar.results['original'] = [make_barcode()]
+
+    detector = BarcodeDetector(mode='cascade', pass_order=['edges', 'equalized', 'original'])
+    assert len(detector.detect_barcodes(frame)) == 1
+    assert zbar.calls == ['edges', 'equalized']
+
+
+def test_cascade_miss_tries_every_pass(zbar, frame):
+    assert BarcodeDetector(mode='cascade').detect_barcodes(frame) == []
+    assert zbar.calls == list(PREPROCESSING_METHODS)
+
+
+def test_exhaustive_merges_every_pass(zbar, frame):
+    zbar.results['original'] = [make_barcode()]
+    zbar.results['edges'] = [make_barcode(rect=(12, 21, 100, 30)), make_barcode(b'OTHER')]
+
+    barcodes = BarcodeDetector().detect_barcodes(frame)
+
+    assert [b.data for b in barcodes] == [b'STU001', b'OTHER']
+    assert zbar.calls == list(PREPROCESSING_METHODS)
+
+
+def test_grayscale_frames_pass_through(zbar):
+    zbar.results['original'] = [make_barcode()]
+    gray = np.zeros((48, 64), dtype=np.uint8)
+    assert len(BarcodeDetector(mode='cascade').detect_barcodes(gray)) == 1
+
+
+def test_invalid_configuration():
+    with pytest.raises(ValueError):
+        BarcodeDetector(mode='fastest')
+    with pytest.raises(ValueError):
+        BarcodeDetector(pass_order=['original', 'sharpen'])
+
+
+def test_adaptive_order_follows_hits(zbar, frame):
+    zbar.results['equalized'] = [make_barcode()]
+    detector = BarcodeDetector(mode='cascade', adaptive=True)
+
+    detector.detect_barcodes(frame, source='cam1')
+    assert detector.get_pass_order('cam1')[0] == 'equalized'
+    assert detector.get_pass_order('cam2') == PREPROCESSING_METHODS
+
+    zbar.calls.clear()
+    detector.detect_barcodes(frame, source='cam1')
+    assert zbar.calls == ['equalized']
+
+    stats = detector.get_pass_statistics()['cam1']
+    assert stats['frames'] == 2
+    assert stats['hit_rates'] == {'equalized': 1.0}
+    assert stats['mean_decode_calls'] == (len(PREPROCESSING_METHODS) + 1) / 2
+
+
+def test_adaptive_pruning(zbar, frame):
+    zbar.results['equalized'] = [make_barcode()]
+    detector = BarcodeDetector(mode='cascade', adaptive=True, prune_below=0.5,
+                               min_samples=3, explore_interval=1000)
+
+    for _ in range(2):
+        detector.detect_barcodes(frame)
+    assert detector.get_pass_order() == PREPROCESSING_METHODS[-1:] + PREPROCESSING_METHODS[:-1]
+
+    detector.detect_barcodes(frame)
+    assert detector.get_pass_order() == ('equalized',)
+
+
+def test_adaptive_explore_runs_every_pass(zbar, frame):
+    zbar.results['equalized'] = [make_barcode()]
+    detector = BarcodeDetector(mode='cascade', adaptive=True, prune_below=0.5,
+                               min_samples=1, explore_interval=3)
+
+    detector.detect_barcodes(frame)
+    assert detector.get_pass_order() == ('equalized',)
+    detector.detect_barcodes(frame)
+    assert len(detector.get_pass_order()) == len(PREPROCESSING_METHODS)
+
+
+def test_pruned_passes_retried_on_miss(zbar, frame):
+    zbar.results['equalized'] = [make_barcode()]
+    detector = BarcodeDetector(mode='cascade', adaptive=True, prune_below=0.5,
+                               min_samples=1, explore_interval=1000)
+    detector.detect_barcodes(frame)
+
+    # The scene changes: only the pruned edges pass still finds the barcode
+    zbar.results = {'edges': [make_barcode()]}
+    zbar.calls.clear()
+    barcodes = detector.detect_barcodes(frame)
+
+    assert len(barcodes) == 1
+    assert zbar.calls == ['equalized', 'original', 'blur', 'adaptive_threshold',
+                          'morph_close', 'edges']
+    assert detector.get_pass_statistics()['default']['hit_rates'] == {
+        'equalized': 0.5, 'edges': 0.5}
+
+
+def test_parallel_matches_exhaustive(zbar, frame):
+    zbar.results['original'] = [make_barcode()]
+    zbar.results['edges'] = [make_barcode(rect=(12, 21, 100, 30)), make_barcode(b'OTHER')]
+    zbar.results['equalized'] = [make_barcode(b'\xff\xfe')]
+
+    serial = BarcodeDetector().detect_barcodes(frame)
+    zbar.calls.clear()
+    zbar.threads.clear()
+    detector = BarcodeDetector(mode='parallel', adaptive=True)
+    parallel = detector.detect_barcodes(frame)
+
+    assert parallel == serial
+    assert sorted(zbar.calls) == sorted(PREPROCESSING_METHODS)
+    assert all(name.startswith('barcode-pass') for name in zbar.threads)
+    assert detector.get_pass_statistics()['default']['hit_rates'] == {'original': 1.0}
+
+
+def test_resolve_decode_profile():
+    assert resolve_decode_profile('all') is None
+    assert resolve_decode_profile('attendance') == [ZBarSymbol.CODE39]
+    linear = resolve_decode_profile('linear')
+    assert ZBarSymbol.I25 in linear
+    assert ZBarSymbol.QRCODE not in linear
+    assert len(linear) == len(DECODE_PROFILES['linear'])
+    with pytest.raises(ValueError):
+        resolve_decode_profile('retail')
+
+
+def test_profile_restricts_decode_symbols(zbar, frame):
+    BarcodeDetector(mode='cascade', profile='attendance').detect_barcodes(frame)
+    assert zbar.symbols == [[ZBarSymbol.CODE39]] * len(PREPROCESSING_METHODS)
+
+    zbar.symbols.clear()
+    BarcodeDetector(mode='cascade').detect_barcodes(frame)
+    assert zbar.symbols == [None] * len(PREPROCESSING_METHODS)
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        BarcodeDetector(profile='retail')
+
+
+def test_region_results_in_frame_coordinates(zbar):
+    frame = np.zeros((480, 640), dtype=np.uint8)
+    frame[200:260, 100:300] = 255
+    crops = []
+
+    def preprocess(gray, method):
+        crops.append(gray.copy())
+        return method
+
+    zbar.results['original'] = [make_barcode(rect=(5, 10, 80, 20))]
+    detector = BarcodeDetector(mode='cascade')
+    detector._preprocess = preprocess
+
+    barcodes = detector.detect_barcodes_in_region(frame, (100, 200, 200, 60))
+
+    assert crops[0].shape == (60, 200) and crops[0].all()
+    assert barcodes[0].rect == (105, 210, 80, 20)
+    assert barcodes[0].polygon[2] == (185, 230)
+
+
+def test_region_outside_frame(zbar):
+    frame = np.zeros((480, 640), dtype=np.uint8)
+    detector = BarcodeDetector(mode='cascade')
+    assert detector.detect_barcodes_in_region(frame, (700, 100, 50, 50)) == []
+    assert zbar.calls == []
+
+
+
+def striped_photo(region=(1000, 2000, 600, 300), size=(3000, 4000)):
+    """Large blank photo with a block of vertical bars"""
+    image = np.full(size, 255, dtype=np.uint8)
+    x, y, w, h = region
+    for bar in range(x, x + w, 16):
+        image[y:y + h, bar:bar + 8] = 0
+    return image
+
+
+def decoded_shapes(zbar):
+    return [image.shape for image in zbar.calls]
+
+
+def test_locate_barcode_regions():
+    regions = BarcodeDetector().locate_barcode_regions(striped_photo())
+
+    assert len(regions) == 1
+    x, y, w, h = regions[0]
+    assert x <= 1000 and y <= 2000
+    assert x + w >= 1600 and y + h >= 2300
+    assert w < 1000 and h < 600
+
+
+def test_multiscale_decodes_regions_at_full_resolution(images_zbar):
+    photo = striped_photo()
+    detector = BarcodeDetector(mode='cascade')
+    (x, y, w, h), = detector.locate_barcode_regions(photo)
+    images_zbar.answer = lambda image: [make_barcode(rect=(10, 5, 500, 200))]
+
+    barcodes = detector.detect_barcodes_multiscale(photo)
+
+    assert decoded_shapes(images_zbar) == [(h, w)]
+    assert barcodes[0].rect == (x + 10, y + 5, 500, 200)
+
+
+def test_multiscale_falls_back_to_downscaled_image(images_zbar):
+    photo = np.full((3000, 4000), 255, dtype=np.uint8)
+    images_zbar.answer = lambda image: (
+        [make_barcode(rect=(128, 64, 256, 32))] if image.shape == (960, 1280) else [])
+
+    barcodes = BarcodeDetector(mode='cascade').detect_barcodes_multiscale(photo)
+
+    assert max(max(shape) for shape in decoded_shapes(images_zbar)) == 1280
+    assert barcodes[0].rect == (400, 200, 800, 100)
+
+
+def test_multiscale_small_image_decoded_directly(images_zbar):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    BarcodeDetector(mode='cascade').detect_barcodes_multiscale(frame)
+    assert set(decoded_shapes(images_zbar)) == {(480, 640)}
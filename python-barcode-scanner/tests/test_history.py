@@ -0,0 +1,101 @@
+"""
+Tests for the in-memory detection history
+"""
+
+import pytest
+
+from utils.history import DetectionHistory, DetectionRecord
+
+
+def make_info(data, **extra):
+    info = {
+        'data': data,
+        'type': 'CODE39',
+        'rect': (10, 20, 100, 30),
+        'polygon': [(10, 20), (110, 20), (110, 50), (10, 50)],
+        'timestamp': '2024-03-01 09:15:00',
+        'confidence': 95.0
+    }
+    info.update(extra)
+    return info
+
+
+def test_record_round_trip():
+    info = make_info('STU001', source='mobile', device='phone-1')
+    record = DetectionRecord(info)
+
+    assert record.to_dict() == {
+        'data': 'STU001',
+        'type': 'CODE39',
+        'rect': (10, 20, 100, 30),
+        'polygon': [[10, 20], [110, 20], [110, 50], [10, 50]],
+        'timestamp': '2024-03-01 09:15:00',
+        'confidence': 95.0,
+        'source': 'mobile',
+        'device': 'phone-1'
+    }
+    assert isinstance(record.time, float)
+
+
+def test_record_dict_access():
+    record = DetectionRecord(make_info('STU001', device='phone-1'))
+
+    assert record['data'] == 'STU001'
+    assert record['timestamp'] == '2024-03-01 09:15:00'
+    assert record['device'] == 'phone-1'
+    assert record.get('source', 'camera') == 'camera'
+    with pytest.raises(KeyError):
+        record['missing']
+
+
+def test_record_keeps_unparsed_timestamp():
+    record = DetectionRecord({'data': 'STU001', 'timestamp': 'yesterday'})
+    assert record.timestamp == 'yesterday'
+    assert record.type == 'UNKNOWN'
+
+
+def test_history_keeps_most_recent():
+    evicted = []
+    history = DetectionHistory(maxlen=3, on_evict=evicted.append)
+    for i in range(5):
+        history.append(make_info(f'STU00{i}'))
+
+    assert len(history) == 3
+    assert [record.data for record in history] == ['STU002', 'STU003', 'STU004']
+    assert [record.data for record in evicted] == ['STU000', 'STU001']
+
+
+def test_history_access():
+    history = DetectionHistory(maxlen=10)
+    for i in range(4):
+        history.append(make_info(f'STU00{i}'))
+
+    assert [record.data for record in history.recent(2)] == ['STU002', 'STU003']
+    assert len(history.recent(20)) == 4
+    assert history[-1].data == 'STU003'
+    assert [record.data for record in history[1:3]] == ['STU001', 'STU002']
+    assert [record.data for record in reversed(history)][0] == 'STU003'
+    assert [info['data'] for info in history.to_dicts()] == ['STU000', 'STU001',
+                                                              'STU002', 'STU003']
+
+    history.clear()
+    assert len(history) == 0
+
+
+def test_history_stores_records_as_is():
+    history = DetectionHistory(maxlen=2)
+    record = DetectionRecord(make_info('STU001'))
+    assert history.append(record) is record
+
+
+@pytest.mark.parametrize('maxlen', [0, -1])
+def test_history_needs_capacity(maxlen):
+    with pytest.raises(ValueError):
+        DetectionHistory(maxlen=maxlen)
+
+
+def test_history_of_one():
+    history = DetectionHistory(maxlen=1)
+    history.append(make_info('STU001'))
+    history.append(make_info('STU002'))
+    assert [record.data for record in history] == ['STU002']
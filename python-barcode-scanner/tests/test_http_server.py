@@ -0,0 +1,197 @@
+"""
+Tests for the static assets and request handling shared by the HTTP servers
+"""
+
+import http.server
+import socket
+import ssl
+import subprocess
+import threading
+
+import pytest
+
+from utils.http_server import (MAX_JSON_BODY_BYTES, KeepAliveHandlerMixin, ScannerHandlerMixin,
+                               StaticAsset, WorkerPoolHTTPServer)
+
+BODY = '<html>' + 'scanner page ' * 200 + '</html>'
+
+
+def test_select_gzip():
+    asset = StaticAsset(BODY, 'text/html')
+    encoding, body = asset.select('gzip, deflate')
+    assert encoding == 'gzip'
+    assert body == asset.encodings['gzip']
+    assert len(body) < asset.size
+
+
+def test_select_prefers_brotli():
+    asset = StaticAsset(BODY, 'text/html')
+    expected = 'br' if 'br' in asset.encodings else 'gzip'
+    assert asset.select('gzip, deflate, br')[0] == expected
+
+
+def test_select_identity():
+    asset = StaticAsset(BODY, 'text/html')
+    assert asset.select(None) == (None, BODY.encode('utf-8'))
+    assert asset.select('') == (None, BODY.encode('utf-8'))
+    assert asset.select('deflate')[0] is None
+
+
+def test_select_honours_q_zero():
+    asset = StaticAsset(BODY, 'text/html')
+    assert asset.select('gzip;q=0, identity')[0] is None
+    assert asset.select('gzip; q=0.5')[0] == 'gzip'
+    assert asset.select('br;q=0, gzip;q=0')[0] is None
+
+
+def test_select_wildcard():
+    asset = StaticAsset(BODY, 'text/html')
+    assert asset.select('*')[0] in ('br', 'gzip')
+
+
+def test_select_skips_useless_compression():
+    asset = StaticAsset(b'ok', 'text/plain')
+    assert set(asset.encodings) == {'identity'}
+    assert asset.select('gzip, br') == (None, b'ok')
+
+
+def test_matches():
+    asset = StaticAsset(BODY, 'text/html')
+    assert asset.matches(asset.etag)
+    assert asset.matches('W/' + asset.etag)
+    assert asset.matches('"other", ' + asset.etag)
+    assert asset.matches('*')
+    assert not asset.matches(None)
+    assert not asset.matches('"other"')
+
+
+def test_etag_follows_content():
+    assert StaticAsset(BODY, 'text/html').etag == StaticAsset(BODY, 'text/html').etag
+    assert StaticAsset(BODY, 'text/html').etag != StaticAsset(BODY + ' ', 'text/html').etag
+
+
+class BatchHandler(KeepAliveHandlerMixin, ScannerHandlerMixin,
+                   http.server.BaseHTTPRequestHandler):
+    """Minimal handler serving POST /barcodes"""
+
+    def do_POST(self):
+        self.handle_barcodes_post()
+
+    def record_barcode_batch(self, payload):
+        return {'status': 'success', 'count': len(payload)}
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def batch_server(start_server):
+    return start_server(BatchHandler)
+
+
+def test_read_body_accepts_sized_body(batch_server, post):
+    body = b'[{"data": "STU001"}]'
+    headers = b'Content-Length: %d\r\n' % len(body)
+    assert post(batch_server, '/barcodes', headers, body) == 200
+
+
+def test_read_body_requires_content_length(batch_server, post):
+    assert post(batch_server, '/barcodes', b'') == 411
+    assert post(batch_server, '/barcodes', b'Content-Length: ten\r\n') == 411
+
+
+def test_read_body_rejects_negative_length(batch_server, post):
+    assert post(batch_server, '/barcodes', b'Content-Length: -1\r\n', b'[]' * 1000) == 400
+    assert post(batch_server, '/barcodes', b'Content-Length: -5\r\n') == 400
+
+
+def test_read_body_rejects_oversized_body(batch_server, post):
+    headers = b'Content-Length: %d\r\n' % (MAX_JSON_BODY_BYTES + 1)
+    assert post(batch_server, '/barcodes', headers) == 413
+
+
+class BlockingHandler(KeepAliveHandlerMixin, http.server.BaseHTTPRequestHandler):
+    """Holds its worker until release is set"""
+    entered = threading.Event()
+    release = threading.Event()
+
+    def do_GET(self):
+        self.entered.set()
+        self.release.wait(5)
+        self.send_json(200, {'status': 'ok'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def blocking_handler():
+    BlockingHandler.entered = threading.Event()
+    BlockingHandler.release = threading.Event()
+    yield BlockingHandler
+    BlockingHandler.release.set()
+
+
+def occupy_worker(address, wrap=lambda sock: sock):
+    """Send a request that holds the only worker, returning its socket"""
+    sock = wrap(socket.create_connection(address, timeout=5))
+    sock.sendall(b'GET / HTTP/1.1\r\nHost: test\r\n\r\n')
+    assert BlockingHandler.entered.wait(5)
+    return sock
+
+
+def test_saturated_pool_answers_503(start_server, blocking_handler):
+    address = start_server(blocking_handler, WorkerPoolHTTPServer, workers=1, max_pending=0)
+    busy = occupy_worker(address)
+
+    with socket.create_connection(address, timeout=5) as sock:
+        response = sock.recv(1024)
+    assert response.startswith(b'HTTP/1.1 503')
+    assert b'Retry-After: 1' in response
+
+    blocking_handler.release.set()
+    assert busy.makefile('rb').readline().startswith(b'HTTP/1.1 200')
+    busy.close()
+
+
+@pytest.fixture
+def tls_context(tmp_path):
+    """Server and client SSL contexts for a throwaway self-signed certificate"""
+    cert, key = tmp_path / 'cert.pem', tmp_path / 'key.pem'
+    try:
+        subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes',
+                        '-keyout', str(key), '-out', str(cert), '-days', '1',
+                        '-subj', '/CN=localhost'], check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip('openssl is not available')
+
+    server = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server.load_cert_chain(str(cert), str(key))
+    client = ssl.create_default_context()
+    client.check_hostname = False
+    client.verify_mode = ssl.CERT_NONE
+    return server, client
+
+
+def test_saturated_tls_pool_closes_without_plaintext(blocking_handler, tls_context):
+    server_context, client_context = tls_context
+    server = WorkerPoolHTTPServer(('127.0.0.1', 0), blocking_handler, workers=1, max_pending=0)
+    server.socket = server_context.wrap_socket(server.socket, server_side=True,
+                                               do_handshake_on_connect=False)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    try:
+        busy = occupy_worker(server.server_address, client_context.wrap_socket)
+
+        with socket.create_connection(server.server_address, timeout=5) as sock:
+            try:
+                response = sock.recv(1024)
+            except ConnectionResetError:
+                response = b''
+        assert response == b''
+
+        blocking_handler.release.set()
+        assert busy.makefile('rb').readline().startswith(b'HTTP/1.1 200')
+        busy.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,76 @@
+"""
+Tests for reading batch inputs from archives
+"""
+
+import tarfile
+import zipfile
+from datetime import datetime
+
+from utils.media import ArchiveMemberError, iter_archive_images
+
+
+def test_zip_members(tmp_path):
+    path = tmp_path / 'images.zip'
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr(zipfile.ZipInfo('a.png', (2024, 3, 1, 9, 15, 0)), b'png-a')
+        archive.writestr('notes.txt', b'skip me')
+        archive.writestr('photos/b.JPG', b'jpg-b')
+
+    members = list(iter_archive_images(str(path)))
+    assert [(name, data) for name, data, _ in members] == [('a.png', b'png-a'),
+                                                           ('photos/b.JPG', b'jpg-b')]
+    assert members[0][2] == int(datetime(2024, 3, 1, 9, 15, 0).timestamp() * 1e9)
+
+
+def test_zip_invalid_date(tmp_path):
+    path = tmp_path / 'images.zip'
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr(zipfile.ZipInfo('a.png', (1980, 0, 0, 0, 0, 0)), b'png-a')
+
+    assert list(iter_archive_images(str(path))) == [('a.png', b'png-a', 0)]
+
+
+def corrupt_zip(path):
+    """Write a zip whose first member's compressed data is damaged"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('bad.png', bytes(range(256)) * 64)
+        archive.writestr('good.png', b'png-good')
+
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo('bad.png')
+    with open(path, 'r+b') as f:
+        # Local header is 30 bytes plus the name; damage the data after it
+        f.seek(info.header_offset + 30 + len('bad.png') + 10)
+        f.write(b'\xff' * 32)
+
+
+def test_zip_corrupt_member(tmp_path):
+    path = tmp_path / 'images.zip'
+    corrupt_zip(path)
+
+    members = list(iter_archive_images(str(path)))
+    assert [name for name, _, _ in members] == ['bad.png', 'good.png']
+    assert isinstance(members[0][1], ArchiveMemberError)
+    assert members[1][1] == b'png-good'
+
+
+def test_zip_skips_large_members(tmp_path):
+    path = tmp_path / 'images.zip'
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('big.png', b'x' * 100)
+        archive.writestr('small.png', b'x')
+
+    names = [name for name, _, _ in iter_archive_images(str(path), max_member_bytes=10)]
+    assert names == ['small.png']
+
+
+def test_tar_members(tmp_path):
+    source = tmp_path / 'a.png'
+    source.write_bytes(b'png-a')
+    path = tmp_path / 'images.tar.gz'
+    with tarfile.open(path, 'w:gz') as archive:
+        archive.add(source, arcname='a.png')
+
+    name, data, mtime_ns = next(iter_archive_images(str(path)))
+    assert (name, data) == ('a.png', b'png-a')
+    assert mtime_ns // 10**9 == int(source.stat().st_mtime)
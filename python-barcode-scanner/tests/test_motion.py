@@ -0,0 +1,64 @@
+"""
+Tests for motion gating of unchanged frames
+"""
+
+import numpy as np
+
+from utils.motion import MotionGate
+
+
+def solid(value, shape=(480, 640, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_unchanged_frames_skipped():
+    gate = MotionGate(threshold=4.0)
+
+    assert gate.should_process(solid(100))
+    assert not gate.should_process(solid(100))
+    assert not gate.should_process(solid(102))
+    assert gate.should_process(solid(140))
+
+    assert gate.get_stats() == {'frames_seen': 4, 'frames_skipped': 2,
+                                'frames_processed': 2, 'skip_rate': 0.5}
+
+
+def test_small_changes_compared_to_last_decoded_frame():
+    gate = MotionGate(threshold=4.0)
+    gate.should_process(solid(100))
+
+    # Each step is below the threshold, but the drift adds up
+    assert not gate.should_process(solid(102))
+    assert not gate.should_process(solid(103))
+    assert gate.should_process(solid(105))
+
+
+def test_max_skip_forces_decode():
+    gate = MotionGate(max_skip=2)
+    results = [gate.should_process(solid(100)) for _ in range(7)]
+    assert results == [True, False, False, True, False, False, True]
+
+
+def test_local_change_detected():
+    gate = MotionGate(threshold=4.0)
+    frame = solid(100)
+    gate.should_process(frame)
+
+    moved = frame.copy()
+    moved[:240, :320] = 255
+    assert gate.should_process(moved)
+
+
+def test_grayscale_frames():
+    gate = MotionGate()
+    assert gate.should_process(solid(0, (480, 640)))
+    assert not gate.should_process(solid(0, (480, 640)))
+
+
+def test_reset():
+    gate = MotionGate()
+    gate.should_process(solid(100))
+    gate.reset()
+
+    assert gate.should_process(solid(100))
+    assert gate.get_stats()['frames_seen'] == 1
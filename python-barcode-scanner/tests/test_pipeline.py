@@ -0,0 +1,139 @@
+"""
+Tests for the threaded capture/decode pipeline
+"""
+
+import threading
+import time
+
+import pytest
+
+from utils.pipeline import FramePipeline, LatestValueQueue
+
+
+class FakeCapture:
+    """Delivers numbered frames, then fails once released"""
+
+    def __init__(self, count):
+        self.frames = list(range(1, count + 1))
+        self.released = threading.Event()
+
+    def read(self):
+        if self.frames:
+            return True, self.frames.pop(0)
+        self.released.wait(5)
+        return False, None
+
+
+@pytest.fixture
+def pipelines():
+    """Start pipelines, stopping them afterwards"""
+    started = []
+
+    def start(cap, process_frame):
+        pipeline = FramePipeline(cap, process_frame)
+        pipeline.start()
+        started.append(pipeline)
+        return pipeline
+
+    yield start
+    for pipeline in started:
+        pipeline.cap.released.set()
+        pipeline.stop()
+
+
+def wait_for_result(pipeline, expected):
+    """Read results until expected arrives, returning everything seen"""
+    seen = []
+    deadline = time.monotonic() + 5
+    while expected not in seen and time.monotonic() < deadline:
+        result = pipeline.get_result(timeout=0.1)
+        if result is not None:
+            seen.append(result)
+    return seen
+
+
+def test_queue_keeps_newest_value():
+    queue = LatestValueQueue()
+    for value in (1, 2, 3):
+        queue.put(value)
+
+    assert queue.get() == 3
+    assert queue.dropped == 2
+    assert queue.get(timeout=0.01) is None
+
+
+def test_queue_get_waits_for_value():
+    queue = LatestValueQueue()
+    threading.Timer(0.05, queue.put, args=('frame',)).start()
+    assert queue.get(timeout=5) == 'frame'
+
+
+def test_queue_close_wakes_consumer():
+    queue = LatestValueQueue()
+    results = []
+    consumer = threading.Thread(target=lambda: results.append(queue.get()))
+    consumer.start()
+
+    queue.close()
+    consumer.join(timeout=5)
+
+    assert not consumer.is_alive()
+    assert results == [None]
+
+
+def test_pipeline_decodes_newest_frames(pipelines):
+    pipeline = pipelines(FakeCapture(5), lambda frame: frame * 10)
+
+    seen = wait_for_result(pipeline, 50)
+
+    assert seen[-1] == 50
+    assert seen == sorted(seen)
+    assert pipeline.running
+    assert pipeline.get_stats()['frames_captured'] == 5
+
+
+def test_slow_decode_drops_stale_frames(pipelines):
+    def slow_decode(frame):
+        time.sleep(0.02)
+        return frame
+
+    pipeline = pipelines(FakeCapture(30), slow_decode)
+    wait_for_result(pipeline, 30)
+
+    stats = pipeline.get_stats()
+    assert stats['frames_captured'] == 30
+    assert stats['capture_drops'] > 0
+    assert stats['frames_decoded'] + stats['capture_drops'] == 30
+
+
+def test_camera_failure_stops_pipeline(pipelines):
+    cap = FakeCapture(1)
+    pipeline = pipelines(cap, lambda frame: frame)
+    wait_for_result(pipeline, 1)
+
+    cap.released.set()
+    assert pipeline.get_result(timeout=5) is None
+    assert not pipeline.running
+    assert pipeline.error == "Could not read frame from camera"
+
+
+def test_decode_error_stops_pipeline(pipelines):
+    def failing_decode(frame):
+        raise RuntimeError("boom")
+
+    pipeline = pipelines(FakeCapture(3), failing_decode)
+
+    assert pipeline.get_result(timeout=5) is None
+    assert not pipeline.running
+    assert pipeline.error == "Error processing frame: boom"
+
+
+def test_stop_joins_threads(pipelines):
+    pipeline = pipelines(FakeCapture(0), lambda frame: frame)
+    threads = list(pipeline.threads)
+
+    pipeline.cap.released.set()
+    pipeline.stop()
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert not pipeline.running
@@ -0,0 +1,227 @@
+"""
+Tests for the streaming batch result writers
+"""
+
+import csv
+import json
+
+import pytest
+
+from utils.result_writers import RESULT_FORMATS, ResultWriter, open_result_writer
+
+
+def make_result(name, data=None):
+    """Build a scan result like BatchBarcodeScanner.scan_image returns"""
+    barcodes = []
+    if data is not None:
+        barcodes.append({'data': data, 'type': 'CODE39', 'confidence': 92.5})
+    return {
+        'file': name,
+        'status': 'success',
+        'total_barcodes': len(barcodes),
+        'code39_barcodes': len(barcodes),
+        'barcodes': barcodes
+    }
+
+
+def make_error(name):
+    """Build a failed scan result"""
+    return {'file': name, 'status': 'error', 'error': 'Could not load image',
+            'barcodes': []}
+
+
+def write_results(output_format, path, results, append=False):
+    with open_result_writer(output_format, str(path), append=append) as writer:
+        for result in results:
+            writer.write(result)
+
+
+def test_write_result_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        ResultWriter(str(tmp_path / 'out.txt'))
+
+
+def test_unsupported_format(tmp_path):
+    with pytest.raises(ValueError):
+        open_result_writer('xml', str(tmp_path / 'out.xml'))
+
+
+def test_json_layout(tmp_path):
+    path = tmp_path / 'out.json'
+    write_results('json', path, [make_result('a.png', 'STU001'), make_error('b.png')])
+
+    text = path.read_text()
+    assert text.startswith('{\n  "results": [\n    {')
+    assert text.endswith('}\n')
+    document = json.loads(text)
+    assert [r['file'] for r in document['results']] == ['a.png', 'b.png']
+    assert document['scan_summary'] == {
+        'total_files': 2,
+        'successful_scans': 1,
+        'failed_scans': 1,
+        'total_barcodes': 1,
+        'code39_barcodes': 1,
+        'other_barcodes': 0
+    }
+
+
+def test_json_empty(tmp_path):
+    path = tmp_path / 'out.json'
+    write_results('json', path, [])
+
+    document = json.loads(path.read_text())
+    assert document['results'] == []
+    assert document['scan_summary']['total_files'] == 0
+
+
+def test_jsonl_layout(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    write_results('jsonl', path, [make_result('a.png', 'STU001'), make_result('b.png')])
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line['file'] for line in lines[:-1]] == ['a.png', 'b.png']
+    assert lines[-1]['scan_summary']['total_files'] == 2
+
+
+def test_csv_layout(tmp_path):
+    path = tmp_path / 'out.csv'
+    write_results('csv', path, [make_result('a.png', 'STU001'), make_result('b.png')])
+
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['File', 'Status', 'Total Barcodes', 'Code 39 Barcodes',
+                       'Barcode Data', 'Barcode Type', 'Confidence']
+    assert rows[1] == ['a.png', 'success', '1', '1', 'STU001', 'CODE39', '92.5']
+    assert rows[2] == ['b.png', 'success', '0', '0', '', '', '']
+    assert len(rows) == 3
+
+
+def test_txt_layout(tmp_path):
+    path = tmp_path / 'out.txt'
+    write_results('txt', path, [make_result('a.png', 'STU001'), make_error('b.png')])
+
+    text = path.read_text()
+    assert text.startswith('BATCH BARCODE SCAN RESULTS\n')
+    assert 'File: a.png\n' in text
+    assert '     Data: STU001\n' in text
+    assert 'Error: Could not load image\n' in text
+    assert text.index('File: b.png') < text.index('\nSUMMARY:\n')
+    assert '  Total files processed: 2\n' in text
+
+
+def test_json_append(tmp_path):
+    path = tmp_path / 'out.json'
+    write_results('json', path, [make_result('a.png', 'STU001')])
+    write_results('json', path, [make_result('b.png', 'STU002')], append=True)
+
+    document = json.loads(path.read_text())
+    assert [r['file'] for r in document['results']] == ['a.png', 'b.png']
+    # The summary covers the results written by this run
+    assert document['scan_summary']['total_files'] == 1
+    assert path.read_text().count('"scan_summary"') == 1
+
+
+def test_json_append_to_empty_results(tmp_path):
+    path = tmp_path / 'out.json'
+    write_results('json', path, [])
+    write_results('json', path, [make_result('a.png')], append=True)
+
+    document = json.loads(path.read_text())
+    assert [r['file'] for r in document['results']] == ['a.png']
+
+
+def test_jsonl_append(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    write_results('jsonl', path, [make_result('a.png')])
+    write_results('jsonl', path, [make_result('b.png')], append=True)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line.get('file') for line in lines] == ['a.png', 'b.png', None]
+    assert 'scan_summary' in lines[-1]
+
+
+def test_jsonl_append_drops_partial_line(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    with open_result_writer('jsonl', str(path)) as writer:
+        writer.write(make_result('a.png'))
+        # Simulate a crash halfway through the next line
+        writer.file.write('{"file": "b.p')
+        writer.file.flush()
+        writer.file.close()
+
+    write_results('jsonl', path, [make_result('b.png')], append=True)
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line.get('file') for line in lines] == ['a.png', 'b.png', None]
+
+
+def test_csv_append(tmp_path):
+    path = tmp_path / 'out.csv'
+    write_results('csv', path, [make_result('a.png', 'STU001')])
+    write_results('csv', path, [make_result('b.png', 'STU002')], append=True)
+
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == 'File'
+    assert [row[0] for row in rows[1:]] == ['a.png', 'b.png']
+
+
+def test_txt_append(tmp_path):
+    path = tmp_path / 'out.txt'
+    write_results('txt', path, [make_result('a.png', 'STU001')])
+    write_results('txt', path, [make_result('b.png', 'STU002')], append=True)
+
+    text = path.read_text()
+    assert text.count('BATCH BARCODE SCAN RESULTS') == 1
+    assert text.count('\nSUMMARY:\n') == 1
+    assert text.index('File: a.png') < text.index('File: b.png') < text.index('SUMMARY:')
+
+
+@pytest.mark.parametrize('output_format', RESULT_FORMATS)
+def test_truncate_without_append(tmp_path, output_format):
+    path = tmp_path / f'out.{output_format}'
+    write_results(output_format, path, [make_result('a.png', 'STU001')])
+    write_results(output_format, path, [make_result('b.png', 'STU002')])
+
+    text = path.read_text()
+    assert 'a.png' not in text
+    assert 'b.png' in text
+
+
+def test_json_append_drops_partial_result(tmp_path):
+    path = tmp_path / 'out.json'
+    with open_result_writer('json', str(path)) as writer:
+        writer.write(make_result('a.png', 'STU001'))
+        # Simulate a crash partway through the next result, inside its
+        # barcodes list so the file ends with a nested closing brace
+        text = json.dumps(make_result('b.png', 'STU002'), indent=2).replace('\n', '\n    ')
+        writer.file.write(',\n    ' + text[:text.index('}') + 1])
+        writer.file.flush()
+        writer.file.close()
+
+    write_results('json', path, [make_result('c.png', 'STU003')], append=True)
+
+    document = json.loads(path.read_text())
+    assert [r['file'] for r in document['results']] == ['a.png', 'c.png']
+
+
+def test_json_append_drops_partial_first_result(tmp_path):
+    path = tmp_path / 'out.json'
+    with open_result_writer('json', str(path)) as writer:
+        writer.file.write('\n    {\n      "file": "a.p')
+        writer.file.flush()
+        writer.file.close()
+
+    write_results('json', path, [make_result('b.png')], append=True)
+
+    document = json.loads(path.read_text())
+    assert [r['file'] for r in document['results']] == ['b.png']
+
+
+def test_json_append_rejects_other_files(tmp_path):
+    path = tmp_path / 'out.json'
+    path.write_text('not a results file\n')
+
+    with pytest.raises(ValueError):
+        open_result_writer('json', str(path), append=True)
+    assert path.read_text() == 'not a results file\n'
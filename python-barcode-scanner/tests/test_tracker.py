@@ -0,0 +1,134 @@
+"""
+Tests for ROI tracking between video frames
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pytest
+
+from utils.tracker import ROITracker
+
+# Same shape as pyzbar's results, without loading libzbar
+Rect = namedtuple('Rect', 'left top width height')
+Point = namedtuple('Point', 'x y')
+Decoded = namedtuple('Decoded', 'data type rect polygon quality orientation')
+
+
+def make_barcode(rect=(100, 200, 80, 20)):
+    left, top, width, height = rect
+    polygon = [Point(left, top), Point(left + width, top),
+               Point(left + width, top + height), Point(left, top + height)]
+    return Decoded(b'STU001', 'CODE39', Rect(*rect), polygon, 1, 'UP')
+
+
+class FakeDetector:
+    """Records full-frame and region searches, answering from queues"""
+
+    def __init__(self):
+        self.full_results = []
+        self.region_results = []
+        self.calls = []
+
+    def detect_barcodes(self, frame, source='default'):
+        self.calls.append('full')
+        return self.full_results.pop(0) if self.full_results else []
+
+    def detect_barcodes_in_region(self, frame, region, source='default'):
+        self.calls.append(region)
+        return self.region_results.pop(0) if self.region_results else []
+
+
+@pytest.fixture
+def frame():
+    return np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def test_first_frame_searches_everything(frame):
+    detector = FakeDetector()
+    tracker = ROITracker()
+
+    assert tracker.detect(detector, frame) == []
+    assert detector.calls == ['full']
+    assert tracker.last_rect is None
+
+
+def test_hit_is_tracked_in_padded_region(frame):
+    detector = FakeDetector()
+    detector.full_results = [[make_barcode()]]
+    detector.region_results = [[make_barcode((104, 202, 80, 20))]]
+    tracker = ROITracker(padding=0.5)
+
+    tracker.detect(detector, frame)
+    barcodes = tracker.detect(detector, frame)
+
+    # 80x20 box padded by half its size plus 10 px on each side
+    assert detector.calls == ['full', (50, 180, 180, 60)]
+    assert barcodes[0].rect.left == 104
+    assert tracker.last_rect == (104, 202, 80, 20)
+    assert tracker.get_stats() == {'roi_searches': 1, 'roi_hits': 1,
+                                   'full_searches': 1, 'roi_hit_rate': 1.0}
+
+
+def test_region_clipped_to_frame(frame):
+    detector = FakeDetector()
+    detector.full_results = [[make_barcode((0, 470, 600, 10))]]
+    tracker = ROITracker(padding=0.5)
+
+    tracker.detect(detector, frame)
+    tracker.detect(detector, frame)
+
+    assert detector.calls[1] == (0, 455, 640, 25)
+
+
+def test_miss_falls_back_to_full_search(frame):
+    detector = FakeDetector()
+    detector.full_results = [[make_barcode()], [make_barcode((300, 50, 80, 20))]]
+    tracker = ROITracker()
+
+    tracker.detect(detector, frame)
+    barcodes = tracker.detect(detector, frame)
+
+    assert detector.calls[1:] == [(50, 180, 180, 60), 'full']
+    assert barcodes[0].rect.left == 300
+    assert tracker.last_rect == (300, 50, 80, 20)
+    assert tracker.get_stats()['roi_hit_rate'] == 0.0
+
+
+def test_lost_barcode_resets_tracking(frame):
+    detector = FakeDetector()
+    detector.full_results = [[make_barcode()]]
+    tracker = ROITracker()
+
+    tracker.detect(detector, frame)
+    tracker.detect(detector, frame)
+    tracker.detect(detector, frame)
+
+    assert tracker.last_rect is None
+    assert detector.calls[1:] == [(50, 180, 180, 60), 'full', 'full']
+
+
+def test_full_search_forced_periodically(frame):
+    detector = FakeDetector()
+    detector.full_results = [[make_barcode()], [make_barcode()]]
+    detector.region_results = [[make_barcode()], [make_barcode()]]
+    tracker = ROITracker(full_search_interval=2)
+
+    for _ in range(4):
+        tracker.detect(detector, frame)
+
+    assert [call == 'full' for call in detector.calls] == [True, False, False, True]
+
+
+def test_multiple_barcodes_tracked_together(frame):
+    detector = FakeDetector()
+    detector.full_results = [[make_barcode((100, 200, 80, 20)),
+                              make_barcode((300, 260, 40, 40))]]
+    tracker = ROITracker()
+
+    tracker.detect(detector, frame)
+    assert tracker.last_rect == (100, 200, 240, 100)
+
+    tracker.reset()
+    assert tracker.last_rect is None
+    assert tracker.get_stats()['full_searches'] == 0
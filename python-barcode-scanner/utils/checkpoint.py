@@ -0,0 +1,145 @@
+"""
+Batch Scan Checkpoints
+Record completed files so an interrupted batch scan can resume where it stopped
+"""
+
+import os
+import sqlite3
+
+
+class ScanCheckpoint:
+    def __init__(self, path, resume=False):
+        """
+        Open a checkpoint store
+
+        Files are identified by path, size and modification time, so a
+        file that changed since it was scanned is scanned again. The store
+        is a small SQLite database; lookups do not load it into memory.
+
+        Args:
+            path: Checkpoint database path
+            resume: Keep existing entries; otherwise start from scratch
+        """
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        if not resume:
+            self.conn.execute('DROP TABLE IF EXISTS completed')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS completed (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                total_barcodes INTEGER NOT NULL,
+                code39_barcodes INTEGER NOT NULL
+            )
+        ''')
+        self.conn.commit()
+
+    @staticmethod
+    def file_key(path):
+        """
+        Identify a file's current contents
+
+        Returns:
+            tuple: (absolute_path, size, mtime_ns)
+        """
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+    def is_done(self, key):
+        """Check whether a file with this key was already scanned"""
+        path, size, mtime_ns = key
+        row = self.conn.execute(
+            'SELECT 1 FROM completed WHERE path = ? AND size = ? AND mtime_ns = ?',
+            (path, size, mtime_ns)).fetchone()
+        return row is not None
+
+    def filter_pending(self, image_files, keys=None):
+        """
+        Skip files already recorded as completed
+
+        Args:
+            image_files: Iterable of image paths
+            keys: Optional dict filled with path -> file_key for every file
+                yielded, for passing to mark_done later
+
+        Yields:
+            str: Paths still to be scanned
+        """
+        for image_file in image_files:
+            try:
+                key = self.file_key(image_file)
+            except OSError:
+                # Let the scan report the missing file
+                yield image_file
+                continue
+            if self.is_done(key):
+                continue
+            if keys is not None:
+                keys[image_file] = key
+            yield image_file
+
+    def mark_done(self, key, result):
+        """
+        Record a completed file
+
+        Call this after the result has been written, so a crash in between
+        rescans the file rather than losing its result.
+
+        Args:
+            key: file_key taken before the file was scanned
+            result: Scan result for the file
+        """
+        path, size, mtime_ns = key
+        self.conn.execute(
+            'INSERT OR REPLACE INTO completed VALUES (?, ?, ?, ?, ?, ?)',
+            (path, size, mtime_ns, result['status'],
+             result.get('total_barcodes', 0), result.get('code39_barcodes', 0)))
+        self.conn.commit()
+
+    def stale_result(self, key):
+        """
+        Get the entry left by an earlier version of a file
+
+        add_to_summary counts it, so a rescan of the changed file must
+        take it back out of the summary.
+
+        Args:
+            key: file_key of the file's current contents
+
+        Returns:
+            dict: Status and barcode counts of the stale entry, or None
+        """
+        path, size, mtime_ns = key
+        row = self.conn.execute(
+            'SELECT status, total_barcodes, code39_barcodes FROM completed '
+            'WHERE path = ? AND NOT (size = ? AND mtime_ns = ?)',
+            (path, size, mtime_ns)).fetchone()
+        if row is None:
+            return None
+        status, total, code39 = row
+        return {'status': status, 'total_barcodes': total, 'code39_barcodes': code39}
+
+    def add_to_summary(self, summary):
+        """
+        Count the completed files of earlier runs into a ScanSummary
+
+        Args:
+            summary: ScanSummary to update
+        """
+        total, successful, barcodes, code39 = self.conn.execute('''
+            SELECT COUNT(*), COALESCE(SUM(status = 'success'), 0),
+                   COALESCE(SUM(total_barcodes), 0), COALESCE(SUM(code39_barcodes), 0)
+            FROM completed
+        ''').fetchone()
+        summary.total_files += total
+        summary.successful_scans += successful
+        summary.total_barcodes += barcodes
+        summary.code39_barcodes += code39
+
+    def close(self):
+        """Close the checkpoint store"""
+        self.conn.close()
@@ -0,0 +1,233 @@
+"""
+Decode Cache
+Persistent cache of detect_barcodes results, keyed by image content hash
+"""
+
+import base64
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from pyzbar.locations import Point, Rect
+
+# Cached barcodes are rebuilt with the fields of pyzbar.pyzbar.Decoded.
+# Importing that module loads libzbar, which reading the cache never needs.
+Decoded = namedtuple('Decoded', 'data type rect polygon quality orientation')
+
+# Bump when the stored format or the detection pipeline changes
+CACHE_FORMAT = 1
+
+# Limits are checked after this many inserts rather than on every one
+EVICT_INTERVAL = 64
+
+
+def content_hash(data):
+    """
+    Hash encoded image bytes
+
+    Args:
+        data: Encoded image bytes (the file as stored, not decoded pixels)
+
+    Returns:
+        bytes: 16-byte BLAKE2b digest
+    """
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def detector_version(detector, **options):
+    """
+    Build the cache version key for a detector and its caller's settings
+
+    Results cached under one version are never returned for another, so
+    changing the mode, profile, pass order or loading options (max_dim,
+    ...) cannot serve stale decodes.
+
+    Args:
+        detector: BarcodeDetector doing the decoding
+        **options: Caller settings that change the result, e.g. max_dim
+
+    Returns:
+        str: Version key
+    """
+    settings = {
+        'format': CACHE_FORMAT,
+        'mode': detector.mode,
+        'profile': detector.profile,
+        'pass_order': list(detector.pass_order),
+        'adaptive': detector.adaptive,
+        'prune_below': detector.prune_below,
+    }
+    settings.update(options)
+    return json.dumps(settings, sort_keys=True, separators=(',', ':'))
+
+
+def _encode_barcode(barcode):
+    """Convert a pyzbar barcode to a JSON-safe dict"""
+    fields = barcode._asdict()
+    fields['data'] = base64.b64encode(barcode.data).decode('ascii')
+    fields['rect'] = list(barcode.rect)
+    fields['polygon'] = [list(point) for point in barcode.polygon]
+    return fields
+
+
+def _decode_barcode(fields):
+    """Rebuild a barcode from _encode_barcode output"""
+    fields = dict(fields)
+    fields['data'] = base64.b64decode(fields['data'])
+    fields['rect'] = Rect(*fields['rect'])
+    fields['polygon'] = [Point(*point) for point in fields['polygon']]
+    return Decoded(**fields)
+
+
+class DecodeCache:
+    def __init__(self, path, version, max_entries=100000, max_bytes=64 * 1024 * 1024):
+        """
+        Open (or create) a decode cache
+
+        Entries are evicted least recently used first once the cache holds
+        more than max_entries results or max_bytes of stored data. The
+        cache is a SQLite database, so several processes may share it.
+
+        Args:
+            path: Cache database path
+            version: Version key from detector_version
+            max_entries: Most results kept
+            max_bytes: Most stored result bytes kept
+        """
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS decodes (
+                hash BLOB NOT NULL,
+                version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (hash, version)
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS decodes_last_used ON decodes (last_used)')
+        self.conn.commit()
+
+    def get(self, data):
+        """
+        Look up the cached result for an encoded image
+
+        Args:
+            data: Encoded image bytes
+
+        Returns:
+            tuple: (barcodes, info) or None on a miss, where info is the
+                dict passed to put
+        """
+        key = content_hash(data)
+        with self.lock:
+            try:
+                row = self.conn.execute(
+                    'SELECT result FROM decodes WHERE hash = ? AND version = ?',
+                    (key, self.version)).fetchone()
+                if row is not None:
+                    self.conn.execute(
+                        'UPDATE decodes SET last_used = ? WHERE hash = ? AND version = ?',
+                        (time.time(), key, self.version))
+                    self.conn.commit()
+            except sqlite3.Error:
+                # Another process holding the database too long is just a miss
+                row = None
+
+            if row is not None:
+                try:
+                    entry = json.loads(row[0])
+                    barcodes = [_decode_barcode(b) for b in entry['barcodes']]
+                    info = entry['info']
+                except (TypeError, ValueError, KeyError):
+                    # Written by an incompatible pyzbar; it will be replaced
+                    row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return barcodes, info
+
+    def put(self, data, barcodes, info=None):
+        """
+        Store the result for an encoded image
+
+        Args:
+            data: Encoded image bytes
+            barcodes: pyzbar barcodes returned by detection
+            info: Optional JSON-safe dict returned alongside them by get,
+                e.g. the image size
+        """
+        result = json.dumps({
+            'barcodes': [_encode_barcode(b) for b in barcodes],
+            'info': info or {}
+        }, separators=(',', ':'))
+
+        with self.lock:
+            try:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO decodes VALUES (?, ?, ?, ?, ?)',
+                    (content_hash(data), self.version, result, len(result), time.time()))
+                self.conn.commit()
+                self.inserts += 1
+                if self.inserts % EVICT_INTERVAL == 0:
+                    self._evict()
+            except sqlite3.Error as e:
+                print(f"⚠️  Decode cache write failed: {e}")
+
+    def _evict(self):
+        """Delete least recently used entries until within the limits"""
+        count, total = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM decodes').fetchone()
+        excess_entries = count - self.max_entries
+        excess_bytes = total - self.max_bytes
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+
+        doomed = []
+        cursor = self.conn.execute('SELECT rowid, size FROM decodes ORDER BY last_used')
+        for rowid, size in cursor:
+            if excess_entries <= 0 and excess_bytes <= 0:
+                break
+            doomed.append((rowid,))
+            excess_entries -= 1
+            excess_bytes -= size
+        cursor.close()
+
+        self.conn.executemany('DELETE FROM decodes WHERE rowid = ?', doomed)
+        self.conn.commit()
+
+    def get_stats(self):
+        """
+        Get cache statistics
+
+        Returns:
+            dict: Hit and miss counters for this process
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'cache_hits': self.hits,
+                'cache_misses': self.misses,
+                'cache_hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+    def close(self):
+        """Close the cache database"""
+        with self.lock:
+            self.conn.close()
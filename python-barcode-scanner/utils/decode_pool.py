@@ -0,0 +1,311 @@
+"""
+Server-side Decode Utilities
+Bounded worker pool that decodes uploaded camera frames with BarcodeDetector
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .decode_cache import DecodeCache, detector_version
+from .detector import transform_barcode
+
+# Largest phone frame accepted by /decode, in bytes (handlers may override
+# max_decode_bytes)
+MAX_DECODE_BYTES = 4 * 1024 * 1024
+
+
+class DecodeQueueFull(Exception):
+    """Raised when the decode pool already holds max_pending frames"""
+
+    def __init__(self, retry_after=1):
+        super().__init__("Decode queue is full")
+        self.retry_after = retry_after
+
+
+def load_frame(data, max_dim=1280):
+    """
+    Decode an uploaded image to grayscale, downscaled to at most max_dim
+
+    Args:
+        data: Encoded image bytes (JPEG, PNG, ...)
+        max_dim: Longest side kept for decoding, or None for full size
+
+    Returns:
+        tuple: (gray_frame, scale, (width, height)) where scale maps
+            decoded pixels back to the original image
+
+    Raises:
+        ValueError: If the bytes are not a readable image
+    """
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    gray = cv2.imdecode(buffer, cv2.IMREAD_GRAYSCALE) if buffer.size else None
+    if gray is None:
+        raise ValueError("Could not decode image")
+
+    height, width = gray.shape[:2]
+    longest = max(height, width)
+    if not max_dim or longest <= max_dim:
+        return gray, 1.0, (width, height)
+
+    factor = max_dim / longest
+    small = cv2.resize(gray, (max(1, int(width * factor)), max(1, int(height * factor))),
+                       interpolation=cv2.INTER_AREA)
+    return small, longest / max(small.shape[:2]), (width, height)
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an ascending list, 0.0 if empty"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(percent / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class DecodePool:
+    def __init__(self, detector, workers=2, max_pending=8, max_dim=1280, cache=None):
+        """
+        Decode uploaded frames on a fixed number of threads
+
+        At most max_pending frames may be queued or decoding at once;
+        further submissions raise DecodeQueueFull straight away so the
+        server can answer 503 instead of piling up work it cannot finish.
+
+        Args:
+            detector: BarcodeDetector used for decoding
+            workers: Number of decode threads
+            max_pending: Frames allowed in the pool, including running ones
+            max_dim: Longest side frames are downscaled to on ingest
+            cache: Optional DecodeCache; repeated images skip decoding
+        """
+        self.detector = detector
+        self.cache = cache
+        self.workers = workers
+        self.max_pending = max(max_pending, workers)
+        self.max_dim = max_dim
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix='decode')
+        self.slots = threading.BoundedSemaphore(self.max_pending)
+        self.lock = threading.Lock()
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        # Recent decode times for percentiles
+        self.latencies = deque(maxlen=1000)
+
+    def submit(self, data, source='decode'):
+        """
+        Queue an encoded image for decoding
+
+        Args:
+            data: Encoded image bytes
+            source: Source identifier for adaptive pass ordering
+
+        Returns:
+            Future: Resolves to the decode_frame result
+
+        Raises:
+            DecodeQueueFull: If max_pending frames are already in the pool
+        """
+        if not self.slots.acquire(blocking=False):
+            with self.lock:
+                self.rejected += 1
+            raise DecodeQueueFull(self.retry_after())
+
+        with self.lock:
+            self.submitted += 1
+        try:
+            return self.executor.submit(self._run, data, source)
+        except RuntimeError:
+            self.slots.release()
+            raise
+
+    def decode(self, data, source='decode'):
+        """Submit a frame and wait for its result"""
+        return self.submit(data, source).result()
+
+    def _run(self, data, source):
+        """Decode one frame on a worker thread, releasing its slot afterwards"""
+        start = time.perf_counter()
+        try:
+            result = self.decode_frame(data, source)
+        except Exception:
+            with self.lock:
+                self.failed += 1
+            raise
+        finally:
+            self.slots.release()
+
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.completed += 1
+            self.total_time += elapsed
+            self.max_time = max(self.max_time, elapsed)
+            self.latencies.append(elapsed)
+
+        result['decode_ms'] = round(elapsed * 1000, 1)
+        return result
+
+    def decode_frame(self, data, source='decode'):
+        """
+        Decode the barcodes in an encoded image
+
+        Args:
+            data: Encoded image bytes
+            source: Source identifier for adaptive pass ordering
+
+        Returns:
+            dict: Image size and the supported, valid barcodes found, with
+                rects in original image coordinates; cached is True when
+                the result came from the decode cache
+
+        Raises:
+            ValueError: If the bytes are not a readable image
+        """
+        cached = self.cache.get(data) if self.cache is not None else None
+        if cached is not None:
+            raw_barcodes, info = cached
+        else:
+            gray, scale, (width, height) = load_frame(data, self.max_dim)
+            raw_barcodes = self.detector.detect_barcodes(gray, source=source)
+            if scale != 1.0:
+                raw_barcodes = [transform_barcode(b, scale=scale) for b in raw_barcodes]
+            info = {'width': width, 'height': height, 'scale': round(scale, 3)}
+            if self.cache is not None:
+                self.cache.put(data, raw_barcodes, info)
+
+        barcodes = []
+        for barcode in raw_barcodes:
+            try:
+                barcode_info = self.detector.process_barcode(barcode)
+            except UnicodeDecodeError:
+                continue
+            if (self.detector.is_supported_barcode(barcode_info) and
+                    self.detector.validate_barcode_data(barcode_info)):
+                barcodes.append(barcode_info)
+
+        return dict(info, barcodes=barcodes, cached=cached is not None)
+
+    def retry_after(self):
+        """Seconds a rejected client should wait, from the recent decode time"""
+        with self.lock:
+            average = self.total_time / self.completed if self.completed else 0.5
+        backlog = average * self.max_pending / max(self.workers, 1)
+        return max(1, int(round(backlog)))
+
+    def get_stats(self):
+        """
+        Get decode pool statistics
+
+        Returns:
+            dict: Counters and latency in milliseconds
+        """
+        with self.lock:
+            average = self.total_time / self.completed if self.completed else 0.0
+            recent = sorted(self.latencies)
+            stats = {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+                'avg_decode_ms': round(average * 1000, 1),
+                'p50_decode_ms': round(percentile(recent, 50) * 1000, 1),
+                'p95_decode_ms': round(percentile(recent, 95) * 1000, 1),
+                'max_decode_ms': round(self.max_time * 1000, 1)
+            }
+        if self.cache is not None:
+            stats.update(self.cache.get_stats())
+        return stats
+
+    def close(self):
+        """Wait for queued frames, stop the worker threads and close the cache"""
+        self.executor.shutdown(wait=True)
+        if self.cache is not None:
+            self.cache.close()
+
+
+def create_decode_pool(detector, workers, cache_path=None, cache_size=64, max_dim=1280):
+    """
+    Create the /decode pool for a mobile server
+
+    Args:
+        detector: The server's BarcodeDetector
+        workers: Decode threads, or 0 to disable server-side decoding
+        cache_path: Decode cache database, or None for no cache
+        cache_size: Decode cache size limit in MB
+        max_dim: Longest side frames are downscaled to
+
+    Returns:
+        DecodePool: The pool, or None if workers is 0
+    """
+    if workers <= 0:
+        return None
+    cache = None
+    if cache_path:
+        version = detector_version(detector, pipeline='decode_pool', max_dim=max_dim)
+        cache = DecodeCache(cache_path, version, max_bytes=cache_size * 1024 * 1024)
+    return DecodePool(detector, workers=workers, max_pending=workers * 4,
+                      max_dim=max_dim, cache=cache)
+
+
+class DecodeHandlerMixin:
+    """
+    POST /decode for KeepAliveHandlerMixin request handlers
+
+    The handler must set self.decode_pool to a DecodePool (or None to
+    disable the endpoint).
+    """
+    decode_pool = None
+    decode_source = 'mobile_decode'
+    max_decode_bytes = MAX_DECODE_BYTES
+
+    def handle_decode_post(self):
+        """Decode a JPEG frame or cropped region uploaded by a phone"""
+        if self.decode_pool is None:
+            self.send_json(404, {'status': 'error', 'message': 'Server-side decoding is disabled'})
+            return
+
+        data = self.read_body(self.max_decode_bytes)
+        if data is None:
+            return
+
+        self.send_decode_result(data, 'uploaded frame')
+
+    def send_decode_result(self, data, description):
+        """
+        Decode an image on the pool and send the result
+
+        Answers 503 with Retry-After when the pool is full, 400 for an
+        unreadable image and 500 for any other failure.
+
+        Args:
+            data: Encoded image bytes
+            description: What the image is, for the error log
+        """
+        try:
+            result = self.decode_pool.decode(data, source=self.decode_source)
+        except DecodeQueueFull as e:
+            self.send_body(503, 'application/json',
+                           b'{"status": "error", "message": "Decoder busy"}',
+                           {'Retry-After': str(e.retry_after)})
+            return
+        except ValueError as e:
+            self.send_json(400, {'status': 'error', 'message': str(e)})
+            return
+        except Exception as e:
+            print(f"Error decoding {description}: {e}")
+            self.send_json(500, {'status': 'error', 'message': str(e)})
+            return
+
+        result['status'] = 'success'
+        self.send_json(200, result)
@@ -0,0 +1,267 @@
+"""
+Detection Log Utilities
+Append-only JSON Lines storage for detected barcodes
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+
+
+def detection_log_path(filename):
+    """
+    Get the JSON Lines log path for a detections filename
+
+    Args:
+        filename: Detections filename, e.g. 'mobile_detections.json'
+
+    Returns:
+        str: Log path, e.g. 'mobile_detections.jsonl'
+    """
+    if filename.endswith('.json'):
+        return filename + 'l'
+    return filename
+
+
+# One background thread flushes every open log, so writers never touch
+# the disk themselves
+_open_logs = set()
+_open_logs_lock = threading.Lock()
+_flusher = None
+_flusher_wake = threading.Event()
+
+
+def _register_log(log):
+    """Track an open log and make sure the shared flusher is running"""
+    global _flusher
+    with _open_logs_lock:
+        _open_logs.add(log)
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name='detection-log-flusher',
+                                        daemon=True)
+            _flusher.start()
+    _flusher_wake.set()
+
+
+def _unregister_log(log):
+    """Stop flushing a closed log"""
+    with _open_logs_lock:
+        _open_logs.discard(log)
+
+
+def _flush_loop():
+    """Flush open logs with buffered records at least every flush_interval"""
+    timeout = None
+    while True:
+        _flusher_wake.wait(timeout)
+        # Clear before looking at the logs, so a log registered or filled
+        # from here on wakes the next wait instead of being missed
+        _flusher_wake.clear()
+        with _open_logs_lock:
+            logs = list(_open_logs)
+
+        for log in logs:
+            if not log._has_pending():
+                continue
+            try:
+                log.flush()
+            except Exception as e:
+                print(f"Error flushing detection log {log.path}: {e}")
+        timeout = min((log.flush_interval for log in logs), default=None)
+
+
+def close_open_logs():
+    """Flush and close every open detection log"""
+    with _open_logs_lock:
+        logs = list(_open_logs)
+    for log in logs:
+        log.close()
+
+
+atexit.register(close_open_logs)
+
+
+class DetectionLog:
+    def __init__(self, path, flush_every=20, flush_interval=1.0, fsync_interval=5.0):
+        """
+        Buffered, append-only JSON Lines sink
+
+        Each detection is one JSON object per line, so saving is O(1) per
+        detection instead of re-serialising the whole history. Writes only
+        append to an in-memory buffer; the shared flusher thread writes it
+        out once it holds flush_every records or flush_interval seconds
+        have passed, and fsyncs at most every fsync_interval seconds.
+
+        Args:
+            path: Log file path
+            flush_every: Flush after this many buffered records
+            flush_interval: Maximum seconds a record stays buffered
+            fsync_interval: Minimum seconds between fsync calls
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+
+        # _lock guards the buffer only; _io_lock serialises disk writes so
+        # writers are never blocked behind a slow flush
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._buffer = []
+        self._closed = False
+        self._file = None
+        self._last_fsync = time.monotonic()
+
+        _register_log(self)
+
+    def write(self, record):
+        """
+        Append a detection record
+
+        Args:
+            record: JSON-serialisable detection dict
+        """
+        self.write_many([record])
+
+    def write_many(self, records):
+        """
+        Append several detection records in one buffered write
+
+        Args:
+            records: Iterable of JSON-serialisable detection dicts
+        """
+        lines = [json.dumps(record, default=str) + '\n' for record in records]
+        with self._lock:
+            if self._closed:
+                raise ValueError(f"Detection log is closed: {self.path}")
+            self._buffer.extend(lines)
+            full = len(self._buffer) >= self.flush_every
+        if full:
+            _flusher_wake.set()
+
+    def _has_pending(self):
+        """Check for buffered records"""
+        with self._lock:
+            return bool(self._buffer)
+
+    def flush(self, fsync=False):
+        """
+        Write buffered records to disk on the calling thread
+
+        Args:
+            fsync: Force an fsync regardless of fsync_interval
+        """
+        with self._io_lock:
+            self._write_buffer(fsync)
+
+    def _write_buffer(self, fsync=False):
+        """Write out the buffer; the caller must hold _io_lock"""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+
+        if lines:
+            try:
+                if self._file is None:
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                self._file.write(''.join(lines))
+                self._file.flush()
+            except Exception:
+                # Keep the records for the next attempt
+                with self._lock:
+                    self._buffer[:0] = lines
+                raise
+
+        if self._file is None:
+            return
+        now = time.monotonic()
+        if fsync or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def close(self):
+        """Flush, fsync and close the log"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        _unregister_log(self)
+
+        with self._io_lock:
+            try:
+                self._write_buffer(fsync=True)
+            finally:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+
+
+def read_detection_log(path):
+    """
+    Iterate over the records of a JSON Lines detection log
+
+    A truncated last line (e.g. after a crash) is skipped.
+
+    Args:
+        path: Log file path
+
+    Yields:
+        dict: Detection records in the order they were written
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️  Skipping unreadable line {line_number} in {path}")
+
+
+def convert_log_to_json(log_path, output_path):
+    """
+    Convert a JSON Lines log to the JSON list layout used by save_detection
+
+    Records are streamed, so memory use does not grow with the log size.
+
+    Args:
+        log_path: JSON Lines log path
+        output_path: JSON output path
+
+    Returns:
+        int: Number of records written
+    """
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as out:
+        out.write('[')
+        for record in read_detection_log(log_path):
+            # Same layout as json.dump(records, f, indent=2)
+            item = json.dumps(record, indent=2).replace('\n', '\n  ')
+            out.write((',\n  ' if count else '\n  ') + item)
+            count += 1
+        out.write('\n]' if count else ']')
+    return count
+
+
+def compact_log(log_path):
+    """
+    Rewrite a JSON Lines log in place, dropping unreadable lines
+
+    Args:
+        log_path: JSON Lines log path
+
+    Returns:
+        int: Number of records kept
+    """
+    temp_path = log_path + '.tmp'
+    count = 0
+    with open(temp_path, 'w', encoding='utf-8') as out:
+        for record in read_detection_log(log_path):
+            out.write(json.dumps(record, default=str) + '\n')
+            count += 1
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(temp_path, log_path)
+    return count
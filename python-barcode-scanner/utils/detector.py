@@ -6,58 +6,520 @@ Core logic for detecting and decoding Code 39 barcodes
 import cv2
 import numpy as np
 from pyzbar import pyzbar
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import json
+import threading
+
+from .detection_log import DetectionLog, detection_log_path
+from .history import DetectionHistory
+
+
+# Preprocessing passes tried by detect_barcodes, in their default order
+PREPROCESSING_METHODS = (
+    'original',
+    'blur',
+    'adaptive_threshold',
+    'morph_close',
+    'edges',
+    'equalized',
+)
+
+# exhaustive: decode every pass and merge the results
+# cascade: stop at the first pass that yields a validated barcode
+# parallel: decode every pass concurrently on the shared thread pool
+DETECTION_MODES = ('exhaustive', 'cascade', 'parallel')
+
+# Named symbology sets passed to pyzbar's symbols= argument, using zbar's own
+# type names (interleaved 2 of 5 is reported as I25). Restricting the
+# symbologies lets zbar skip scanners we never use (None = search all).
+DECODE_PROFILES = {
+    'all': None,
+    'attendance': ('CODE39',),
+    'linear': ('CODE39', 'CODE93', 'CODE128', 'EAN8', 'EAN13', 'UPCA', 'UPCE',
+               'CODABAR', 'I25'),
+    '2d': ('QRCODE', 'PDF417'),
+}
+
+
+# Barcode families reported by get_detection_stats
+LINEAR_TYPES = {'CODE39', 'CODE128', 'EAN13', 'EAN8', 'UPCA', 'UPCE', 'CODABAR', 'I25', 'CODE93'}
+MATRIX_TYPES = {'QRCODE', 'DATAMATRIX', 'PDF417', 'AZTEC'}
+
+
+def resolve_decode_profile(profile):
+    """
+    Resolve a decode profile name to pyzbar symbols
+
+    Args:
+        profile: Name from DECODE_PROFILES
+
+    Returns:
+        list: ZBarSymbol values, or None to search every symbology
+    """
+    if profile not in DECODE_PROFILES:
+        raise ValueError(f"Unknown decode profile: {profile}")
+
+    names = DECODE_PROFILES[profile]
+    if names is None:
+        return None
+    # Skip symbologies the installed zbar build does not know about
+    return [getattr(pyzbar.ZBarSymbol, name) for name in names
+            if hasattr(pyzbar.ZBarSymbol, name)]
+
+
+def transform_barcode(barcode, offset=(0, 0), scale=1.0):
+    """
+    Map a barcode found in a cropped or rescaled image back to frame coordinates
+
+    Args:
+        barcode: pyzbar barcode object
+        offset: (x, y) position of the crop within the frame
+        scale: Factor from crop pixels to frame pixels
+
+    Returns:
+        pyzbar barcode object with rect and polygon in frame coordinates
+    """
+    dx, dy = offset
+    rect = barcode.rect
+    new_rect = type(rect)(
+        int(round(rect.left * scale)) + dx,
+        int(round(rect.top * scale)) + dy,
+        int(round(rect.width * scale)),
+        int(round(rect.height * scale))
+    )
+    polygon = [type(point)(int(round(point.x * scale)) + dx,
+                           int(round(point.y * scale)) + dy)
+               for point in barcode.polygon]
+    return barcode._replace(rect=new_rect, polygon=polygon)
+
+
+# Thread pool shared by all detectors in 'parallel' mode. OpenCV filters and
+# zbar both release the GIL, so the passes genuinely run side by side.
+_shared_executor = None
+_shared_executor_lock = threading.Lock()
+
+
+def get_shared_executor():
+    """
+    Get the thread pool used for parallel preprocessing passes
+
+    Returns:
+        ThreadPoolExecutor: Shared executor, created on first use
+    """
+    global _shared_executor
+    with _shared_executor_lock:
+        if _shared_executor is None:
+            _shared_executor = ThreadPoolExecutor(
+                max_workers=len(PREPROCESSING_METHODS),
+                thread_name_prefix='barcode-pass'
+            )
+        return _shared_executor
+
+
+class PassStatistics:
+    """Rolling hit statistics for the preprocessing passes of one source"""
+
+    def __init__(self, window=200):
+        self.hits = deque(maxlen=window)
+        self.frames = 0
+        self.decode_calls = 0
+
+    def record_frame(self, hit_method, decode_calls):
+        """
+        Record the outcome of one detect_barcodes call
+
+        Args:
+            hit_method: Preprocessing method that produced the first valid
+                barcode, or None if nothing was found
+            decode_calls: Number of pyzbar.decode calls spent on the frame
+        """
+        self.frames += 1
+        self.decode_calls += decode_calls
+        if hit_method is not None:
+            self.hits.append(hit_method)
+
+    def hit_rates(self):
+        """
+        Get the share of recent hits produced by each method
+
+        Returns:
+            dict: Method name -> hit rate (0-1)
+        """
+        if not self.hits:
+            return {}
+
+        counts = {}
+        for method in self.hits:
+            counts[method] = counts.get(method, 0) + 1
+        return {method: count / len(self.hits) for method, count in counts.items()}
+
+    def ordered(self, base_order):
+        """Sort base_order by recent hit count, keeping base order for ties"""
+        rates = self.hit_rates()
+        return sorted(base_order,
+                      key=lambda m: (-rates.get(m, 0), base_order.index(m)))
+
+    def summary(self):
+        """
+        Get a summary of the recorded statistics
+
+        Returns:
+            dict: Frame, hit and decode call counters
+        """
+        return {
+            'frames': self.frames,
+            'recent_hits': len(self.hits),
+            'hit_rates': self.hit_rates(),
+            'mean_decode_calls': (self.decode_calls / self.frames) if self.frames else 0.0
+        }
 
 
 class BarcodeDetector:
-    def __init__(self):
-        self.detected_barcodes = []
+    def __init__(self, mode='exhaustive', pass_order=None, adaptive=False,
+                 stats_window=200, prune_below=None, min_samples=30,
+                 explore_interval=50, profile='all', history_size=1000,
+                 spill_file=None):
+        if mode not in DETECTION_MODES:
+            raise ValueError(f"Unknown detection mode: {mode}")
+
+        pass_order = tuple(pass_order or PREPROCESSING_METHODS)
+        unknown = [m for m in pass_order if m not in PREPROCESSING_METHODS]
+        if unknown:
+            raise ValueError(f"Unknown preprocessing method(s): {', '.join(unknown)}")
+
+        self.mode = mode
+        self.pass_order = pass_order
+        self.profile = profile
+        self.symbols = resolve_decode_profile(profile)
+
+        # Adaptive pass ordering, learned per camera/source
+        self.adaptive = adaptive
+        self.stats_window = stats_window
+        self.prune_below = prune_below
+        self.min_samples = min_samples
+        self.explore_interval = explore_interval
+        self.pass_stats = {}
+
+        # Guards the history, counters, logs and pass statistics so one
+        # detector can be shared by concurrent request handlers
+        self.lock = threading.RLock()
+
+        # Bounded in-memory history; detections that fall out of it and
+        # were never saved are spilled to spill_file if one is configured
+        self.spill_file = spill_file
+        self.detected_barcodes = DetectionHistory(history_size, on_evict=self._spill_detection)
         self.last_detection_time = None
-        
-    def detect_barcodes(self, frame):
+        self.detection_logs = {}
+        self._reset_stats()
+        self.morph_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+
+    def detect_barcodes(self, frame, source='default'):
         """
         Detect barcodes in a frame with enhanced preprocessing
 
+        In 'exhaustive' mode every preprocessing pass is decoded and the
+        results are merged. In 'cascade' mode passes are tried in
+        pass_order and the search stops at the first pass that yields a
+        supported, valid barcode, so clean frames cost a single decode.
+
+        With adaptive ordering enabled, the passes are reordered by their
+        recent hit rate for the given source, and passes below prune_below
+        are skipped except on every explore_interval-th frame. A frame the
+        kept passes miss is retried with the pruned ones before giving up,
+        so pruning costs time on hard frames but never recall.
+
         Args:
-            frame: OpenCV image frame
+            frame: OpenCV image frame (color or grayscale)
+            source: Camera/source identifier used for adaptive ordering
 
         Returns:
             list: List of detected barcode objects
         """
         # Convert to grayscale for better detection
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = self._to_gray(frame)
+        pass_order = self.get_pass_order(source)
+
+        if self.mode == 'cascade':
+            detect = self._detect_cascade
+        elif self.mode == 'parallel':
+            detect = self._detect_parallel
+        else:
+            detect = self._detect_exhaustive
+        barcodes, hit_method, decode_calls = detect(gray, pass_order)
+
+        if hit_method is None and len(pass_order) < len(self.pass_order):
+            # The pruned passes may be the only ones that work after a
+            # scene change; recording their hits lets the order recover
+            pruned = tuple(m for m in self.pass_order if m not in pass_order)
+            more, hit_method, more_calls = detect(gray, pruned)
+            barcodes = barcodes + more
+            decode_calls += more_calls
+
+        with self.lock:
+            self._get_pass_stats(source).record_frame(hit_method, decode_calls)
+
+        return self._remove_duplicates(barcodes)
+
+    def detect_barcodes_multiscale(self, frame, max_dim=1280, max_regions=5,
+                                   source='default'):
+        """
+        Coarse-to-fine detection for large still images
+
+        Candidate barcode regions are located on a downscaled copy using
+        gradient and morphology analysis, then only those regions are
+        decoded at full resolution. If no region yields a valid barcode,
+        the downscaled image itself is decoded as a fallback. Time and
+        memory per image are bounded by max_dim rather than photo size.
+
+        Args:
+            frame: OpenCV image frame (color or grayscale)
+            max_dim: Longest side, in pixels, that is decoded in one piece
+            max_regions: Maximum number of candidate regions to decode
+            source: Camera/source identifier used for adaptive ordering
+
+        Returns:
+            list: Detected barcode objects in full-frame coordinates
+        """
+        gray = self._to_gray(frame)
+        height, width = gray.shape[:2]
+        if max(height, width) <= max_dim:
+            return self.detect_barcodes(gray, source=source)
+
+        barcodes = []
+        for region in self.locate_barcode_regions(gray, max_dim=max_dim,
+                                                  max_regions=max_regions):
+            x, y, w, h = region
+            if max(w, h) > max_dim:
+                # Oversized candidate, decode it downscaled as well
+                crop = gray[y:y + h, x:x + w]
+                found = [transform_barcode(b, (x, y))
+                         for b in self._detect_downscaled(crop, max_dim, source)]
+            else:
+                found = self.detect_barcodes_in_region(gray, region, source=source)
+            barcodes.extend(found)
+
+        if not any(self._is_valid_detection(barcode) for barcode in barcodes):
+            barcodes.extend(self._detect_downscaled(gray, max_dim, source))
+
+        return self._remove_duplicates(barcodes)
+
+    def locate_barcode_regions(self, frame, max_dim=1280, max_regions=5):
+        """
+        Locate candidate barcode regions on a downscaled copy of the frame
+
+        Args:
+            frame: OpenCV image frame (color or grayscale)
+            max_dim: Longest side of the analysis image
+            max_regions: Maximum number of regions to return
+
+        Returns:
+            list: (x, y, w, h) regions in full-frame coordinates, largest first
+        """
+        gray = self._to_gray(frame)
+        height, width = gray.shape[:2]
+        scale = min(1.0, max_dim / float(max(height, width)))
+        small = cv2.resize(gray, None, fx=scale, fy=scale,
+                           interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+
+        # Barcodes have strong gradients in one direction only
+        grad_x = cv2.Sobel(small, cv2.CV_32F, 1, 0, ksize=-1)
+        grad_y = cv2.Sobel(small, cv2.CV_32F, 0, 1, ksize=-1)
+        gradient = cv2.convertScaleAbs(cv2.absdiff(np.abs(grad_x), np.abs(grad_y)))
+
+        # Merge the bars into solid blobs
+        blurred = cv2.blur(gradient, (9, 9))
+        _, thresh = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (21, 7))
+        closed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+        closed = cv2.erode(closed, None, iterations=4)
+        closed = cv2.dilate(closed, None, iterations=4)
+
+        contours = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+        min_area = 0.001 * small.shape[0] * small.shape[1]
+        contours = sorted((c for c in contours if cv2.contourArea(c) >= min_area),
+                          key=cv2.contourArea, reverse=True)[:max_regions]
+
+        regions = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            # Back to full resolution, with a margin for the quiet zone
+            pad_x, pad_y = int(w * 0.1) + 2, int(h * 0.1) + 2
+            x0 = max(0, int((x - pad_x) / scale))
+            y0 = max(0, int((y - pad_y) / scale))
+            x1 = min(width, int((x + w + pad_x) / scale))
+            y1 = min(height, int((y + h + pad_y) / scale))
+            regions.append((x0, y0, x1 - x0, y1 - y0))
+
+        return regions
+
+    def _detect_downscaled(self, gray, max_dim, source):
+        """Decode a copy scaled to fit max_dim, in original coordinates"""
+        height, width = gray.shape[:2]
+        scale = max_dim / float(max(height, width))
+        if scale >= 1.0:
+            return self.detect_barcodes(gray, source=source)
+
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return [transform_barcode(barcode, scale=1.0 / scale)
+                for barcode in self.detect_barcodes(small, source=source)]
+
+    def detect_barcodes_in_region(self, frame, region, source='default'):
+        """
+        Detect barcodes inside a rectangular region of a frame
+
+        Args:
+            frame: OpenCV image frame
+            region: (x, y, w, h) region to search, clipped to the frame
+            source: Camera/source identifier used for adaptive ordering
 
-        # Try multiple preprocessing techniques for better detection
+        Returns:
+            list: Detected barcode objects in full-frame coordinates
+        """
+        frame_h, frame_w = frame.shape[:2]
+        x, y, w, h = region
+        x0, y0 = max(0, int(x)), max(0, int(y))
+        x1, y1 = min(frame_w, int(x + w)), min(frame_h, int(y + h))
+        if x1 <= x0 or y1 <= y0:
+            return []
+
+        barcodes = self.detect_barcodes(frame[y0:y1, x0:x1], source=source)
+        return [transform_barcode(barcode, (x0, y0)) for barcode in barcodes]
+
+    def _to_gray(self, frame):
+        """Convert a BGR frame to grayscale, passing grayscale input through"""
+        if frame.ndim == 2:
+            return frame
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+    def _detect_exhaustive(self, gray, pass_order):
+        """Decode every preprocessing pass and collect all results"""
         barcodes = []
+        hit_method = None
+        for method in pass_order:
+            results = self._decode_pass(gray, method)
+            if hit_method is None and any(self._is_valid_detection(b) for b in results):
+                hit_method = method
+            barcodes.extend(results)
+        return barcodes, hit_method, len(pass_order)
+
+    def _detect_cascade(self, gray, pass_order):
+        """Decode passes in order until one yields a validated barcode"""
+        for decode_calls, method in enumerate(pass_order, 1):
+            barcodes = self._decode_pass(gray, method)
+            if any(self._is_valid_detection(barcode) for barcode in barcodes):
+                return barcodes, method, decode_calls
+        return [], None, len(pass_order)
+
+    def _detect_parallel(self, gray, pass_order):
+        """Decode every preprocessing pass concurrently and collect all results"""
+        executor = get_shared_executor()
+        futures = [executor.submit(self._decode_pass, gray, method) for method in pass_order]
+
+        # Merge in pass order so deduplication keeps the same barcode objects
+        # as the serial exhaustive mode
+        barcodes = []
+        hit_method = None
+        for method, future in zip(pass_order, futures):
+            results = future.result()
+            if hit_method is None and any(self._is_valid_detection(b) for b in results):
+                hit_method = method
+            barcodes.extend(results)
+        return barcodes, hit_method, len(pass_order)
+
+    def _decode_pass(self, gray, method):
+        """Preprocess and decode a single pass"""
+        return pyzbar.decode(self._preprocess(gray, method), symbols=self.symbols)
+
+    def _get_pass_stats(self, source):
+        """Get (or create) the pass statistics for a source"""
+        if source not in self.pass_stats:
+            self.pass_stats[source] = PassStatistics(self.stats_window)
+        return self.pass_stats[source]
+
+    def get_pass_order(self, source='default'):
+        """
+        Get the preprocessing pass order to use for the next frame
+
+        Args:
+            source: Camera/source identifier
+
+        Returns:
+            tuple: Preprocessing method names in decode order
+        """
+        if not self.adaptive:
+            return self.pass_order
+
+        with self.lock:
+            stats = self._get_pass_stats(source)
+            order = stats.ordered(self.pass_order)
 
-        # Method 1: Original image
-        barcodes.extend(pyzbar.decode(gray))
+            # Prune rarely useful passes, but periodically run the full list
+            # so that a change in lighting can bring them back
+            if (self.prune_below is not None and len(stats.hits) >= self.min_samples
+                    and (stats.frames + 1) % self.explore_interval != 0):
+                rates = stats.hit_rates()
+                kept = [m for m in order if rates.get(m, 0) >= self.prune_below]
+                if kept:
+                    order = kept
 
-        # Method 2: Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
-        barcodes.extend(pyzbar.decode(blurred))
+        return tuple(order)
 
-        # Method 3: Adaptive threshold
-        adaptive_thresh = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-        )
-        barcodes.extend(pyzbar.decode(adaptive_thresh))
+    def get_pass_statistics(self):
+        """
+        Get adaptive pass statistics for every source
 
-        # Method 4: Morphological operations
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
-        morph = cv2.morphologyEx(gray, cv2.MORPH_CLOSE, kernel)
-        barcodes.extend(pyzbar.decode(morph))
+        Returns:
+            dict: Source -> statistics summary including the current order
+        """
+        with self.lock:
+            return {
+                source: dict(stats.summary(), pass_order=list(self.get_pass_order(source)))
+                for source, stats in self.pass_stats.items()
+            }
 
-        # Method 5: Edge detection
-        edges = cv2.Canny(gray, 50, 150)
-        barcodes.extend(pyzbar.decode(edges))
+    def _preprocess(self, gray, method):
+        """
+        Apply a single preprocessing method to a grayscale image
 
-        # Method 6: Histogram equalization
-        equalized = cv2.equalizeHist(gray)
-        barcodes.extend(pyzbar.decode(equalized))
+        Args:
+            gray: Grayscale image
+            method: Name from PREPROCESSING_METHODS
 
-        # Remove duplicates based on data and position
+        Returns:
+            numpy.ndarray: Preprocessed image
+        """
+        if method == 'original':
+            return gray
+        elif method == 'blur':
+            # Gaussian blur to reduce noise
+            return cv2.GaussianBlur(gray, (3, 3), 0)
+        elif method == 'adaptive_threshold':
+            return cv2.adaptiveThreshold(
+                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+            )
+        elif method == 'morph_close':
+            return cv2.morphologyEx(gray, cv2.MORPH_CLOSE, self.morph_kernel)
+        elif method == 'edges':
+            return cv2.Canny(gray, 50, 150)
+        elif method == 'equalized':
+            return cv2.equalizeHist(gray)
+        raise ValueError(f"Unknown preprocessing method: {method}")
+
+    def _is_valid_detection(self, barcode):
+        """Check a raw pyzbar result against the supported/valid filters"""
+        try:
+            data = barcode.data.decode('utf-8')
+        except UnicodeDecodeError:
+            return False
+
+        barcode_info = {'data': data, 'type': barcode.type}
+        return (self.is_supported_barcode(barcode_info) and
+                self.validate_barcode_data(barcode_info))
+
+    def _remove_duplicates(self, barcodes):
+        """Remove duplicates based on data and position"""
         unique_barcodes = []
         seen = set()
 
@@ -130,7 +592,7 @@ class BarcodeDetector:
             'PDF417': 20,
             'AZTEC': 25,
             'CODABAR': 15,
-            'ITF': 15,
+            'I25': 15,
             'CODE93': 15
         }.get(barcode.type, 10)
 
@@ -183,17 +645,153 @@ class BarcodeDetector:
         """
         Save detected barcode to file
         
+        Detections are appended to a JSON Lines log next to filename
+        (e.g. 'detected_barcodes.jsonl'); use compact_detections.py to
+        convert it to a single JSON list.
+        
         Args:
             barcode_info: Processed barcode information
             filename: Output filename
         """
-        self.detected_barcodes.append(barcode_info)
-        
+        with self.lock:
+            record = self.add_detection(barcode_info)
+            # Marked before the write so an eviction in between does not
+            # spill it as well
+            record.logged = True
+
+        # Outside the lock; the log only buffers and flushes on its own thread
         try:
-            with open(filename, 'w') as f:
-                json.dump(self.detected_barcodes, f, indent=2)
+            self.get_detection_log(filename).write(barcode_info)
         except Exception as e:
+            record.logged = False
             print(f"Error saving detection: {e}")
+
+    def save_detections(self, barcode_infos, filename='detected_barcodes.json'):
+        """
+        Save several detected barcodes with a single log write
+
+        Args:
+            barcode_infos: List of processed barcode information dicts
+            filename: Output filename
+        """
+        if not barcode_infos:
+            return
+
+        with self.lock:
+            records = [self.add_detection(info) for info in barcode_infos]
+            for record in records:
+                record.logged = True
+
+        try:
+            self.get_detection_log(filename).write_many(barcode_infos)
+        except Exception as e:
+            for record in records:
+                record.logged = False
+            print(f"Error saving detections: {e}")
+
+    def add_detection(self, barcode_info):
+        """
+        Record a detection in the history and running statistics
+        
+        Args:
+            barcode_info: Processed barcode information
+            
+        Returns:
+            DetectionRecord: Record stored in the history
+        """
+        with self.lock:
+            record = self.detected_barcodes.append(barcode_info)
+            
+            barcode_type = barcode_info['type']
+            self.type_counts[barcode_type] = self.type_counts.get(barcode_type, 0) + 1
+            self.total_detections += 1
+            if barcode_type in LINEAR_TYPES:
+                self.linear_count += 1
+            elif barcode_type in MATRIX_TYPES:
+                self.matrix_count += 1
+            self.last_detection = barcode_info
+            return record
+    
+    def _spill_detection(self, record):
+        """Write an evicted, unsaved detection to the spill log"""
+        if self.spill_file and not record.logged:
+            try:
+                self.get_detection_log(self.spill_file).write(record.to_dict())
+            except Exception as e:
+                print(f"Error spilling detection: {e}")
+    
+    def clear_detections(self):
+        """Clear the detection history and statistics"""
+        with self.lock:
+            self.detected_barcodes.clear()
+            self._reset_stats()
+    
+    def get_recent_detections(self, count=10):
+        """
+        Get the most recent detections
+        
+        Args:
+            count: Maximum number of detections
+            
+        Returns:
+            list: DetectionRecord objects, oldest first
+        """
+        with self.lock:
+            return self.detected_barcodes.recent(count)
+    
+    def get_detections(self):
+        """
+        Get all retained detections as barcode info dicts
+        
+        Returns:
+            list: Barcode information dicts, oldest first
+        """
+        with self.lock:
+            return self.detected_barcodes.to_dicts()
+    
+    def _reset_stats(self):
+        """Reset the running detection counters"""
+        self.total_detections = 0
+        self.type_counts = {}
+        self.linear_count = 0
+        self.matrix_count = 0
+        self.last_detection = None
+    
+    def get_detection_log(self, filename):
+        """
+        Get (or open) the append-only log for a detections filename
+        
+        Args:
+            filename: Output filename passed to save_detection
+            
+        Returns:
+            DetectionLog: Open log
+        """
+        path = detection_log_path(filename)
+        with self.lock:
+            if path not in self.detection_logs:
+                self.detection_logs[path] = DetectionLog(path)
+            return self.detection_logs[path]
+    
+    def export_detections(self, detections, filename):
+        """
+        Write a snapshot of detections to a JSON file
+        
+        Args:
+            detections: List of processed barcode information
+            filename: Output filename
+        """
+        detections = [d.to_dict() if hasattr(d, 'to_dict') else d for d in detections]
+        with open(filename, 'w') as f:
+            json.dump(detections, f, indent=2, default=str)
+    
+    def close(self):
+        """Flush and close all detection logs"""
+        with self.lock:
+            logs = list(self.detection_logs.values())
+            self.detection_logs.clear()
+        for log in logs:
+            log.close()
     
     def is_supported_barcode(self, barcode_info):
         """
@@ -208,7 +806,7 @@ class BarcodeDetector:
         supported_types = {
             'CODE39', 'CODE128', 'EAN13', 'EAN8', 'UPCA', 'UPCE',
             'QRCODE', 'DATAMATRIX', 'PDF417', 'AZTEC', 'CODABAR',
-            'ITF', 'CODE93', 'CODE11', 'MSI', 'PHARMACODE'
+            'I25', 'CODE93', 'CODE11', 'MSI', 'PHARMACODE'
         }
         return barcode_info['type'] in supported_types
 
@@ -267,28 +865,17 @@ class BarcodeDetector:
         """
         Get detection statistics
 
+        Counters are maintained by add_detection, so this is O(1)
+        regardless of how many detections have been recorded.
+
         Returns:
             dict: Detection statistics
         """
-        total_detections = len(self.detected_barcodes)
-
-        # Count by barcode type
-        type_counts = {}
-        for barcode in self.detected_barcodes:
-            barcode_type = barcode['type']
-            type_counts[barcode_type] = type_counts.get(barcode_type, 0) + 1
-
-        # Get most common types
-        linear_types = {'CODE39', 'CODE128', 'EAN13', 'EAN8', 'UPCA', 'UPCE', 'CODABAR', 'ITF', 'CODE93'}
-        matrix_types = {'QRCODE', 'DATAMATRIX', 'PDF417', 'AZTEC'}
-
-        linear_count = sum(type_counts.get(t, 0) for t in linear_types)
-        matrix_count = sum(type_counts.get(t, 0) for t in matrix_types)
-
-        return {
-            'total_detections': total_detections,
-            'linear_barcodes': linear_count,
-            'matrix_barcodes': matrix_count,
-            'type_breakdown': type_counts,
-            'last_detection': self.detected_barcodes[-1] if self.detected_barcodes else None
-        }
+        with self.lock:
+            return {
+                'total_detections': self.total_detections,
+                'linear_barcodes': self.linear_count,
+                'matrix_barcodes': self.matrix_count,
+                'type_breakdown': dict(self.type_counts),
+                'last_detection': self.last_detection
+            }
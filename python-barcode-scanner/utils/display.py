@@ -149,10 +149,10 @@ class DisplayManager:
         cv2.putText(frame, f"Total: {stats['total_detections']}", 
                    (status_x + 5, status_y + 40), self.font, 0.5, (0, 255, 0), 1)
         
-        cv2.putText(frame, f"Code 39: {stats['code39_detections']}", 
+        cv2.putText(frame, f"Linear: {stats['linear_barcodes']}", 
                    (status_x + 5, status_y + 60), self.font, 0.5, (0, 255, 255), 1)
         
-        cv2.putText(frame, f"Others: {stats['other_detections']}", 
+        cv2.putText(frame, f"2D: {stats['matrix_barcodes']}", 
                    (status_x + 5, status_y + 80), self.font, 0.5, (255, 255, 0), 1)
         
         return frame
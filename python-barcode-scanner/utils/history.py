@@ -0,0 +1,167 @@
+"""
+Detection History Utilities
+Fixed-capacity, compact in-memory history of detected barcodes
+"""
+
+import time
+from collections import deque
+from datetime import datetime
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_MISSING = object()
+
+
+class DetectionRecord:
+    """Compact, slotted form of a processed barcode info dict"""
+
+    __slots__ = ('data', 'type', 'rect', 'polygon', 'time', 'confidence',
+                 'source', 'extra', 'logged')
+
+    # Dict keys stored in dedicated slots; anything else goes to extra
+    FIELDS = ('data', 'type', 'rect', 'polygon', 'timestamp', 'confidence', 'source')
+
+    def __init__(self, barcode_info):
+        self.data = barcode_info.get('data', '')
+        self.type = barcode_info.get('type', 'UNKNOWN')
+        self.confidence = barcode_info.get('confidence')
+        self.source = barcode_info.get('source')
+
+        rect = barcode_info.get('rect')
+        self.rect = tuple(rect) if rect is not None else None
+        polygon = barcode_info.get('polygon')
+        self.polygon = tuple((p[0], p[1]) for p in polygon) if polygon is not None else None
+
+        # Store the timestamp as epoch seconds instead of a formatted string
+        timestamp = barcode_info.get('timestamp')
+        try:
+            self.time = time.mktime(time.strptime(timestamp, TIMESTAMP_FORMAT))
+        except (TypeError, ValueError):
+            self.time = timestamp
+
+        extra = {k: v for k, v in barcode_info.items() if k not in self.FIELDS}
+        self.extra = extra or None
+        self.logged = False
+
+    @property
+    def timestamp(self):
+        """Detection time in the '%Y-%m-%d %H:%M:%S' format"""
+        if isinstance(self.time, float):
+            return datetime.fromtimestamp(self.time).strftime(TIMESTAMP_FORMAT)
+        return self.time
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        """Dict-style access to the record fields"""
+        if key == 'timestamp':
+            value = self.timestamp
+        elif key in self.FIELDS:
+            value = getattr(self, key)
+        else:
+            value = self.extra.get(key) if self.extra else None
+        return default if value is None else value
+
+    def to_dict(self):
+        """
+        Expand the record back into a barcode info dict
+
+        Returns:
+            dict: Barcode information with the original keys
+        """
+        info = {'data': self.data, 'type': self.type}
+        if self.rect is not None:
+            info['rect'] = self.rect
+        if self.polygon is not None:
+            info['polygon'] = [list(p) for p in self.polygon]
+        info['timestamp'] = self.timestamp
+        if self.confidence is not None:
+            info['confidence'] = self.confidence
+        if self.source is not None:
+            info['source'] = self.source
+        if self.extra:
+            info.update(self.extra)
+        return info
+
+
+class DetectionHistory:
+    def __init__(self, maxlen=1000, on_evict=None):
+        """
+        Ring buffer of the most recent detections
+
+        Args:
+            maxlen: Number of detections kept in memory
+            on_evict: Optional callback receiving each DetectionRecord that
+                falls out of the buffer (e.g. to spill it to disk)
+
+        Raises:
+            ValueError: If maxlen is less than 1
+        """
+        if maxlen < 1:
+            raise ValueError(f"History must hold at least one detection, got {maxlen}")
+        self.maxlen = maxlen
+        self.on_evict = on_evict
+        self._records = deque(maxlen=maxlen)
+
+    def append(self, barcode_info):
+        """
+        Add a detection, evicting the oldest one if the buffer is full
+
+        Args:
+            barcode_info: Processed barcode information (dict or record)
+
+        Returns:
+            DetectionRecord: Stored record
+        """
+        record = barcode_info
+        if not isinstance(record, DetectionRecord):
+            record = DetectionRecord(barcode_info)
+
+        if len(self._records) == self.maxlen and self.on_evict:
+            self.on_evict(self._records[0])
+        self._records.append(record)
+        return record
+
+    def recent(self, count):
+        """
+        Get the most recent detections, oldest first
+
+        Args:
+            count: Maximum number of detections
+
+        Returns:
+            list: DetectionRecord objects
+        """
+        count = min(count, len(self._records))
+        return [self._records[i] for i in range(len(self._records) - count, len(self._records))]
+
+    def to_dicts(self):
+        """
+        Expand the retained detections into barcode info dicts
+
+        Returns:
+            list: Barcode information dicts, oldest first
+        """
+        return [record.to_dict() for record in self._records]
+
+    def clear(self):
+        """Drop all retained detections"""
+        self._records.clear()
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __reversed__(self):
+        return reversed(self._records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._records[i] for i in range(*index.indices(len(self._records)))]
+        return self._records[index]
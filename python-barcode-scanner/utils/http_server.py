@@ -0,0 +1,385 @@
+"""
+HTTP Server Utilities
+Concurrent socket servers and cached static assets shared by the mobile
+scanner servers
+"""
+
+import gzip
+import hashlib
+import json
+import socketserver
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Seconds an idle persistent connection is kept open
+KEEP_ALIVE_TIMEOUT = 30
+
+# Socket timeout for connections served by a worker pool, which are not
+# kept alive; only bounds how long a stalled client can hold a worker
+POOL_REQUEST_TIMEOUT = 10
+
+# Largest JSON request body accepted from a phone (a full /barcodes batch
+# is well under this)
+MAX_JSON_BODY_BYTES = 1024 * 1024
+
+# Connections a worker pool queues per worker before answering 503
+POOL_QUEUE_PER_WORKER = 4
+
+BUSY_RESPONSE = (b'HTTP/1.1 503 Service Unavailable\r\n'
+                 b'Content-Length: 0\r\n'
+                 b'Retry-After: 1\r\n'
+                 b'Connection: close\r\n\r\n')
+
+
+class StaticAsset:
+    """
+    A response body rendered once and kept pre-compressed in memory
+
+    Holds the identity, gzip and (when the brotli package is installed)
+    brotli encodings of the body plus a strong ETag, so serving it is a
+    dictionary lookup and reloads can be answered with 304 Not Modified.
+    """
+
+    def __init__(self, body, content_type, cache_control='no-cache'):
+        """
+        Args:
+            body: Response body as bytes or str (encoded as UTF-8)
+            content_type: Content-Type header value
+            cache_control: Cache-Control header value. The default makes
+                browsers revalidate on every load, which costs a 304.
+        """
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        self.encodings = {'identity': body}
+
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            self.encodings['gzip'] = compressed
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                self.encodings['br'] = compressed
+
+    def select(self, accept_encoding):
+        """
+        Pick the smallest encoding the client accepts
+
+        Args:
+            accept_encoding: Accept-Encoding request header value, or None
+
+        Returns:
+            tuple: (content_encoding, body_bytes); content_encoding is None
+                for the identity encoding
+        """
+        accepted = set()
+        for item in (accept_encoding or '').split(','):
+            coding, _, params = item.strip().partition(';')
+            if params.replace(' ', '').lower() in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                continue
+            accepted.add(coding.strip().lower())
+
+        for coding in ('br', 'gzip'):
+            if coding in self.encodings and (coding in accepted or '*' in accepted):
+                return coding, self.encodings[coding]
+        return None, self.encodings['identity']
+
+    def matches(self, if_none_match):
+        """Check an If-None-Match request header against this asset's ETag"""
+        if not if_none_match:
+            return False
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or any(tag.replace('W/', '', 1) == self.etag for tag in tags)
+
+    def headers(self, content_encoding=None):
+        """Caching headers sent with both 200 and 304 responses"""
+        headers = {
+            'ETag': self.etag,
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+        if content_encoding:
+            headers['Content-Encoding'] = content_encoding
+        return headers
+
+    @property
+    def size(self):
+        """Uncompressed body size in bytes"""
+        return len(self.encodings['identity'])
+
+
+def load_static_asset(path, content_type, cache_control='no-cache'):
+    """
+    Read a file into a StaticAsset
+
+    Returns:
+        StaticAsset: The asset, or None if the file does not exist
+    """
+    try:
+        with open(path, 'rb') as f:
+            return StaticAsset(f.read(), content_type, cache_control)
+    except FileNotFoundError:
+        return None
+
+
+class KeepAliveHandlerMixin:
+    """
+    HTTP/1.1 persistent connections for BaseHTTPRequestHandler subclasses
+
+    Every response must carry a Content-Length so the connection can be
+    reused; send_body/send_json take care of that. The socket timeout
+    closes connections that stay idle for KEEP_ALIVE_TIMEOUT seconds.
+
+    An idle persistent connection holds its thread the whole time, which
+    is free with one thread per connection but would starve a worker
+    pool. Servers with keep_alive = False (WorkerPoolHTTPServer) therefore
+    get Connection: close on every response and the shorter
+    POOL_REQUEST_TIMEOUT, so a worker is only busy while a request is.
+    """
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT
+
+    def setup(self):
+        self.keep_alive = getattr(self.server, 'keep_alive', True)
+        if not self.keep_alive:
+            self.timeout = POOL_REQUEST_TIMEOUT
+        super().setup()
+
+    def send_body(self, status, content_type, body, headers=None):
+        """
+        Send a complete response with Content-Length and CORS headers
+
+        Args:
+            status: HTTP status code
+            content_type: Content-Type header value, or None
+            body: Response body bytes
+            headers: Optional dict of extra headers
+        """
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-type', content_type)
+        if status not in (204, 304):
+            self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if self.keep_alive:
+            self.send_header('Keep-Alive', f'timeout={KEEP_ALIVE_TIMEOUT}')
+        else:
+            # Also sets close_connection
+            self.send_header('Connection', 'close')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def read_body(self, max_bytes=MAX_JSON_BODY_BYTES):
+        """
+        Read the request body, refusing oversized or unsized ones
+
+        Args:
+            max_bytes: Largest body accepted
+
+        Returns:
+            bytes: The body, or None after a 400/411/413 response was sent
+        """
+        try:
+            content_length = int(self.headers['Content-Length'])
+        except (TypeError, ValueError):
+            self.close_connection = True
+            self.send_json(411, {'status': 'error', 'message': 'Content-Length required'})
+            return None
+
+        if content_length < 0:
+            # rfile.read(-1) would read until the client closes, past max_bytes
+            self.close_connection = True
+            self.send_json(400, {'status': 'error', 'message': 'Invalid Content-Length'})
+            return None
+
+        if content_length > max_bytes:
+            # Don't read the body; closing is cheaper than draining it
+            self.close_connection = True
+            self.send_json(413, {
+                'status': 'error',
+                'message': f'Request body larger than {max_bytes // 1024} KB'
+            })
+            return None
+
+        return self.rfile.read(content_length)
+
+    def send_json(self, status, value):
+        """Send a JSON response"""
+        self.send_body(status, 'application/json', json.dumps(value, default=str).encode('utf-8'))
+
+    def send_html(self, status, html):
+        """Send an HTML response"""
+        self.send_body(status, 'text/html', html.encode('utf-8'))
+
+    def send_asset(self, asset):
+        """
+        Send a StaticAsset, or 304 Not Modified if the client has it cached
+
+        Args:
+            asset: StaticAsset to serve
+        """
+        if asset.matches(self.headers.get('If-None-Match')):
+            self.send_body(304, None, b'', asset.headers())
+            return
+        encoding, body = asset.select(self.headers.get('Accept-Encoding'))
+        self.send_body(200, asset.content_type, body, asset.headers(encoding))
+
+
+class ScannerHandlerMixin:
+    """
+    Endpoints shared by the mobile scanner servers' request handlers
+
+    Use with KeepAliveHandlerMixin. The handler must set self.vendor_assets
+    to the dict returned by utils.vendor.load_vendor_assets, and define
+    record_barcode_batch(payload) for POST /barcodes: it records the scans
+    of the parsed JSON body, returns the response dict and raises
+    ValueError for a malformed batch.
+    """
+    vendor_assets = {}
+
+    def handle_barcodes_post(self):
+        """Handle a batch of scans buffered on a mobile device"""
+        post_data = self.read_body()
+        if post_data is None:
+            return
+
+        try:
+            payload = json.loads(post_data.decode('utf-8'))
+        except ValueError as e:
+            self.send_json(400, {'status': 'error', 'message': str(e)})
+            return
+
+        try:
+            response = self.record_barcode_batch(payload)
+        except ValueError as e:
+            self.send_json(400, {'status': 'error', 'message': str(e)})
+            return
+        except Exception as e:
+            print(f"Error handling barcode batch POST: {e}")
+            self.send_json(500, {'status': 'error', 'message': str(e)})
+            return
+
+        self.send_json(200, response)
+
+    def serve_vendor_asset(self):
+        """Serve a vendored library, or redirect to its pinned CDN copy"""
+        # utils.vendor imports this module, so import it on first use
+        from .vendor import vendor_fallback_url
+
+        path = self.path.split('?', 1)[0]
+        asset = self.vendor_assets.get(path)
+        if asset is not None:
+            self.send_asset(asset)
+        elif vendor_fallback_url(path):
+            self.send_body(302, None, b'', {'Location': vendor_fallback_url(path)})
+        else:
+            self.send_error(404, "File not found")
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """Serve each connection on its own thread"""
+    daemon_threads = True
+
+
+class WorkerPoolHTTPServer(socketserver.TCPServer):
+    """
+    Serve connections on a bounded pool of worker threads
+
+    Connections are not kept alive (see KeepAliveHandlerMixin), and at
+    most max_pending connections wait for a worker; beyond that clients
+    get an immediate 503 with Retry-After (or, over TLS, are closed)
+    instead of an unbounded queue.
+    """
+    keep_alive = False
+
+    def __init__(self, server_address, RequestHandlerClass, workers=16,
+                 max_pending=None, bind_and_activate=True):
+        self.executor = ThreadPoolExecutor(max_workers=workers,
+                                           thread_name_prefix='http-worker')
+        if max_pending is None:
+            max_pending = workers * POOL_QUEUE_PER_WORKER
+        self.max_connections = workers + max_pending
+        self.connections = 0
+        self.connections_lock = threading.Lock()
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+
+    def process_request(self, request, client_address):
+        """Hand the connection to the worker pool, or reject it if full"""
+        with self.connections_lock:
+            busy = self.connections >= self.max_connections
+            if not busy:
+                self.connections += 1
+        if busy:
+            self.reject_request(request)
+            return
+        self.executor.submit(self._process_request_worker, request, client_address)
+
+    def reject_request(self, request):
+        """
+        Turn away a connection without blocking the accept loop
+
+        The 503 is written with a single non-blocking send, which a fresh
+        connection's empty send buffer always has room for, so a client
+        that never reads cannot stall accept(). TLS connections have not
+        done their handshake yet; answering would mean doing it here, so
+        they are closed without a response.
+        """
+        if not isinstance(request, ssl.SSLSocket):
+            try:
+                request.setblocking(False)
+                request.send(BUSY_RESPONSE)
+            except OSError:
+                pass
+        self.shutdown_request(request)
+
+    def _process_request_worker(self, request, client_address):
+        """Same as ThreadingMixIn.process_request_thread"""
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self.connections_lock:
+                self.connections -= 1
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serve each Unix socket connection on its own thread"""
+    daemon_threads = True
+
+
+def create_http_server(server_address, handler, workers=0):
+    """
+    Create a concurrent HTTP server
+
+    With one thread per connection, connections are kept alive. With a
+    worker pool they are closed after each response and excess
+    connections are refused with 503, so idle phones never hold workers.
+
+    Args:
+        server_address: (host, port) to bind
+        handler: Request handler class or factory
+        workers: Size of the worker pool, or 0 for one thread per connection
+
+    Returns:
+        socketserver.TCPServer: Bound, concurrent server
+    """
+    if workers and workers > 0:
+        return WorkerPoolHTTPServer(server_address, handler, workers=workers)
+    return ThreadingHTTPServer(server_address, handler)
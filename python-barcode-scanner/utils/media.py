@@ -0,0 +1,138 @@
+"""
+Batch Input Utilities
+Read images from archives and frames from video files without extracting them
+"""
+
+import os
+import tarfile
+import zipfile
+import zlib
+from datetime import datetime
+
+import cv2
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.tif')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v')
+
+# Archive members larger than this are skipped rather than read into memory
+MAX_MEMBER_BYTES = 64 * 1024 * 1024
+
+# Raised by zipfile/tarfile for corrupt archives or members (truncated data,
+# bad CRCs, broken compressed streams, unsupported compression, encryption)
+ARCHIVE_READ_ERRORS = (zipfile.BadZipFile, tarfile.TarError, zlib.error, EOFError,
+                       OSError, NotImplementedError, RuntimeError)
+
+
+class ArchiveMemberError(ValueError):
+    """An archive member that could not be read; the rest of the archive may be fine"""
+
+
+def is_image_name(name):
+    """Check a file or member name for a supported image extension"""
+    return name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def is_video(path):
+    """Check whether a path is a video file, by extension"""
+    return os.path.isfile(path) and path.lower().endswith(VIDEO_EXTENSIONS)
+
+
+def is_archive(path):
+    """Check whether a path is a zip or tar archive (plain or compressed)"""
+    if not os.path.isfile(path):
+        return False
+    return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+
+
+def iter_archive_images(archive_path, max_member_bytes=MAX_MEMBER_BYTES):
+    """
+    Read the images in a zip or tar archive one member at a time
+
+    Nothing is extracted to disk and only one member is held in memory.
+    Tar archives, compressed or not, are read as a stream in a single pass.
+    A member that cannot be read is yielded with an ArchiveMemberError in
+    place of its data, so one bad member does not end the scan.
+
+    Args:
+        archive_path: Path to a .zip, .tar, .tar.gz, .tar.bz2 or .tar.xz file
+        max_member_bytes: Larger members are skipped with a warning
+
+    Yields:
+        tuple: (member_name, data, mtime_ns) for each image member, where
+            data is the member's bytes or an ArchiveMemberError
+
+    Raises:
+        One of ARCHIVE_READ_ERRORS: If the archive itself is corrupt
+    """
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not is_image_name(info.filename):
+                    continue
+                if info.file_size > max_member_bytes:
+                    print(f"⚠️  Skipping {info.filename}: larger than "
+                          f"{max_member_bytes // (1024 * 1024)} MB")
+                    continue
+                try:
+                    mtime = datetime(*info.date_time).timestamp()
+                except ValueError:
+                    # Some tools write invalid DOS dates (month or day 0)
+                    mtime = 0
+                try:
+                    data = archive.read(info)
+                except ARCHIVE_READ_ERRORS as e:
+                    data = ArchiveMemberError(f"Could not read archive member: {e}")
+                yield info.filename, data, int(mtime * 1e9)
+        return
+
+    with tarfile.open(archive_path, 'r|*') as archive:
+        for member in archive:
+            if not member.isfile() or not is_image_name(member.name):
+                continue
+            if member.size > max_member_bytes:
+                print(f"⚠️  Skipping {member.name}: larger than "
+                      f"{max_member_bytes // (1024 * 1024)} MB")
+                continue
+            try:
+                data = archive.extractfile(member).read()
+            except ARCHIVE_READ_ERRORS as e:
+                # A broken stream usually ends the archive too; the next
+                # member read raises and is reported by the caller
+                data = ArchiveMemberError(f"Could not read archive member: {e}")
+            yield member.name, data, int(member.mtime * 1e9)
+
+
+def iter_video_frames(video_path, stride=10):
+    """
+    Decode every stride-th frame of a video
+
+    Skipped frames are only grabbed, not converted, which is much cheaper
+    than reading them.
+
+    Args:
+        video_path: Path to a video file
+        stride: Keep one frame in this many
+
+    Yields:
+        tuple: (frame_index, time_s, frame)
+
+    Raises:
+        ValueError: If the video cannot be opened
+    """
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+
+    fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+    stride = max(1, stride)
+    try:
+        index = 0
+        while capture.grab():
+            if index % stride == 0:
+                ok, frame = capture.retrieve()
+                if ok:
+                    time_s = index / fps if fps else capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                    yield index, time_s, frame
+            index += 1
+    finally:
+        capture.release()
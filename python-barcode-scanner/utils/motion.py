@@ -0,0 +1,75 @@
+"""
+Motion Gating Utilities
+Skip barcode decoding on frames where the scene has not changed
+"""
+
+import cv2
+
+
+class MotionGate:
+    def __init__(self, threshold=4.0, size=(32, 24), max_skip=30):
+        """
+        Gate frames on a cheap downsampled frame difference
+
+        Args:
+            threshold: Mean absolute difference (0-255 gray levels) below
+                which a frame counts as unchanged
+            size: (width, height) of the thumbnail used for comparison
+            max_skip: Maximum number of consecutive skipped frames before a
+                decode is forced anyway
+        """
+        self.threshold = threshold
+        self.size = size
+        self.max_skip = max_skip
+        self.reset()
+
+    def reset(self):
+        """Forget the reference frame and counters"""
+        self.reference = None
+        self.consecutive_skips = 0
+        self.frames_seen = 0
+        self.frames_skipped = 0
+
+    def should_process(self, frame):
+        """
+        Check whether a frame differs enough from the last decoded frame
+
+        Args:
+            frame: OpenCV image frame
+
+        Returns:
+            bool: True if the frame should be decoded
+        """
+        self.frames_seen += 1
+
+        # Shrink first so the color conversion only touches a few pixels
+        thumbnail = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        if thumbnail.ndim == 3:
+            thumbnail = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY)
+
+        if self.reference is not None and self.consecutive_skips < self.max_skip:
+            difference = cv2.absdiff(thumbnail, self.reference).mean()
+            if difference < self.threshold:
+                self.consecutive_skips += 1
+                self.frames_skipped += 1
+                return False
+
+        # Compare against the last decoded frame, so slow drift still
+        # eventually triggers a decode
+        self.reference = thumbnail
+        self.consecutive_skips = 0
+        return True
+
+    def get_stats(self):
+        """
+        Get gating statistics
+
+        Returns:
+            dict: Frame counters and skip rate
+        """
+        return {
+            'frames_seen': self.frames_seen,
+            'frames_skipped': self.frames_skipped,
+            'frames_processed': self.frames_seen - self.frames_skipped,
+            'skip_rate': (self.frames_skipped / self.frames_seen) if self.frames_seen else 0.0
+        }
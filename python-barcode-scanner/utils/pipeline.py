@@ -0,0 +1,152 @@
+"""
+Frame Pipeline Utilities
+Threaded capture and decode stages connected by latest-value queues
+"""
+
+import threading
+
+
+class LatestValueQueue:
+    def __init__(self):
+        """Single-slot queue that only ever holds the newest value"""
+        self._condition = threading.Condition()
+        self._value = None
+        self._has_value = False
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, value):
+        """Store a value, replacing (and counting) any unconsumed one"""
+        with self._condition:
+            if self._has_value:
+                self.dropped += 1
+            self._value = value
+            self._has_value = True
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """
+        Take the newest value, waiting for one if necessary
+
+        Args:
+            timeout: Seconds to wait, or None to wait forever
+
+        Returns:
+            The newest value, or None on timeout or when closed
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._has_value or self.closed, timeout)
+            if not self._has_value:
+                return None
+            value = self._value
+            self._value = None
+            self._has_value = False
+            return value
+
+    def close(self):
+        """Wake up any waiting consumer"""
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class FramePipeline:
+    def __init__(self, cap, process_frame):
+        """
+        Run camera capture and frame decoding on separate threads
+
+        The capture thread reads frames as fast as the camera delivers them
+        and keeps only the newest one, so decode latency never backs up the
+        driver buffer. The decode thread always works on the newest frame
+        and publishes its result for the render stage (the caller's thread).
+
+        Args:
+            cap: Opened cv2.VideoCapture
+            process_frame: Callable taking a frame and returning a result
+        """
+        self.cap = cap
+        self.process_frame = process_frame
+        self.frames = LatestValueQueue()
+        self.results = LatestValueQueue()
+        self.stop_event = threading.Event()
+        self.threads = []
+        self.error = None
+        self.frames_captured = 0
+        self.frames_decoded = 0
+
+    def start(self):
+        """Start the capture and decode threads"""
+        self.threads = [
+            threading.Thread(target=self._capture_loop, name='capture', daemon=True),
+            threading.Thread(target=self._decode_loop, name='decode', daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        """Stop both threads and wait for them to finish"""
+        self.stop_event.set()
+        self.frames.close()
+        self.results.close()
+        for thread in self.threads:
+            thread.join(timeout=2.0)
+        self.threads = []
+
+    @property
+    def running(self):
+        """Whether the capture/decode threads are still active"""
+        return not self.stop_event.is_set()
+
+    def get_result(self, timeout=None):
+        """
+        Get the newest decode result for rendering
+
+        Args:
+            timeout: Seconds to wait, or None to wait forever
+
+        Returns:
+            The newest process_frame result, or None if none is ready
+        """
+        return self.results.get(timeout)
+
+    def _capture_loop(self):
+        """Read frames continuously, keeping only the newest"""
+        while not self.stop_event.is_set():
+            ret, frame = self.cap.read()
+            if not ret:
+                self.error = "Could not read frame from camera"
+                self.stop_event.set()
+                self.results.close()
+                break
+            self.frames_captured += 1
+            self.frames.put(frame)
+
+    def _decode_loop(self):
+        """Decode the newest captured frame and publish the result"""
+        while not self.stop_event.is_set():
+            frame = self.frames.get(timeout=0.1)
+            if frame is None:
+                continue
+            try:
+                result = self.process_frame(frame)
+            except Exception as e:
+                self.error = f"Error processing frame: {e}"
+                self.stop_event.set()
+                self.results.close()
+                break
+            self.frames_decoded += 1
+            self.results.put(result)
+
+    def get_stats(self):
+        """
+        Get pipeline statistics
+
+        Returns:
+            dict: Capture/decode counters and dropped frames per stage
+        """
+        return {
+            'frames_captured': self.frames_captured,
+            'frames_decoded': self.frames_decoded,
+            'capture_drops': self.frames.dropped,
+            'render_drops': self.results.dropped
+        }
@@ -0,0 +1,316 @@
+"""
+Batch Result Writers
+Stream batch scan results to JSON, JSON Lines, CSV or text as they complete
+"""
+
+import abc
+import csv
+import json
+import os
+
+RESULT_FORMATS = ('json', 'jsonl', 'csv', 'txt')
+
+# How much of an existing file is searched for its footer when appending
+TAIL_BYTES = 64 * 1024
+
+
+class ScanSummary:
+    """Running totals over batch scan results"""
+
+    def __init__(self):
+        self.total_files = 0
+        self.successful_scans = 0
+        self.total_barcodes = 0
+        self.code39_barcodes = 0
+
+    def add(self, result):
+        """Count one scan result"""
+        self.total_files += 1
+        if result['status'] == 'success':
+            self.successful_scans += 1
+        self.total_barcodes += result.get('total_barcodes', 0)
+        self.code39_barcodes += result.get('code39_barcodes', 0)
+
+    def remove(self, result):
+        """Take a previously counted scan result back out"""
+        self.total_files -= 1
+        if result['status'] == 'success':
+            self.successful_scans -= 1
+        self.total_barcodes -= result.get('total_barcodes', 0)
+        self.code39_barcodes -= result.get('code39_barcodes', 0)
+
+    def as_dict(self):
+        """
+        Get the summary statistics
+
+        Returns:
+            dict: Same keys as BatchBarcodeScanner.get_summary
+        """
+        return {
+            'total_files': self.total_files,
+            'successful_scans': self.successful_scans,
+            'failed_scans': self.total_files - self.successful_scans,
+            'total_barcodes': self.total_barcodes,
+            'code39_barcodes': self.code39_barcodes,
+            'other_barcodes': self.total_barcodes - self.code39_barcodes
+        }
+
+
+class ResultWriter(abc.ABC):
+    """
+    Base class for streaming result writers
+
+    write() emits each result and flushes it to disk straight away, so an
+    interrupted run keeps everything scanned so far. close() appends the
+    summary computed from running totals.
+
+    With append=True an existing file is continued instead of replaced:
+    its summary footer is cut off and new results follow the old ones.
+    """
+    label = 'results'
+    newline = None
+
+    def __init__(self, output_file, append=False):
+        self.output_file = output_file
+        self.summary = ScanSummary()
+        if append and os.path.exists(output_file) and os.path.getsize(output_file):
+            kept = self._truncate_footer()
+            self.file = open(output_file, 'a', newline=self.newline, encoding='utf-8')
+            self.resume(kept)
+        else:
+            self.file = open(output_file, 'w', newline=self.newline, encoding='utf-8')
+            self.start()
+
+    def _truncate_footer(self):
+        """Cut the footer off an existing file, returning the tail kept before it"""
+        with open(self.output_file, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            start = max(0, size - TAIL_BYTES)
+            f.seek(start)
+            tail = f.read()
+            cut = self.resume_offset(tail)
+            f.truncate(start + cut)
+        return tail[:cut]
+
+    def resume_offset(self, tail):
+        """
+        Find where appending should start in the end of an existing file
+
+        The default drops a partly written last line.
+
+        Args:
+            tail: Last bytes of the file
+
+        Returns:
+            int: Offset into tail; everything after it is removed
+        """
+        return tail.rfind(b'\n') + 1
+
+    def start(self):
+        """Write the file header"""
+
+    def resume(self, tail):
+        """Prepare to append after the kept tail of an existing file"""
+
+    def write(self, result):
+        """
+        Write one scan result
+
+        Args:
+            result: Scan result from BatchBarcodeScanner.scan_image
+        """
+        self.summary.add(result)
+        self.write_result(result)
+        self.file.flush()
+
+    @abc.abstractmethod
+    def write_result(self, result):
+        """Format one result; implemented by subclasses"""
+
+    def finish(self, summary):
+        """Write the file footer"""
+
+    def close(self):
+        """Write the summary and close the file"""
+        if self.file.closed:
+            return
+        self.finish(self.summary.as_dict())
+        self.file.close()
+        print(f"💾 Results saved to {self.label}: {self.output_file}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class JSONResultWriter(ResultWriter):
+    """A single JSON object, with the results array written incrementally"""
+    label = 'JSON'
+    HEADER = b'{\n  "results": ['
+    # Each result is indented by four spaces, so only a result's own closing
+    # brace starts a line with exactly four spaces and a brace
+    RECORD_END = b'\n    }'
+
+    def start(self):
+        self.file.write(self.HEADER.decode())
+        self.first = True
+
+    def resume_offset(self, tail):
+        footer = tail.rfind(b'],\n  "scan_summary": ')
+        if footer >= 0:
+            kept = tail[:footer].rstrip()
+            if kept.endswith((b'[', b'}')):
+                return len(kept)
+        else:
+            # Without a footer the run was killed, possibly partway through
+            # a result; keep up to the end of the last complete one
+            end = tail.rfind(self.RECORD_END)
+            if end >= 0:
+                return end + len(self.RECORD_END)
+            header = tail.rfind(self.HEADER)
+            if header >= 0:
+                return header + len(self.HEADER)
+        raise ValueError(f"Cannot append to {self.output_file}: "
+                         "it does not end with a complete result")
+
+    def resume(self, tail):
+        self.first = tail.endswith(b'[')
+
+    def write_result(self, result):
+        text = json.dumps(result, indent=2, default=str).replace('\n', '\n    ')
+        self.file.write(('\n    ' if self.first else ',\n    ') + text)
+        self.first = False
+
+    def finish(self, summary):
+        summary_text = json.dumps(summary, indent=2).replace('\n', '\n  ')
+        self.file.write(('' if self.first else '\n  ') + '],\n  "scan_summary": ' +
+                        summary_text + '\n}\n')
+
+
+class JSONLinesResultWriter(ResultWriter):
+    """One JSON result per line, followed by a scan_summary line"""
+    label = 'JSON Lines'
+
+    def resume_offset(self, tail):
+        cut = super().resume_offset(tail)
+        last_line = tail.rfind(b'\n', 0, max(cut - 1, 0)) + 1
+        if tail.startswith(b'{"scan_summary"', last_line):
+            return last_line
+        return cut
+
+    def write_result(self, result):
+        self.file.write(json.dumps(result, default=str) + '\n')
+
+    def finish(self, summary):
+        self.file.write(json.dumps({'scan_summary': summary}) + '\n')
+
+
+class CSVResultWriter(ResultWriter):
+    """One CSV row per barcode, or per file when nothing was found"""
+    label = 'CSV'
+    newline = ''
+
+    def start(self):
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(['File', 'Status', 'Total Barcodes', 'Code 39 Barcodes',
+                              'Barcode Data', 'Barcode Type', 'Confidence'])
+
+    def resume(self, tail):
+        self.writer = csv.writer(self.file)
+
+    def write_result(self, result):
+        if result['barcodes']:
+            for barcode in result['barcodes']:
+                self.writer.writerow([
+                    result['file'],
+                    result['status'],
+                    result['total_barcodes'],
+                    result['code39_barcodes'],
+                    barcode['data'],
+                    barcode['type'],
+                    barcode['confidence']
+                ])
+        else:
+            self.writer.writerow([
+                result['file'],
+                result['status'],
+                result.get('total_barcodes', 0),
+                result.get('code39_barcodes', 0),
+                '',
+                '',
+                ''
+            ])
+
+
+class TextResultWriter(ResultWriter):
+    """Human-readable report, with the summary at the end"""
+    label = 'text'
+
+    def start(self):
+        self.file.write("BATCH BARCODE SCAN RESULTS\n")
+        self.file.write("=" * 50 + "\n\n")
+        self.file.write("DETAILED RESULTS:\n")
+        self.file.write("-" * 50 + "\n")
+
+    def resume_offset(self, tail):
+        footer = tail.rfind(b'\nSUMMARY:\n')
+        if footer >= 0:
+            return footer
+        return super().resume_offset(tail)
+
+    def write_result(self, result):
+        self.file.write(f"\nFile: {result['file']}\n")
+        self.file.write(f"Status: {result['status']}\n")
+
+        if result['status'] == 'success':
+            self.file.write(f"Barcodes found: {result['total_barcodes']}\n")
+
+            for i, barcode in enumerate(result['barcodes'], 1):
+                self.file.write(f"  {i}. Type: {barcode['type']}\n")
+                self.file.write(f"     Data: {barcode['data']}\n")
+                self.file.write(f"     Confidence: {barcode['confidence']:.1f}%\n")
+        else:
+            self.file.write(f"Error: {result.get('error', 'Unknown error')}\n")
+
+        self.file.write("-" * 30 + "\n")
+
+    def finish(self, summary):
+        self.file.write("\nSUMMARY:\n")
+        self.file.write(f"  Total files processed: {summary['total_files']}\n")
+        self.file.write(f"  Successful scans: {summary['successful_scans']}\n")
+        self.file.write(f"  Failed scans: {summary['failed_scans']}\n")
+        self.file.write(f"  Total barcodes found: {summary['total_barcodes']}\n")
+        self.file.write(f"  Code 39 barcodes: {summary['code39_barcodes']}\n")
+
+
+WRITERS = {
+    'json': JSONResultWriter,
+    'jsonl': JSONLinesResultWriter,
+    'csv': CSVResultWriter,
+    'txt': TextResultWriter,
+}
+
+
+def open_result_writer(output_format, output_file, append=False):
+    """
+    Create a streaming writer for an output format
+
+    Args:
+        output_format: One of RESULT_FORMATS
+        output_file: Output file path
+        append: Continue an existing file instead of replacing it
+
+    Returns:
+        ResultWriter: Open writer
+
+    Raises:
+        ValueError: If the format is not supported, or the existing file
+            cannot be appended to
+    """
+    try:
+        writer_class = WRITERS[output_format.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported output format: {output_format}")
+    return writer_class(output_file, append=append)
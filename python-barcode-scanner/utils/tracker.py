@@ -0,0 +1,107 @@
+"""
+ROI Tracking Utilities
+Reuse the last barcode position to avoid full-frame searches on video
+"""
+
+
+class ROITracker:
+    def __init__(self, padding=0.5, full_search_interval=15):
+        """
+        Track the last barcode location between consecutive frames
+
+        Args:
+            padding: Margin added around the last detection, as a fraction
+                of its width/height on each side
+            full_search_interval: Maximum number of consecutive ROI-only
+                frames before a full-frame search is forced
+        """
+        self.padding = padding
+        self.full_search_interval = full_search_interval
+        self.reset()
+
+    def reset(self):
+        """Forget the tracked region and counters"""
+        self.last_rect = None
+        self.frames_since_full_search = 0
+        self.roi_searches = 0
+        self.roi_hits = 0
+        self.full_searches = 0
+
+    def detect(self, detector, frame, source='default'):
+        """
+        Detect barcodes, searching around the last detection first
+
+        A padded crop around the previous detection is decoded first. On a
+        miss, or every full_search_interval frames, the whole frame is
+        searched instead.
+
+        Args:
+            detector: BarcodeDetector instance
+            frame: OpenCV image frame
+            source: Camera/source identifier passed to the detector
+
+        Returns:
+            list: Detected barcode objects in full-frame coordinates
+        """
+        if (self.last_rect is not None and
+                self.frames_since_full_search < self.full_search_interval):
+            self.roi_searches += 1
+            self.frames_since_full_search += 1
+
+            region = self._padded_region(self.last_rect, frame.shape)
+            barcodes = detector.detect_barcodes_in_region(frame, region, source=source)
+            if barcodes:
+                self.roi_hits += 1
+                self._update(barcodes)
+                return barcodes
+
+        # Fall back to a full-frame search
+        self.full_searches += 1
+        self.frames_since_full_search = 0
+        barcodes = detector.detect_barcodes(frame, source=source)
+        self._update(barcodes)
+        return barcodes
+
+    def _update(self, barcodes):
+        """Track the bounding box of all barcodes found in this frame"""
+        if not barcodes:
+            self.last_rect = None
+            return
+
+        points = [(p.x, p.y) for barcode in barcodes for p in barcode.polygon]
+        if not points:
+            points = [(b.rect.left, b.rect.top) for b in barcodes]
+            points += [(b.rect.left + b.rect.width, b.rect.top + b.rect.height)
+                       for b in barcodes]
+
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        self.last_rect = (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+
+    def _padded_region(self, rect, frame_shape):
+        """Expand a rect by the padding margin, clipped to the frame"""
+        frame_h, frame_w = frame_shape[:2]
+        x, y, w, h = rect
+        # Fixed minimum margin so thin barcodes still get some context
+        pad_x = int(w * self.padding) + 10
+        pad_y = int(h * self.padding) + 10
+
+        x0 = max(0, x - pad_x)
+        y0 = max(0, y - pad_y)
+        x1 = min(frame_w, x + w + pad_x)
+        y1 = min(frame_h, y + h + pad_y)
+        return (x0, y0, x1 - x0, y1 - y0)
+
+    def get_stats(self):
+        """
+        Get tracking statistics
+
+        Returns:
+            dict: ROI and full-frame search counters
+        """
+        return {
+            'roi_searches': self.roi_searches,
+            'roi_hits': self.roi_hits,
+            'full_searches': self.full_searches,
+            'roi_hit_rate': (self.roi_hits / self.roi_searches) if self.roi_searches else 0.0
+        }
@@ -0,0 +1,128 @@
+"""
+Vendored Browser Libraries
+Pinned copies of the JavaScript the mobile scanner pages load, served by
+the mobile servers so scanning works without internet access
+"""
+
+import os
+import tempfile
+import urllib.request
+
+from utils.http_server import load_static_asset
+
+# Pinned decoder bundle. This is the only place to bump the version: the
+# scanner pages name it through ZXING_PATH_PLACEHOLDER (see render_scanner_page).
+ZXING_VERSION = '0.21.3'
+ZXING_FILENAME = f'zxing-library-{ZXING_VERSION}.min.js'
+ZXING_PATH = f'/vendor/{ZXING_FILENAME}'
+ZXING_CDN_URL = f'https://unpkg.com/@zxing/library@{ZXING_VERSION}/umd/index.min.js'
+ZXING_PATH_PLACEHOLDER = '{{ZXING_PATH}}'
+
+SCANNER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VENDOR_DIR = os.path.join(SCANNER_DIR, 'vendor')
+
+# Server-side decoding fallback shared by the scanner pages
+SERVER_DECODER_FILE = os.path.join(SCANNER_DIR, 'server_decoder.js')
+SERVER_DECODER_PLACEHOLDER = '{{SERVER_DECODER_JS}}'
+
+# URL path -> (file name in VENDOR_DIR, pinned CDN URL)
+VENDOR_FILES = {
+    ZXING_PATH: (ZXING_FILENAME, ZXING_CDN_URL),
+}
+
+# File names are versioned, so browsers may cache them forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def load_vendor_assets(vendor_dir=VENDOR_DIR):
+    """
+    Load and compress the vendored libraries that have been fetched
+
+    Args:
+        vendor_dir: Directory holding the vendored files
+
+    Returns:
+        dict: URL path -> StaticAsset for every file present
+    """
+    assets = {}
+    for url_path, (filename, cdn_url) in VENDOR_FILES.items():
+        asset = load_static_asset(os.path.join(vendor_dir, filename),
+                                  'application/javascript; charset=utf-8',
+                                  IMMUTABLE_CACHE_CONTROL)
+        if asset is None:
+            print(f"⚠️  WARNING: {filename} is not vendored.")
+            print(f"   {url_path} will redirect phones to {cdn_url},")
+            print("   so scanning fails on networks without internet access.")
+            print("💡 Run: python fetch_vendor.py")
+        else:
+            assets[url_path] = asset
+    return assets
+
+
+def render_scanner_page(html):
+    """
+    Fill in the shared parts of a scanner page
+
+    Args:
+        html: Page source using ZXING_PATH_PLACEHOLDER as the ZXing script
+            src and SERVER_DECODER_PLACEHOLDER inside a script element
+
+    Returns:
+        str: Page source with the pinned path and server_decoder.js inlined
+    """
+    if SERVER_DECODER_PLACEHOLDER in html:
+        with open(SERVER_DECODER_FILE, 'r', encoding='utf-8') as f:
+            html = html.replace(SERVER_DECODER_PLACEHOLDER, f.read().strip())
+    return html.replace(ZXING_PATH_PLACEHOLDER, ZXING_PATH)
+
+
+def vendor_fallback_url(url_path):
+    """
+    Pinned CDN URL to redirect to when a library has not been vendored
+
+    Returns:
+        str: CDN URL, or None if url_path is not a vendored library
+    """
+    entry = VENDOR_FILES.get(url_path)
+    return entry[1] if entry else None
+
+
+def fetch_vendor_assets(vendor_dir=VENDOR_DIR, force=False, timeout=30):
+    """
+    Download the pinned libraries into the vendor directory
+
+    Args:
+        vendor_dir: Directory to store the files in
+        force: Download again even if a file is already present
+        timeout: Per-download timeout in seconds
+
+    Returns:
+        bool: True if every library is present afterwards
+    """
+    os.makedirs(vendor_dir, exist_ok=True)
+    success = True
+
+    for filename, cdn_url in VENDOR_FILES.values():
+        path = os.path.join(vendor_dir, filename)
+        if os.path.exists(path) and not force:
+            print(f"✅ Exists: {filename}")
+            continue
+
+        try:
+            print(f"📦 Downloading {cdn_url}...")
+            with urllib.request.urlopen(cdn_url, timeout=timeout) as response:
+                data = response.read()
+
+            # Write to a temporary file first so a failed download never
+            # leaves a truncated bundle behind
+            fd, tmp_path = tempfile.mkstemp(dir=vendor_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            print(f"✅ Saved: {path} ({len(data) / 1024:.0f} KB)")
+
+        except Exception as e:
+            print(f"❌ Failed to download {filename}: {e}")
+            success = False
+
+    return success